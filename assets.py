@@ -0,0 +1,110 @@
+# assets.py
+"""
+Carga de recursos (fuente y música) en segundo plano.
+Buscar una fuente del sistema con pygame.font.SysFont recorre todas las fuentes
+instaladas (fc-list) y cargar Music.mp3 bloquea hasta decodificar la cabecera del
+archivo; ninguna de las dos cosas hace falta para mostrar el primer frame. AssetLoader
+las hace en un hilo mientras el juego ya dibuja:
+- La ruta de la fuente resuelta se guarda en FONT_CACHE_PATH, así que en los arranques
+  siguientes se abre directamente con pygame.font.Font(ruta) sin buscar.
+- El mezclador de audio se inicializa en el mismo hilo (es el subsistema más lento).
+  Si falta el archivo de música o no hay dispositivo de audio, el juego sigue sin música.
+"""
+
+import json
+import os
+import threading
+import time
+import pygame
+from config import FONT_NAME, FONT_SIZE, MUSIC_FILE, FONT_CACHE_PATH
+
+def _read_font_cache(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def resolve_font_path(name, cache_path=FONT_CACHE_PATH):
+    """
+    Devuelve la ruta del archivo de la fuente 'name' (o None si no está instalada),
+    usando la caché en disco y buscándola en el sistema solo si no está o ya no existe.
+    """
+    cache = _read_font_cache(cache_path)
+    path = cache.get(name)
+    if path and os.path.exists(path):
+        return path
+    path = pygame.font.match_font(name)
+    if path:
+        cache[name] = path
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, "w") as f:
+                json.dump(cache, f)
+        except OSError:
+            pass  # Sin caché el arranque solo es más lento
+    return path
+
+class MusicPlayer:
+    """
+    Envoltorio de pygame.mixer.music que se puede usar antes de que la música esté cargada:
+    play()/stop() recuerdan el estado deseado y poll() (llamado cada frame desde el hilo
+    principal) empieza a reproducir en cuanto el cargador termina.
+    """
+    def __init__(self):
+        self.loaded = False
+        self.wanted = False
+        self._playing = False
+
+    def play(self):
+        self.wanted = True
+        self._playing = False   # play() siempre reinicia la pista desde el inicio
+
+    def stop(self):
+        self.wanted = False
+        if self._playing:
+            pygame.mixer.music.stop()
+            self._playing = False
+
+    def poll(self):
+        if self.loaded and self.wanted and not self._playing:
+            pygame.mixer.music.play(-1)
+            self._playing = True
+
+class AssetLoader(threading.Thread):
+    """
+    Hilo que carga la fuente y la música. Hasta que termina, font es None (el HUD no se
+    dibuja) y la música queda pendiente en 'music'. timings guarda cuánto tardó cada
+    recurso (en segundos) y errors los problemas encontrados.
+    """
+    def __init__(self, font_name=FONT_NAME, font_size=FONT_SIZE, music_file=MUSIC_FILE):
+        super().__init__(name="asset-loader", daemon=True)
+        self.font_name = font_name
+        self.font_size = font_size
+        self.music_file = music_file
+        self.font = None
+        self.music = MusicPlayer()
+        self.timings = {}
+        self.errors = []
+        self.done = threading.Event()
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            path = resolve_font_path(self.font_name)
+            # Sin la fuente pedida se usa la fuente por defecto de pygame.
+            self.font = pygame.font.Font(path, self.font_size)
+        except (OSError, pygame.error) as e:
+            self.errors.append(f"fuente: {e}")
+            self.font = pygame.font.Font(None, self.font_size)
+        self.timings["font"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        try:
+            pygame.mixer.init()
+            pygame.mixer.music.load(self.music_file)
+            self.music.loaded = True
+        except (OSError, pygame.error) as e:
+            self.errors.append(f"música: {e}")
+        self.timings["music"] = time.perf_counter() - start
+        self.done.set()
@@ -0,0 +1,129 @@
+# batch.py
+"""
+Acumulación de los triángulos de un frame, sin dependencias gráficas.
+TriangleBatch guarda los triángulos que la escena añade durante el frame en un buffer de
+float32 por capa (estado de mezcla) con el formato intercalado
+    x, y, z, r, g, b, a   (7 floats por vértice)
+y prepare() los ordena y los copia en un único buffer de salida. Los buffers se reservan
+una vez y se reutilizan frame a frame (solo crecen, al doble, si un frame no cabe), así
+que en régimen acumular un frame no reserva memoria nueva para los vértices.
+Cada backend solo implementa submit(data, ranges), que dibuja ese buffer:
+BatchRenderer (renderer.py) lo sube a un VBO de OpenGL y SoftwareRenderer
+(software_renderer.py) lo rasteriza con NumPy.
+
+Las capas se dibujan en este orden:
+- "shadow": sombras semitransparentes proyectadas sobre el piso.
+- "body": cuerpos opacos (jugador, obstáculos y fragmentos). Si se indica la cámara en
+  begin_frame, los triángulos de esta capa se ordenan de atrás hacia adelante para toda
+  la escena con SceneSorter, así que los objetos no necesitan ordenarse por separado.
+"""
+
+import numpy as np
+from scene_sort import SceneSorter
+
+LAYERS = ("shadow", "body")
+SORTED_LAYERS = ("body",)
+
+def _grow(buffer, needed, keep):
+    """Devuelve un buffer (capacidad,7) con sitio para 'needed' vértices y sus 'keep' primeros copiados."""
+    if needed <= len(buffer):
+        return buffer
+    grown = np.empty((max(needed, 2 * len(buffer)), 7), dtype=np.float32)
+    grown[:keep] = buffer[:keep]
+    return grown
+
+class TriangleBatch:
+    def __init__(self, capacity=1024):
+        self._buffers = {layer: np.empty((capacity, 7), dtype=np.float32) for layer in LAYERS}
+        self._counts = dict.fromkeys(LAYERS, 0)     # Vértices acumulados en cada capa
+        self._data = np.empty((capacity, 7), dtype=np.float32)   # Salida de prepare()
+        self.draw_calls = 0   # Llamadas de dibujo emitidas en el último flush (para diagnóstico)
+        self.sorter = SceneSorter()
+        self._camera = None
+        self.profiler = None  # FrameProfiler opcional (fases sort/draw)
+
+    def begin_frame(self, eye=None, target=None):
+        """
+        Descarta los triángulos acumulados en el frame anterior.
+        eye/target son los mismos parámetros de gluLookAt; si se indican, la capa
+        de cuerpos se ordena por profundidad en espacio de vista al hacer flush.
+        """
+        for layer in LAYERS:
+            self._counts[layer] = 0
+        self._camera = None if eye is None else (np.asarray(eye, dtype=float), np.asarray(target, dtype=float))
+
+    def _reserve(self, layer, count):
+        """Reserva 'count' vértices al final de la capa y devuelve la vista (count,7) a rellenar."""
+        first = self._counts[layer]
+        end = first + count
+        buffer = self._buffers[layer] = _grow(self._buffers[layer], end, first)
+        self._counts[layer] = end
+        return buffer[first:end]
+
+    def add(self, vertices, triangles, color, layer="body"):
+        """
+        Añade un objeto al lote: vertices es una secuencia (N,3) y triangles los
+        índices (M,3) en el orden en que deben dibujarse. color es un RGBA común.
+        """
+        if len(triangles) == 0:
+            return
+        self.add_triangles(np.asarray(vertices)[np.asarray(triangles).reshape(-1)], color, layer)
+
+    def add_triangles(self, positions, colors, layer="body"):
+        """
+        Añade triángulos ya expandidos: positions es (K,3) o (T,3,3) y colors un RGBA
+        común, un color por vértice (K,4) o un color por triángulo (T,4).
+        Se copian (convertidos a float32) directamente en el buffer de la capa.
+        """
+        positions = np.asarray(positions).reshape(-1, 3)
+        colors = np.asarray(colors)
+        chunk = self._reserve(layer, len(positions))
+        chunk[:, :3] = positions
+        if colors.ndim == 2 and len(colors) * 3 == len(positions):
+            chunk.reshape(-1, 3, 7)[:, :, 3:] = colors[:, None, :]
+        else:
+            chunk[:, 3:] = colors
+
+    def prepare(self):
+        """
+        Parte de CPU del flush: ordena la capa de cuerpos y copia todas las capas en el
+        buffer de salida. Devuelve (data, ranges): el buffer intercalado (V,7) y la lista de
+        (primer vértice, número de vértices) de cada capa, o (None, []) si el frame está
+        vacío. data es una vista del buffer interno: solo es válida hasta el siguiente prepare.
+        No depende del backend, así que se puede medir sin contexto gráfico.
+        """
+        total = sum(self._counts.values())
+        self._data = _grow(self._data, total, 0)
+        ranges = []
+        first = 0
+        for layer in LAYERS:
+            count = self._counts[layer]
+            if count:
+                src = self._buffers[layer][:count]
+                dst = self._data[first:first + count]
+                if layer in SORTED_LAYERS and self._camera is not None:
+                    tris = src.reshape(-1, 3, 7)
+                    order = self.sorter.order(tris[:, :, :3], *self._camera)
+                    np.take(tris, order, axis=0, out=dst.reshape(-1, 3, 7))
+                else:
+                    dst[:] = src
+                ranges.append((first, count))
+                first += count
+        data = self._data[:total] if total else None
+        if self.profiler:
+            self.profiler.mark("sort")
+        return data, ranges
+
+    def submit(self, data, ranges):
+        """Dibuja el buffer preparado: cada rango (primer vértice, número de vértices) es una capa."""
+        raise NotImplementedError
+
+    def flush(self):
+        """Prepara todos los triángulos del frame y los dibuja con el backend (submit)."""
+        self.draw_calls = 0
+        data, ranges = self.prepare()
+        if data is None:
+            return
+        self.submit(data, ranges)
+        if self.profiler:
+            self.profiler.mark("draw")
@@ -0,0 +1,174 @@
+# batch_runner.py
+"""
+Ejecución masiva de partidas sin ventana en todos los núcleos.
+Cada episodio es una Simulation con su propia semilla y sus parámetros (los de config.py
+sustituidos con --set/--grid) que juega un bot, o un guion grabado con recording.py,
+hasta el primer choque o hasta --max-ticks. Los episodios se reparten entre procesos con
+multiprocessing.Pool; como no comparten estado, el rendimiento escala casi linealmente
+con el número de núcleos físicos (los ticks/s del informe, comparados con los de -j1).
+El coste por tick de cada episodio se mide en tiempo de CPU del proceso.
+
+Las semillas de los episodios se derivan de --seed con numpy.random.SeedSequence y son
+las mismas para todas las configuraciones, así que las configuraciones se comparan sobre
+las mismas pistas (números aleatorios comunes).
+
+Ejemplos:
+    python batch_runner.py -n 2000
+    python batch_runner.py -n 500 --set gravity=0.012 --grid jump_speed=0.25,0.3,0.35
+    python batch_runner.py -n 100 --bot script --script partida.rec -o resumen.json
+"""
+
+import argparse
+import ast
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+import numpy as np
+
+from config import TICK_RATE
+from simulation import Simulation, NO_INPUT
+from bots import idle_bot, jump_bot, make_random_bot
+from recording import load_recording, InputPlayer
+
+BOTS = ("jump", "random", "idle", "script")
+MAX_TICKS = 60 * TICK_RATE   # Duración máxima de un episodio (un minuto de juego)
+
+# Parámetros de Simulation que se pueden sustituir desde la línea de comandos.
+PARAMETERS = ("base_speed", "jump_speed", "gravity", "min_gap", "max_gap",
+              "fragment_subdivisions", "explosion_duration")
+
+def parse_assignment(text):
+    """'nombre=valor[,valor...]' -> (nombre, [valores])"""
+    name, _, values = text.partition("=")
+    name = name.strip()
+    if name not in PARAMETERS:
+        raise argparse.ArgumentTypeError(f"parámetro desconocido '{name}' (válidos: {', '.join(PARAMETERS)})")
+    try:
+        return name, [ast.literal_eval(v.strip()) for v in values.split(",")]
+    except (ValueError, SyntaxError):
+        raise argparse.ArgumentTypeError(f"valor no válido en '{text}'")
+
+def episode_seeds(seed, count):
+    """Semillas independientes de 63 bits para cada episodio, derivadas de 'seed'."""
+    states = np.random.SeedSequence(seed).generate_state(count, dtype=np.uint64)
+    return [int(s) >> 1 for s in states]
+
+def run_episode(task):
+    """
+    Juega un episodio (se ejecuta en un proceso del pool). task es una tupla
+    (índice de configuración, overrides, semilla, bot, max_ticks, guion) y devuelve un
+    diccionario con sus métricas.
+    """
+    config_index, overrides, seed, bot_name, max_ticks, script = task
+    sim = Simulation(seed=seed, **overrides)
+    if bot_name == "jump":
+        bot = jump_bot
+    elif bot_name == "random":
+        bot = make_random_bot(random.Random(seed))
+    elif bot_name == "script":
+        player = InputPlayer(script)
+        bot = lambda sim: player.next_inputs() if not player.finished else NO_INPUT
+    else:
+        bot = idle_bot
+    crashed = False
+    # Tiempo de CPU del proceso y no de reloj: con más procesos que núcleos, el reloj
+    # también contaría el tiempo en que el episodio espera a que el planificador lo ejecute.
+    start = time.process_time()
+    while sim.ticks < max_ticks:
+        if "collision" in sim.step(bot(sim)):
+            crashed = True
+            break
+    elapsed = time.process_time() - start
+    return {
+        "config": config_index,
+        "seed": seed,
+        "score": sim.score,
+        "distance": -float(sim.player.pos[0]),
+        "ticks": sim.ticks,
+        "crashed": crashed,
+        "us_per_tick": elapsed / max(sim.ticks, 1) * 1e6,
+        "cpu_s": elapsed,
+    }
+
+def summarize(episodes):
+    """Métricas agregadas (media y percentiles) de una lista de episodios."""
+    def stats(key):
+        values = np.array([e[key] for e in episodes], dtype=float)
+        p50, p95 = np.percentile(values, (50, 95))
+        return {"mean": float(values.mean()), "p50": float(p50), "p95": float(p95),
+                "min": float(values.min()), "max": float(values.max())}
+    return {
+        "episodes": len(episodes),
+        "crash_rate": sum(e["crashed"] for e in episodes) / len(episodes),
+        "score": stats("score"),
+        "distance": stats("distance"),
+        "survival_ticks": stats("ticks"),
+        "us_per_tick": stats("us_per_tick"),
+    }
+
+def print_report(configs, summaries, wall, cpu, workers, total_ticks):
+    print(f"{'configuración':<40} {'n':>6} {'choques':>8} {'score p50/p95':>15} {'distancia media':>16} {'us/tick':>8}")
+    for overrides, summary in zip(configs, summaries):
+        label = ", ".join(f"{k}={v}" for k, v in overrides.items()) or "config.py"
+        print(f"{label:<40} {summary['episodes']:>6} {summary['crash_rate']:>7.0%} "
+              f"{summary['score']['p50']:>7.0f}/{summary['score']['p95']:<7.0f} "
+              f"{summary['distance']['mean']:>16.1f} {summary['us_per_tick']['mean']:>8.1f}")
+    # La aceleración real solo se ve comparando los ticks/s con una ejecución con -j1; el uso
+    # de CPU indica si los procesos tuvieron núcleos para ellos (100 %) o se los repartieron.
+    print(f"{total_ticks} ticks en {wall:.2f} s con {workers} procesos: {total_ticks / wall:,.0f} ticks/s, "
+          f"{cpu:.2f} s de CPU en los episodios (uso {cpu / (wall * workers):.0%} de {workers} procesos)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ejecuta episodios sin ventana en paralelo y resume los resultados")
+    parser.add_argument("-n", "--episodes", type=int, default=1000, help="Episodios por configuración")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de la que se derivan las de los episodios")
+    parser.add_argument("--bot", choices=BOTS, default="jump")
+    parser.add_argument("--script", help="Grabación cuyas entradas se usan con --bot script")
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS)
+    parser.add_argument("--set", type=parse_assignment, action="append", default=[], metavar="PARAM=VALOR",
+                        help="Sustituye un parámetro de config.py en todas las configuraciones")
+    parser.add_argument("--grid", type=parse_assignment, action="append", default=[], metavar="PARAM=V1,V2,...",
+                        help="Prueba todas las combinaciones de estos valores")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("-o", "--output", help="Guarda el resumen (y cada episodio) en JSON")
+    args = parser.parse_args(argv)
+    if args.bot == "script" and not args.script:
+        parser.error("--bot script necesita --script ARCHIVO")
+
+    base = {name: values[-1] for name, values in args.set}
+    names = [name for name, _ in args.grid]
+    configs = [dict(base, **dict(zip(names, combo)))
+               for combo in itertools.product(*(values for _, values in args.grid))]
+    script = load_recording(args.script) if args.script else None
+    seeds = episode_seeds(args.seed, args.episodes)
+    tasks = [(i, overrides, seed, args.bot, args.max_ticks, script)
+             for i, overrides in enumerate(configs) for seed in seeds]
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.workers) as pool:
+        chunksize = max(1, len(tasks) // (args.workers * 8))
+        episodes = list(pool.imap_unordered(run_episode, tasks, chunksize=chunksize))
+    wall = time.perf_counter() - start
+
+    by_config = [[e for e in episodes if e["config"] == i] for i in range(len(configs))]
+    summaries = [summarize(group) for group in by_config]
+    print_report(configs, summaries, wall, sum(e["cpu_s"] for e in episodes), args.workers,
+                 sum(e["ticks"] for e in episodes))
+    if args.output:
+        report = {
+            "seed": args.seed, "bot": args.bot, "max_ticks": args.max_ticks, "wall_s": wall,
+            "workers": args.workers,
+            "configs": [dict(overrides=o, **s) for o, s in zip(configs, summaries)],
+            "episodes": sorted(episodes, key=lambda e: (e["config"], e["seed"])),
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Resumen guardado en {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,435 @@
+# benchmarks.py
+"""
+Benchmarks de las rutas calientes del juego.
+- Micro: rotation_z, backface_cull, painter_sort, project_shadow,
+  GameObject.get_transformed_vertices, Fragment.update y create_fragments_from_player,
+  junto a sus variantes vectorizadas (backface_mask, project_shadow_array,
+  SceneSorter, ParticleSystem, ObstacleField) y el culling por frustum, sobre escenas
+  sintéticas de 10 a 100k obstáculos, y VectorEnv.step con el mismo número de entornos.
+- Macro: frames completos (tick de simulación + escena + renderizador). Por defecto el
+  renderizador no llama a OpenGL (solo mide la parte de CPU); con --gl se dibuja de verdad
+  en un contexto EGL sin ventana (llvmpipe), incluyendo el piso y glFinish.
+
+Uso:
+    python benchmarks.py run -o base.json                # guarda una línea base
+    python benchmarks.py run --sizes 10 1000 -o new.json
+    python benchmarks.py compare base.json new.json --threshold 0.1
+    python benchmarks.py alloc --size 1000 --frames 600
+compare imprime la relación entre medianas y termina con código 1 si algún benchmark
+es más lento que la línea base en más del umbral indicado. alloc mide con tracemalloc la
+memoria que reservan los frames ya en régimen (ver allocation_benchmark) y termina con
+código 1 si no cumplen los límites de allocation_failures (los mismos que comprueba
+test_frame_allocations.py).
+"""
+
+import argparse
+import gc
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import numpy as np
+
+from config import (CAMERA_OFFSET, SPAWN_MIN_GAP, SPAWN_MAX_GAP, FRAGMENT_SUBDIVISIONS,
+                    DISPLAY_WIDTH, DISPLAY_HEIGHT, FOV, NEAR_PLANE, FAR_PLANE, FLOOR_LIMIT,
+                    EXPLOSION_DURATION)
+from transforms import (rotation_z, backface_cull, painter_sort, project_shadow,
+                        backface_mask, project_shadow_array)
+from game_objects import Player, Obstacle, Fragment, create_fragments_from_player
+from track import ObstacleTrack
+from particles import ParticleSystem
+from scene_sort import SceneSorter
+from simulation import Simulation
+from bots import jump_bot, idle_bot
+from vector_env import VectorEnv
+from scene import build_scene, LIGHT_DIR
+from frustum import Frustum
+
+SIZES = (10, 100, 1000, 10000, 100000)
+ROUNDS = 5
+MIN_ROUND_TIME = 0.05     # Duración mínima (s) de cada ronda; las funciones rápidas se repiten
+MAX_BENCH_TIME = 5.0      # Tiempo máximo (s) por benchmark: las funciones muy lentas hacen menos rondas
+FRAME_WARMUP = 30         # Ticks previos a medir los frames (llenan cachés y el orden de la escena)
+ALLOC_WARMUP = 600        # Frames previos a medir la memoria (además llenan las listas libres de Python y NumPy)
+ALLOC_MAX_RETAINED = 32.0         # Bytes retenidos por frame (media) tolerados: admite que algún buffer crezca
+ALLOC_MAX_TRANSIENT = 64 * 1024   # Pico de memoria temporal por frame (p99) tolerado, en bytes
+ALLOC_MAX_TRANSIENT_EXPLOSION = 160 * 1024   # Ídem en la explosión: crece con los fragmentos, no con la pista
+
+def measure(fn, rounds=ROUNDS, min_time=MIN_ROUND_TIME, max_time=MAX_BENCH_TIME):
+    """
+    Mide fn() como timeit: cada ronda llama a fn 'number' veces (calibrado para que la
+    ronda dure al menos min_time) con el recolector de basura desactivado.
+    Si una ronda dura más de max_time / rounds se hacen menos rondas (al menos una,
+    reutilizando la de calibración), para que las escenas de 100k objetos con los
+    bucles de Python no tarden minutos.
+    Devuelve los tiempos por llamada en microsegundos (mediana y mínimo de las rondas).
+    """
+    def run(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        return time.perf_counter() - start
+
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        number = 1
+        elapsed = run(number)
+        while elapsed < min_time:
+            number = max(number + 1, int(number * min_time / max(elapsed, 1e-9) * 1.2))
+            elapsed = run(number)
+        rounds = max(1, min(rounds, int(max_time / elapsed)))
+        times = [elapsed / number * 1e6]
+        times += [run(number) / number * 1e6 for _ in range(rounds - 1)]
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return {"median_us": statistics.median(times), "min_us": min(times),
+            "number": number, "rounds": rounds}
+
+def synthetic_track(count, seed=0):
+    """Pista con aproximadamente 'count' obstáculos por delante del origen."""
+    ahead = count * (SPAWN_MIN_GAP + SPAWN_MAX_GAP) / 2
+    return ObstacleTrack(ahead=ahead, seed=seed)
+
+# --- Micro benchmarks sin tamaño (un objeto) ---
+
+def single_benchmarks():
+    player = Player(pos=[0, 0, 0])
+    player.rotation_z = 0.3
+    verts = player.get_transformed_vertices()
+    cam = player.pos + CAMERA_OFFSET
+    # Las versiones por triángulo reciben listas de tuplas, como antes de las mallas binarias.
+    tris = player.triangles.tolist()
+    fragment = Fragment([0, 1, 0], [0.5, 1, 0.2], 0.0, 1.0)
+    particles = ParticleSystem()
+    rng = np.random.default_rng(0)
+
+    def explode():
+        particles.clear()
+        particles.explode(player, (0, 0.5, 1, 1), FRAGMENT_SUBDIVISIONS, rng)
+
+    def transformed_uncached():
+        player.rotation_z = player.rotation_z  # invalida la caché
+        return player.get_transformed_vertices()
+
+    return {
+        # rotation_z guarda sus matrices en caché: "rotation_z" mide el cálculo (comparable
+        # con las líneas base anteriores a la caché) y "rotation_z.cached", un acierto.
+        "rotation_z": lambda: rotation_z.__wrapped__(0.3),
+        "rotation_z.cached": lambda: rotation_z(0.3),
+        "backface_cull": lambda: backface_cull(tris, verts, cam),
+        "painter_sort": lambda: painter_sort(tris, verts),
+        "project_shadow": lambda: project_shadow(verts[0], LIGHT_DIR),
+        "GameObject.get_transformed_vertices": transformed_uncached,
+        "Fragment.update": lambda: fragment.update(1 / 60, 0.01),
+        "create_fragments_from_player": lambda: create_fragments_from_player(player),
+        "ParticleSystem.explode": explode,
+    }
+
+# --- Micro benchmarks sobre escenas de N obstáculos ---
+
+def scene_benchmarks(count):
+    field = synthetic_track(count).field
+    n = len(field)
+    indices = np.arange(n)
+    cam = np.array([0.0, 0.0, 0.0]) + CAMERA_OFFSET
+    target = np.zeros(3)
+    # Las versiones por objeto trabajan con objetos Obstacle completos en las mismas posiciones.
+    obstacles = [Obstacle(pos=p) for p in field.pos]
+    o_tris = obstacles[0].triangles
+    o_tri_list = o_tris.tolist()
+    o_verts = field.world_vertices(indices, 0)
+    vert_lists = [obs.get_transformed_vertices() for obs in obstacles]
+    scene_tris = o_verts[:, o_tris].reshape(-1, 3, 3)
+    centers = field.bounding_centers(indices, 0)
+
+    rng = np.random.default_rng(0)
+    pos = rng.uniform(-10, 10, size=(n, 3))
+    vel = rng.uniform(-1, 1, size=(n, 3))
+    angle = rng.uniform(-math.pi, math.pi, size=n)
+    fragments = [Fragment(p, v, a, 1.0) for p, v, a in zip(pos, vel, angle)]
+    particles = ParticleSystem(capacity=n)
+    particles.emit(pos, vel, angle, 1.0, 0.5, (1, 0, 0, 1))
+
+    def transformed_uncached():
+        for obs in obstacles:
+            obs.rotation_z = 0.0  # invalida la caché
+            obs.get_transformed_vertices()
+
+    def fragments_update():
+        for frag in fragments:
+            frag.update(1 / 60, 0.01)
+
+    # N entornos vectorizados, con un bot que salta a menos de 1.5 unidades de un obstáculo.
+    env = VectorEnv(n, seed=0)
+    env_obs = [env.reset()]
+
+    def env_step():
+        obs = env_obs[0]
+        env_obs[0] = env.step((obs[:, 4] > 0) & (obs[:, 4] < 1.5))[0]
+
+    return n, {
+        "GameObject.get_transformed_vertices": transformed_uncached,
+        "ObstacleField.world_vertices": lambda: field.world_vertices(indices, 0),
+        "backface_cull": lambda: [backface_cull(o_tri_list, v, cam) for v in vert_lists],
+        "backface_mask": lambda: backface_mask(o_verts, o_tris, cam),
+        "painter_sort": lambda: [painter_sort(o_tri_list, v) for v in vert_lists],
+        "SceneSorter.order": lambda: SceneSorter().order(scene_tris, cam, target),
+        "Frustum.spheres_visible": lambda: Frustum(cam, target).spheres_visible(centers, 1.0),
+        "project_shadow": lambda: [[project_shadow(p, LIGHT_DIR) for p in v] for v in vert_lists],
+        "project_shadow_array": lambda: project_shadow_array(o_verts.reshape(-1, 3), LIGHT_DIR),
+        "Fragment.update": fragments_update,
+        "ParticleSystem.update": lambda: particles.update(1 / 60, 0.01),
+        "Fragment.get_transformed_vertices": lambda: [frag.get_transformed_vertices() for frag in fragments],
+        "ParticleSystem.transformed_vertices": particles.transformed_vertices,
+        "VectorEnv.step": env_step,
+    }
+
+# --- Macro benchmark: frame completo ---
+
+def frame_benchmark(count, gl, exploding=False):
+    """
+    Devuelve una función que simula y dibuja un frame con una pista de ~count obstáculos.
+    Con exploding, los frames son de la explosión: el jugador choca con el primer
+    obstáculo y la explosión no termina nunca.
+    Los módulos con OpenGL se importan aquí para que --gl pueda crear antes el contexto.
+    """
+    from renderer import BatchRenderer
+    sim = Simulation(seed=0, explosion_duration=math.inf if exploding else EXPLOSION_DURATION)
+    sim.track = synthetic_track(count, seed=0)
+    sim.reset()
+    bot = jump_bot
+    if exploding:
+        bot = idle_bot
+        while "collision" not in sim.step(bot(sim)):
+            pass
+
+    if gl:
+        from OpenGL.GL import (glMatrixMode, glLoadIdentity, glDisable, glEnable, glBlendFunc,
+                               glClearColor, glClear, glFinish, GL_PROJECTION, GL_MODELVIEW,
+                               GL_DEPTH_TEST, GL_BLEND, GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA,
+                               GL_COLOR_BUFFER_BIT)
+        from OpenGL.GLU import gluPerspective, gluLookAt
+        from render_utils import FloorGrid
+        glMatrixMode(GL_PROJECTION)
+        glLoadIdentity()
+        gluPerspective(FOV, DISPLAY_WIDTH / DISPLAY_HEIGHT, NEAR_PLANE, FAR_PLANE)
+        glMatrixMode(GL_MODELVIEW)
+        glDisable(GL_DEPTH_TEST)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        renderer = BatchRenderer()
+        floor_grid = FloorGrid(FLOOR_LIMIT)
+    else:
+        class NullRenderer(BatchRenderer):
+            """BatchRenderer sin la subida al VBO ni las llamadas de dibujo."""
+            def submit(self, data, ranges):
+                self.draw_calls += len(ranges)
+        renderer = NullRenderer()
+
+    def frame():
+        sim.step(bot(sim))
+        player = sim.player
+        cam_pos = player.pos + sim.camera_offset
+        if gl:
+            glLoadIdentity()
+            gluLookAt(*cam_pos, *player.pos, 0, 1, 0)
+            glClearColor(0.5, 0.8, 1.0, 1.0)
+            glClear(GL_COLOR_BUFFER_BIT)
+            floor_grid.draw(player.pos, cam_pos)
+        renderer.begin_frame(cam_pos, player.pos)
+        build_scene(renderer, sim, cam_pos, frustum=Frustum(cam_pos, player.pos))
+        renderer.flush()
+        if gl:
+            glFinish()
+
+    for _ in range(FRAME_WARMUP):
+        frame()
+    return len(sim.track), frame
+
+def run_benchmarks(sizes, rounds, gl, pattern=None):
+    results = {}
+
+    def record(name, fn, **extra):
+        if pattern and pattern not in name:
+            return
+        entry = measure(fn, rounds)
+        entry.update(extra)
+        results[name] = entry
+        print(f"{name:<48} {entry['median_us']:>14.2f} us  (min {entry['min_us']:.2f})", flush=True)
+
+    for name, fn in single_benchmarks().items():
+        record(name, fn)
+    for size in sizes:
+        n, benches = scene_benchmarks(size)
+        for name, fn in benches.items():
+            record(f"{name}/{size}", fn, obstacles=n)
+        if not pattern or pattern in f"frame/{size}":
+            n, frame = frame_benchmark(size, gl)
+            record(f"frame/{size}", frame, obstacles=n)
+    return results
+
+def allocation_benchmark(count, frames, warmup=ALLOC_WARMUP, exploding=False):
+    """
+    Mide con tracemalloc la memoria de 'frames' frames en régimen (tras 'warmup' frames de
+    calentamiento) con una pista de ~count obstáculos, en carrera o, con exploding, durante
+    la explosión. Por frame:
+    - retained: bytes que siguen reservados al terminar el frame. En régimen es 0 salvo
+      en los pocos frames en los que un buffer crece (al doble); la media sobre todos los
+      frames acota también las fugas que solo ocurren en algunos.
+    - transient: pico de memoria temporal, la que se reserva y se libera dentro del frame.
+      Con los buffers preasignados no depende del largo de la pista.
+    - gc_objects: objetos seguidos por el recolector de basura creados (netos).
+    Los frames se miden con el recolector desactivado, como en el juego (ver main.py).
+    """
+    _, frame = frame_benchmark(count, gl=False, exploding=exploding)
+    gc_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        for _ in range(warmup):
+            frame()
+        retained = np.zeros(frames)
+        transient = np.zeros(frames)
+        start_objects = len(gc.get_objects())
+        for i in range(frames):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            frame()
+            current, peak = tracemalloc.get_traced_memory()
+            retained[i] = current - before
+            transient[i] = peak - before
+        gc_objects = len(gc.get_objects()) - start_objects
+    finally:
+        tracemalloc.stop()
+        if gc_enabled:
+            gc.enable()
+    return {
+        "frames": frames,
+        "retained_median": float(np.median(retained)),
+        "retained_mean": float(retained.mean()),
+        "transient_p50": float(np.percentile(transient, 50)),
+        "transient_p99": float(np.percentile(transient, 99)),
+        "gc_objects_per_frame": gc_objects / frames,
+    }
+
+def allocation_failures(result, max_retained=ALLOC_MAX_RETAINED, max_transient=ALLOC_MAX_TRANSIENT):
+    """Lista de los límites que incumple un resultado de allocation_benchmark (vacía si ninguno)."""
+    failures = []
+    if result["retained_mean"] > max_retained:
+        failures.append(f"los frames retienen {result['retained_mean']:.1f} B de media (límite {max_retained:.0f} B)")
+    if result["gc_objects_per_frame"] > 0:
+        failures.append(f"los frames crean {result['gc_objects_per_frame']:.2f} objetos del GC")
+    if result["transient_p99"] > max_transient:
+        failures.append(f"el pico temporal p99 es de {result['transient_p99'] / 1024:.1f} KiB "
+                        f"(límite {max_transient / 1024:.0f} KiB)")
+    return failures
+
+def compare(baseline, current, threshold):
+    """
+    Compara las medianas de dos resultados. Devuelve la lista de regresiones:
+    benchmarks cuya mediana actual supera a la de la línea base en más de 'threshold'
+    (fracción, 0.1 = 10 %).
+    """
+    regressions = []
+    for name in sorted(set(baseline) | set(current)):
+        if name not in current or name not in baseline:
+            where = "línea base" if name in baseline else "resultado actual"
+            print(f"{name:<48} solo en {where}")
+            continue
+        old = baseline[name]["median_us"]
+        new = current[name]["median_us"]
+        ratio = new / old if old > 0 else math.inf
+        status = ""
+        if ratio > 1 + threshold:
+            status = "REGRESIÓN"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            status = "mejora"
+        print(f"{name:<48} {old:>12.2f} -> {new:>12.2f} us  x{ratio:5.2f}  {status}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de 3D Runner")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="Ejecuta los benchmarks y guarda los resultados en JSON")
+    run.add_argument("-o", "--output", default="benchmarks.json")
+    run.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="Número de obstáculos de las escenas")
+    run.add_argument("--rounds", type=int, default=ROUNDS)
+    run.add_argument("--gl", action="store_true", help="Dibuja los frames en un contexto EGL sin ventana")
+    run.add_argument("-k", "--filter", help="Solo los benchmarks cuyo nombre contiene este texto")
+    cmp = sub.add_parser("compare", help="Compara dos resultados y marca las regresiones")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--threshold", type=float, default=0.10, help="Regresión tolerada (0.1 = 10 %%)")
+    alloc = sub.add_parser("alloc", help="Mide la memoria reservada por frame con tracemalloc")
+    alloc.add_argument("--size", type=int, default=1000, help="Número de obstáculos de la pista")
+    alloc.add_argument("--frames", type=int, default=600)
+    alloc.add_argument("--exploding", action="store_true", help="Mide frames de la explosión en vez de la carrera")
+    alloc.add_argument("--max-retained", type=float, default=ALLOC_MAX_RETAINED,
+                       help="Bytes retenidos por frame (media) tolerados")
+    alloc.add_argument("--max-transient", type=float, default=None,
+                       help="Pico de memoria temporal por frame (p99, bytes) tolerado "
+                            "(por defecto, el de la carrera o el de la explosión)")
+    args = parser.parse_args(argv)
+
+    if args.command == "alloc":
+        result = allocation_benchmark(args.size, args.frames, exploding=args.exploding)
+        print(f"frames en régimen:        {result['frames']}")
+        print(f"retenido por frame:       mediana {result['retained_median']:.0f} B, "
+              f"media {result['retained_mean']:.1f} B")
+        print(f"temporal por frame:       p50 {result['transient_p50'] / 1024:.1f} KiB, "
+              f"p99 {result['transient_p99'] / 1024:.1f} KiB")
+        print(f"objetos del GC por frame: {result['gc_objects_per_frame']:.2f}")
+        max_transient = args.max_transient
+        if max_transient is None:
+            max_transient = ALLOC_MAX_TRANSIENT_EXPLOSION if args.exploding else ALLOC_MAX_TRANSIENT
+        failures = allocation_failures(result, args.max_retained, max_transient)
+        for failure in failures:
+            print(f"Fallo: {failure}")
+        if failures:
+            return 1
+        print("Frames sin reservas de memoria en régimen")
+        return 0
+
+    if args.command == "run":
+        meta = {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "rounds": args.rounds,
+            "gl": None,
+        }
+        if args.gl:
+            from headless_gl import create_context
+            meta["gl"] = create_context()
+        results = run_benchmarks(args.sizes, args.rounds, args.gl, args.filter)
+        with open(args.output, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+        print(f"Resultados guardados en {args.output}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    if baseline["meta"].get("gl") != current["meta"].get("gl"):
+        print("Aviso: los resultados se midieron con backends distintos "
+              f"({baseline['meta'].get('gl') or 'sin GL'} / {current['meta'].get('gl') or 'sin GL'})")
+    regressions = compare(baseline["results"], current["results"], args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regresiones por encima del {args.threshold:.0%}")
+        return 1
+    print("Sin regresiones")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
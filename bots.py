@@ -0,0 +1,30 @@
+# bots.py
+"""
+Jugadores automáticos para ejecutar partidas sin ventana (benchmarks, ejecución por lotes).
+Un bot es una función bot(sim) -> Inputs que se llama antes de cada tick.
+"""
+
+from simulation import Inputs, NO_INPUT
+
+JUMP_DISTANCE = 2.5   # jump_bot salta si hay un obstáculo a menos de esta distancia por delante
+
+def idle_bot(sim):
+    """No pulsa nada: mide cuánto dura el jugador sin saltar."""
+    return NO_INPUT
+
+def jump_bot(sim, distance=JUMP_DISTANCE):
+    """Bot sencillo: salta cuando hay un obstáculo justo por delante y reinicia al perder."""
+    if sim.state == "game_over":
+        return Inputs(restart=True)
+    x = sim.player.pos[0]
+    if sim.state == "running":
+        start, stop = sim.track.query_range(x - distance, x)
+        if stop > start:
+            return Inputs(jump=True)
+    return NO_INPUT
+
+def make_random_bot(rng, probability=0.05):
+    """Bot que salta al azar con la probabilidad dada en cada tick (rng: random.Random)."""
+    def random_bot(sim):
+        return Inputs(jump=rng.random() < probability)
+    return random_bot
@@ -0,0 +1,141 @@
+# chunks.py
+"""
+Generación de la pista por bloques (chunks) a partir de una semilla.
+La pista se divide en bloques de CHUNK_LENGTH unidades hacia -X. Cada bloque usa su
+propio generador aleatorio, sembrado con (semilla, índice del bloque), y parte de la
+posición del siguiente obstáculo que dejó el bloque anterior (next_x), así que la misma
+semilla produce siempre la misma pista, se generen los bloques donde se generen.
+
+ChunkStream entrega los bloques en orden. En modo con hilo, un hilo de fondo los
+prepara por adelantado en una cola acotada y el hilo del juego solo los saca de la cola;
+sin hilo (simulaciones sin ventana, lotes, reproducciones) se generan al pedirlos.
+Con prefetch(seed) el hilo empieza a preparar la pista siguiente antes de que empiece
+(Simulation lo pide al chocar, con la semilla de la próxima partida), así el restart(seed)
+de esa pista encuentra sus primeros bloques ya en la cola.
+
+Dentro de un bloque [end_x, start_x) los obstáculos se separan entre min_gap y max_gap
+unidades, igual que en toda la pista: el corte entre bloques no altera las distancias.
+"""
+
+import queue
+import threading
+from collections import namedtuple
+import numpy as np
+from config import SPAWN_MIN_GAP, SPAWN_MAX_GAP, SPAWN_START_X, CHUNK_LENGTH, CHUNK_QUEUE_SIZE
+
+# xs: posiciones X de los obstáculos del bloque, en orden descendente.
+# next_x: posición del primer obstáculo del bloque siguiente (ya fuera de este).
+Chunk = namedtuple("Chunk", ["index", "start_x", "end_x", "xs", "next_x"])
+
+def generate_chunk(seed, index, first_x, start_x=SPAWN_START_X, length=CHUNK_LENGTH,
+                   min_gap=SPAWN_MIN_GAP, max_gap=SPAWN_MAX_GAP):
+    """
+    Genera el bloque 'index' de la pista de semilla 'seed' que empieza en start_x.
+    first_x es la posición de su primer obstáculo: start_x para el bloque 0 y el next_x
+    del bloque anterior para los demás.
+    """
+    rng = np.random.default_rng((seed, index))
+    top = start_x - index * length
+    bottom = top - length
+    # Suficientes separaciones para pasar de bottom aunque todas sean de min_gap.
+    count = int((first_x - bottom) // min_gap) + 1
+    steps = np.empty(count + 1)
+    steps[0] = 0
+    steps[1:] = rng.integers(min_gap, max_gap, endpoint=True, size=count)
+    xs = first_x - np.cumsum(steps)
+    inside = int(np.count_nonzero(xs > bottom))
+    return Chunk(index, top, bottom, xs[:inside], float(xs[inside]))
+
+class ChunkStream:
+    """
+    Secuencia de bloques de una pista. restart(seed) empieza una pista nueva y
+    next_chunk() devuelve el siguiente bloque.
+    Con threaded=True un hilo de fondo genera los bloques por adelantado en una cola de
+    queue_size elementos. Si el hilo se queda atrás, next_chunk() genera el bloque en el
+    momento en vez de esperar (se cuenta en 'misses') y descarta la copia del hilo.
+    El hilo se crea con el primer prefetch o restart, no al construir el stream.
+    """
+    def __init__(self, start_x=SPAWN_START_X, length=CHUNK_LENGTH, min_gap=SPAWN_MIN_GAP,
+                 max_gap=SPAWN_MAX_GAP, threaded=False, queue_size=CHUNK_QUEUE_SIZE):
+        self.start_x = start_x
+        self.length = length
+        self.min_gap = min_gap
+        self.max_gap = max_gap
+        self.seed = None
+        self.misses = 0               # Bloques que el hilo no tenía listos a tiempo
+        self._index = 0               # Índice del próximo bloque a entregar
+        self._next_x = start_x        # Primer obstáculo del próximo bloque a entregar
+        self._epoch = 0               # Época de los bloques que se entregan (cambia con cada pista)
+        self._target = (0, None)      # (época, semilla) de la pista que prepara el hilo
+        self._prefetched = False      # El hilo ya prepara la próxima pista (ver prefetch)
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(queue_size) if threaded else None
+        self._thread = None
+
+    def _generate(self, seed, index, first_x):
+        return generate_chunk(seed, index, first_x, self.start_x, self.length, self.min_gap, self.max_gap)
+
+    def prefetch(self, seed):
+        """
+        Hace que el hilo empiece a preparar los bloques de la pista 'seed', que empezará con
+        el próximo restart(seed). Los bloques de la pista actual que queden en la cola se
+        descartan. Sin hilo no hace nada.
+        """
+        if self._queue is None:
+            return
+        with self._lock:
+            self._target = (self._target[0] + 1, seed)
+        self._prefetched = True
+        self._drain()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="chunk-generator", daemon=True)
+            self._thread.start()
+
+    def restart(self, seed):
+        """Empieza la pista 'seed'; si se pidió antes con prefetch, usa los bloques ya preparados."""
+        self.seed = seed
+        self._index = 0
+        self._next_x = self.start_x
+        if self._queue is None:
+            return
+        if not (self._prefetched and self._target[1] == seed):
+            self.prefetch(seed)
+        self._prefetched = False
+        self._epoch = self._target[0]
+
+    def _drain(self):
+        # Vaciar la cola también desbloquea al hilo si estaba esperando para encolar.
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _run(self):
+        epoch = None
+        while True:
+            with self._lock:
+                if self._target[0] != epoch:
+                    (epoch, seed), index, first_x = self._target, 0, self.start_x
+            chunk = self._generate(seed, index, first_x)
+            self._queue.put((epoch, chunk))
+            index, first_x = index + 1, chunk.next_x
+
+    def next_chunk(self):
+        chunk = self._take() if self._queue is not None else None
+        if chunk is None:
+            chunk = self._generate(self.seed, self._index, self._next_x)
+        self._index += 1
+        self._next_x = chunk.next_x
+        return chunk
+
+    def _take(self):
+        """Saca de la cola el bloque esperado, descartando los viejos; None si no está listo."""
+        while True:
+            try:
+                epoch, chunk = self._queue.get_nowait()
+            except queue.Empty:
+                self.misses += 1
+                return None
+            if epoch == self._epoch and chunk.index == self._index:
+                return chunk
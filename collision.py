@@ -0,0 +1,206 @@
+# collision.py
+"""
+Detección de colisiones entre el jugador y los obstáculos.
+Se divide en tres fases:
+- Fase amplia (broad phase): la pista está ordenada por X, así que solo se consultan
+  los obstáculos cuyo intervalo en X se solapa con el recorrido del jugador en este tick
+  (un intervalo de índices del ObstacleField de la pista).
+- Prueba continua (swept): se considera el movimiento completo del jugador entre la
+  posición anterior y la actual, de modo que a velocidades altas no pueda atravesar
+  un obstáculo entre dos frames.
+- Fase exacta (narrow phase): teorema del eje separador (SAT) entre las mallas convexas
+  reales (cubo rotado y pirámide), en vez de una caja de 0.6 unidades.
+"""
+
+import numpy as np
+from transforms import rotation_z
+from game_objects import OBSTACLE_KINDS
+
+# Tolerancia para descartar ejes degenerados y contactos sin penetración real.
+EPSILON = 1e-9
+
+def _unique_directions(vectors):
+    """
+    Normaliza un conjunto de vectores (K,3), descarta los nulos y elimina los
+    paralelos (v y -v representan el mismo eje de proyección).
+    """
+    norms = np.linalg.norm(vectors, axis=1)
+    dirs = vectors[norms > EPSILON] / norms[norms > EPSILON, None]
+    # Signo canónico: la primera componente no nula queda positiva.
+    first = np.argmax(np.abs(dirs) > EPSILON, axis=1)
+    signs = np.sign(dirs[np.arange(len(dirs)), first])
+    dirs = dirs * signs[:, None]
+    return np.unique(np.round(dirs, 9), axis=0)
+
+class ConvexShape:
+    """
+    Malla convexa (Mesh) preparada para SAT: vértices locales, direcciones de las
+    normales de las caras y direcciones de las aristas (sin duplicados).
+    Las direcciones se calculan en float64 a partir de los vértices, no de las normales
+    float32 de la malla, para que los ejes no dependan del redondeo del archivo.
+    """
+    def __init__(self, mesh):
+        self.vertices = mesh.vertices.astype(float)
+        tris = mesh.indices.astype(int)
+        v0 = self.vertices[tris[:, 0]]
+        v1 = self.vertices[tris[:, 1]]
+        v2 = self.vertices[tris[:, 2]]
+        self.normals = _unique_directions(np.cross(v1 - v0, v2 - v0))
+        self.edges = _unique_directions(np.concatenate([v1 - v0, v2 - v1, v0 - v2]))
+        # Radio en el plano XY respecto al origen local (cota para cualquier rotación en Z).
+        self.radius = float(np.max(np.linalg.norm(self.vertices[:, :2], axis=1)))
+
+def sat_axes(normals_a, edges_a, normals_b, edges_b):
+    """
+    Ejes candidatos del SAT para pares de poliedros convexos: las normales de ambas
+    mallas y los productos vectoriales entre sus aristas.
+    Acepta una dimensión de lote inicial en las entradas de B: (B,K,3).
+    Devuelve un arreglo (B,A,3); los ejes degenerados quedan como vectores nulos.
+    """
+    batch, nb = normals_b.shape[:2]
+    na, ea, eb = len(normals_a), len(edges_a), edges_b.shape[1]
+    # Los ejes se escriben por bloques en un único arreglo; el producto vectorial se hace
+    # componente a componente (np.cross con lotes reserva muchos arreglos intermedios).
+    axes = np.empty((batch, na + nb + ea * eb, 3))
+    axes[:, :na] = normals_a
+    axes[:, na:na + nb] = normals_b
+    cross = axes[:, na + nb:].reshape(batch, ea, eb, 3)
+    a = edges_a[None, :, None, :]
+    b = edges_b[:, None, :, :]
+    np.multiply(a[..., 1], b[..., 2], out=cross[..., 0])
+    cross[..., 0] -= a[..., 2] * b[..., 1]
+    np.multiply(a[..., 2], b[..., 0], out=cross[..., 1])
+    cross[..., 1] -= a[..., 0] * b[..., 2]
+    np.multiply(a[..., 0], b[..., 1], out=cross[..., 2])
+    cross[..., 2] -= a[..., 1] * b[..., 0]
+    return axes
+
+def swept_sat(verts_a, motion, verts_b, axes):
+    """
+    Prueba continua de SAT para una forma A que se traslada linealmente por 'motion'
+    durante el tick (t de 0 a 1) contra B formas estáticas.
+    - verts_a: (Na,3) vértices de A al final del tick.
+    - verts_b: (B,Nb,3) vértices de cada candidato.
+    - axes: (B,K,3) ejes de separación por candidato.
+    Devuelve (hit, toi): máscara booleana (B,) y el instante del primer contacto.
+    """
+    batch = len(verts_b)
+    return swept_sat_batch(np.broadcast_to(verts_a, (batch,) + verts_a.shape),
+                           np.broadcast_to(motion, (batch, len(motion))), verts_b, axes)
+
+def swept_sat_batch(verts_a, motion, verts_b, axes):
+    """
+    Versión por lotes de swept_sat: cada par tiene su propia forma A y su propio
+    movimiento. Sirve en 2D o 3D (D = 2 o 3):
+    - verts_a: (B,Na,D) vértices de A al final del tick; motion: (B,D).
+    - verts_b: (B,Nb,D) vértices de B; axes: (B,K,D) ejes de separación.
+    En cada eje la proyección de A se desplaza s = motion·eje, y el solape ocurre en el
+    intervalo de t que cumple amin + t*s < bmax y amax + t*s > bmin. Hay colisión si la
+    intersección de todos esos intervalos es no vacía dentro de [0, 1].
+    Devuelve (hit, toi): máscara booleana (B,) y el instante del primer contacto.
+    """
+    start_a = verts_a - motion[:, None, :]
+    proj_a = np.einsum('bkj,bnj->bkn', axes, start_a)
+    proj_b = np.einsum('bkj,bnj->bkn', axes, verts_b)
+    speed = np.einsum('bkj,bj->bk', axes, motion)
+    valid = np.einsum('bkj,bkj->bk', axes, axes) > EPSILON
+    return sweep_intervals(proj_a.min(axis=2), proj_a.max(axis=2),
+                           proj_b.min(axis=2), proj_b.max(axis=2), speed, valid)
+
+def sweep_intervals(amin, amax, bmin, bmax, speed, valid, axis=1):
+    """
+    Núcleo de la prueba continua a partir de las proyecciones ya calculadas:
+    [amin, amax] es el intervalo de A al inicio del tick en cada eje, [bmin, bmax] el de B,
+    speed el desplazamiento de A a lo largo del eje y valid marca los ejes no degenerados.
+    Los ejes van en la dimensión 'axis' (por defecto (B,K)); se devuelve (hit, toi).
+    """
+    moving = np.abs(speed) > EPSILON
+    safe_speed = np.where(moving, speed, 1.0)
+    t0 = (bmin - amax) / safe_speed
+    t1 = (bmax - amin) / safe_speed
+    enter = np.where(speed > 0, t0, t1)
+    leave = np.where(speed > 0, t1, t0)
+    # Ejes sin movimiento: el solape es constante durante todo el tick.
+    overlapping = (amin < bmax - EPSILON) & (amax > bmin + EPSILON)
+    enter = np.where(moving, enter, np.where(overlapping, -np.inf, np.inf))
+    leave = np.where(moving, leave, np.where(overlapping, np.inf, -np.inf))
+    # Los ejes degenerados no separan nada.
+    enter = np.where(valid, enter, -np.inf)
+    leave = np.where(valid, leave, np.inf)
+
+    t_enter = enter.max(axis=axis)
+    t_leave = leave.min(axis=axis)
+    hit = (t_enter < t_leave - EPSILON) & (t_enter < 1.0) & (t_leave > EPSILON)
+    return hit, np.clip(t_enter, 0.0, 1.0)
+
+class CollisionEngine:
+    """
+    Motor de colisiones del jugador contra la pista de obstáculos.
+    Las formas convexas se calculan una vez por malla y se reutilizan.
+    obstacle_radius debe acotar el radio XY de todas las mallas de obstáculo usadas
+    (por defecto, el mayor de los tipos de OBSTACLE_KINDS).
+    """
+    def __init__(self, obstacle_radius=None):
+        self._shapes = {}
+        self._player_axes = (None, None)   # ((id de la malla, ángulo), (normales, aristas)) del último giro
+        if obstacle_radius is None:
+            obstacle_radius = max(self.shape_for(kind.mesh).radius + np.linalg.norm(kind.pivot_offset[:2])
+                                  for kind in OBSTACLE_KINDS)
+        self.obstacle_radius = obstacle_radius  # Cota del radio XY de cualquier obstáculo
+
+    def shape_for(self, mesh):
+        """Devuelve (y cachea) la forma convexa de una malla compartida."""
+        shape = self._shapes.get(id(mesh))
+        if shape is None:
+            shape = self._shapes[id(mesh)] = ConvexShape(mesh)
+        return shape
+
+    def _rotated_axes(self, shape, mesh, angle):
+        """
+        Normales y aristas de 'shape' giradas 'angle' en Z. Se guardan las del último giro:
+        en el suelo el jugador no gira, así que se reutilizan tick tras tick.
+        """
+        key, axes = self._player_axes
+        if key != (id(mesh), angle):
+            R = rotation_z(angle)
+            axes = (shape.normals @ R.T, shape.edges @ R.T)
+            self._player_axes = ((id(mesh), angle), axes)
+        return axes
+
+    def sweep(self, player, start_pos, track):
+        """
+        Comprueba si el jugador, moviéndose desde start_pos hasta player.pos en este tick,
+        choca con algún obstáculo de la pista.
+        Devuelve (obstáculo, toi) del primer contacto o None si no hay colisión; el
+        obstáculo es una vista (ObstacleView) y toi la fracción del movimiento recorrida
+        antes del contacto.
+        """
+        p_shape = self.shape_for(player.mesh)
+        end_pos = player.pos
+        margin = p_shape.radius + np.linalg.norm(player.pivot_offset[:2]) + self.obstacle_radius
+        lo = min(start_pos[0], end_pos[0]) - margin
+        hi = max(start_pos[0], end_pos[0]) + margin
+        start, stop = track.query_range(lo, hi)
+        if start == stop:
+            return None
+        field = track.field
+
+        verts_a = player.world_vertices()
+        normals_a, edges_a = self._rotated_axes(p_shape, player.mesh, player.rotation_z)
+
+        # Los candidatos del mismo tipo se apilan en un lote; cada tipo de obstáculo es un
+        # lote aparte. Los obstáculos no giran: todos los de un tipo comparten las normales
+        # y aristas de su forma.
+        first_contact = np.full(stop - start, np.inf)
+        for kind, indices in field.kind_groups(start, stop):
+            shape = self.shape_for(field.kinds[kind].mesh)
+            count = len(indices)
+            normals_b = np.broadcast_to(shape.normals, (count,) + shape.normals.shape)
+            edges_b = np.broadcast_to(shape.edges, (count,) + shape.edges.shape)
+            axes = sat_axes(normals_a, edges_a, normals_b, edges_b)
+            hit, toi = swept_sat(verts_a, end_pos - start_pos, field.world_vertices(indices, kind), axes)
+            first_contact[indices - start] = np.where(hit, toi, np.inf)
+        first = int(np.argmin(first_contact))
+        if first_contact[first] == np.inf:
+            return None
+        return field.view(start + first), float(first_contact[first])
@@ -1,5 +1,6 @@
 # config.py
 # Este archivo contiene constantes y configuraciones globales usadas en el proyecto.
+import os
 import numpy as np
 
 # Configuración de pantalla y parámetros de proyección OpenGL
@@ -18,9 +19,56 @@ BASE_SPEED = 0.07    # Velocidad base del jugador (que se incrementará con la p
 CUBE_SCALE = 1.0       # Escala del cubo (jugador)
 PYRAMID_SCALE = 0.5    # Escala de la pirámide (obstáculo)
 MINI_SCALE = 0.5       # Escala para los fragmentos (mini cubos) resultantes de la explosión del cubo
+# Directorio de los archivos de malla (.mesh, ver mesh.py)
+MESH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "meshes")
 
 # Límite para dibujar el piso (se usa para limitar las líneas del fondo)
 FLOOR_LIMIT = 200
 
 # Offset de cámara por defecto (relativo al jugador)
 CAMERA_OFFSET = np.array([-15, 5, -20], dtype=float)
+CAMERA_SPEED = 0.2   # Desplazamiento del offset de cámara por tick mientras se mantiene una flecha
+
+# Generación de obstáculos: separación aleatoria (en unidades) entre pirámides consecutivas
+SPAWN_MIN_GAP = 5
+SPAWN_MAX_GAP = 10
+SPAWN_START_X = -30  # Posición X del primer obstáculo al iniciar una partida
+
+# Ventana de la pista de obstáculos alrededor del jugador (el jugador avanza hacia -X)
+TRACK_AHEAD = 270    # Distancia por delante del jugador hasta la que se mantienen obstáculos generados
+TRACK_BEHIND = 100   # Distancia por detrás del jugador a partir de la cual los obstáculos se reciclan
+CHUNK_LENGTH = 50    # Longitud en X de cada bloque de la pista generado de una vez (ver chunks.py)
+CHUNK_QUEUE_SIZE = 8  # Bloques que el hilo generador puede tener preparados por adelantado
+
+# Explosiones: cada objeto se fragmenta en FRAGMENT_SUBDIVISIONS^3 mini cubos
+FRAGMENT_SUBDIVISIONS = 4
+
+# Duración (en segundos) de la animación de explosión antes de pasar a "game_over"
+EXPLOSION_DURATION = 1.5
+
+# Bucle de paso fijo: la física avanza TICK_RATE ticks por segundo, sin importar los FPS.
+# Las constantes de física (GRAVITY, JUMP_SPEED, BASE_SPEED) están expresadas por tick.
+TICK_RATE = 60
+MAX_TICKS_PER_FRAME = 5   # Máximo de ticks por frame; si se acumulan más, se descartan
+
+# Recursos: fuente del HUD y música de fondo (se cargan en segundo plano, ver assets.py)
+FONT_NAME = "Arial"
+FONT_SIZE = 24
+MUSIC_FILE = "Music.mp3"
+# Caché de la ruta de la fuente resuelta, para no recorrer las fuentes del sistema en cada arranque
+FONT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "3d_runner", "fonts.json")
+
+# Control adaptativo de calidad (ver quality.py y los perfiles de quality_presets.py)
+FRAME_BUDGET_MS = 1000 / 60      # Presupuesto de cada frame para sostener 60 FPS
+QUALITY_WINDOW = 30              # Frames que se miden antes de cada decisión
+QUALITY_DOWNGRADE_RATIO = 0.9    # Se baja de perfil si el p90 de la ventana supera esta fracción del presupuesto
+QUALITY_UPGRADE_RATIO = 0.6      # Se sube solo si el p90 queda por debajo de esta fracción...
+QUALITY_UPGRADE_WINDOWS = 4      # ...durante estas ventanas seguidas (se duplica si la subida no se sostiene)
+
+# Entrada de baja latencia (ver input_events.py)
+LOW_LATENCY_MARGIN_MS = 2.0    # Margen entre el fin estimado del frame y su presentación
+INPUT_THREAD_WAIT_MS = 50      # Espera máxima del hilo de entrada antes de comprobar si debe terminar
+
+# Frame sin reservas de memoria (ver transforms.rotation_z y main.py)
+ROTATION_CACHE_SIZE = 64       # Matrices de rotation_z guardadas (una por ángulo distinto)
+GC_MAX_PENDING = 100_000       # Con el recolector desactivado en juego, se recolecta igual si quedan tantos objetos pendientes
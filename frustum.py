@@ -0,0 +1,93 @@
+# frustum.py
+"""
+Culling por frustum de visión.
+Frustum reconstruye los seis planos de la pirámide de visión a partir de los mismos
+parámetros que gluPerspective (FOV, aspecto, NEAR_PLANE, FAR_PLANE) y gluLookAt
+(posición de la cámara, punto observado y vector "arriba"), sin consultar a OpenGL.
+Cada plano se guarda como (n, d) con la normal n unitaria hacia el interior: un punto p
+está dentro del semiespacio si n·p + d >= 0.
+
+Una esfera (centro c, radio r) puede verse si n·c + d >= -r para los seis planos. La
+prueba es conservadora (alguna esfera cerca de una esquina pasa sin verse), pero nunca
+descarta un objeto visible, y se evalúa para todas las esferas con un único producto
+matricial (K,3) x (3,6).
+
+Frustum también guarda su caja envolvente alineada con los ejes (lo, hi), de sus ocho
+esquinas: permite descartar de una vez todo lo que queda fuera de un intervalo de X (por
+ejemplo, los obstáculos de la pista, con una búsqueda binaria) sin probar sus esferas.
+"""
+
+import math
+import numpy as np
+from config import FOV, NEAR_PLANE, FAR_PLANE, DISPLAY_WIDTH, DISPLAY_HEIGHT
+
+def _normalize(v):
+    return v / np.linalg.norm(v)
+
+def _cross(a, b):
+    # np.cross es lento para un único par de vectores (se llama en cada frame).
+    return np.array([a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0]])
+
+def _camera_basis(eye, target, up):
+    """Posición y ejes (adelante, derecha, arriba) de la cámara, como en gluLookAt."""
+    eye = np.asarray(eye, dtype=float)
+    forward = _normalize(np.asarray(target, dtype=float) - eye)
+    right = _normalize(_cross(forward, up))
+    return eye, forward, right, _cross(right, forward)
+
+def frustum_planes(eye, target, up=(0, 1, 0), fov=FOV, aspect=DISPLAY_WIDTH / DISPLAY_HEIGHT,
+                   near=NEAR_PLANE, far=FAR_PLANE):
+    """
+    Devuelve un arreglo (6,4) con los planos (nx, ny, nz, d) en este orden: cercano,
+    lejano, izquierdo, derecho, inferior y superior. fov es el ángulo vertical en grados.
+    """
+    eye, forward, right, true_up = _camera_basis(eye, target, up)
+    tan_v = math.tan(math.radians(fov) / 2)
+    tan_h = tan_v * aspect
+    # Los planos laterales pasan por la cámara; su normal es perpendicular al borde
+    # del frustum (forward ± right*tan_h o forward ± up*tan_v) y apunta hacia dentro.
+    normals = np.array([
+        forward,
+        -forward,
+        _normalize(right + forward * tan_h),
+        _normalize(-right + forward * tan_h),
+        _normalize(true_up + forward * tan_v),
+        _normalize(-true_up + forward * tan_v),
+    ])
+    d = -normals @ eye
+    d[0] -= near
+    d[1] += far
+    return np.column_stack([normals, d])
+
+def frustum_corners(eye, target, up=(0, 1, 0), fov=FOV, aspect=DISPLAY_WIDTH / DISPLAY_HEIGHT,
+                    near=NEAR_PLANE, far=FAR_PLANE):
+    """Devuelve un arreglo (8,3) con las esquinas del plano cercano y las del lejano."""
+    eye, forward, right, true_up = _camera_basis(eye, target, up)
+    tan_v = math.tan(math.radians(fov) / 2)
+    tan_h = tan_v * aspect
+    dist = np.array([near, far])[:, None, None]
+    signs = np.array([[-1, -1], [-1, 1], [1, -1], [1, 1]], dtype=float)
+    offsets = (signs[:, :1] * tan_h) * right + (signs[:, 1:] * tan_v) * true_up + forward
+    return (eye + dist * offsets).reshape(-1, 3)
+
+class Frustum:
+    """Frustum de una cámara; spheres_visible() prueba muchas esferas a la vez."""
+    def __init__(self, eye, target, up=(0, 1, 0), fov=FOV, aspect=DISPLAY_WIDTH / DISPLAY_HEIGHT,
+                 near=NEAR_PLANE, far=FAR_PLANE):
+        self.planes = frustum_planes(eye, target, up, fov, aspect, near, far)
+        self._normals_t = np.ascontiguousarray(self.planes[:, :3].T)
+        self._offsets = self.planes[:, 3]
+        corners = frustum_corners(eye, target, up, fov, aspect, near, far)
+        self.lo = corners.min(axis=0)    # Caja envolvente del frustum
+        self.hi = corners.max(axis=0)
+
+    def spheres_visible(self, centers, radii):
+        """
+        Máscara booleana (...,) de las esferas que intersecan el frustum.
+        centers es (...,3) y radii un radio común o uno por esfera (...,).
+        """
+        dist = np.asarray(centers, dtype=float) @ self._normals_t + self._offsets
+        return (dist >= -np.asarray(radii, dtype=float)[..., None]).all(axis=-1)
+
+    def sphere_visible(self, center, radius):
+        return bool(self.spheres_visible(center, radius))
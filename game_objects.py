@@ -5,65 +5,107 @@ Este módulo contiene las definiciones de los objetos del juego:
 - La pirámide (obstáculo)
 - El mini cubo (fragmento) para la animación de explosión
 - Las clases básicas: GameObject, Player, Obstacle, Fragment
+- Los tipos de obstáculo de la pista (OBSTACLE_KINDS, ver obstacle_field.py)
 - La función create_fragments_from_player que genera fragmentos a partir del cubo
 """
 
 import numpy as np
 import math, random
-from render_utils import rotation_z
+from collections import namedtuple
+from transforms import rotation_z, painter_sort_array, project_shadow_array
+from mesh import builtin_mesh
 from config import CUBE_SCALE, PYRAMID_SCALE, MINI_SCALE
 
-# --- Definiciones para el cubo (jugador) ---
-cube_vertices = [
-    np.array([-0.5, -0.5, -0.5]) * CUBE_SCALE,
-    np.array([ 0.5, -0.5, -0.5]) * CUBE_SCALE,
-    np.array([ 0.5,  0.5, -0.5]) * CUBE_SCALE,
-    np.array([-0.5,  0.5, -0.5]) * CUBE_SCALE,
-    np.array([-0.5, -0.5,  0.5]) * CUBE_SCALE,
-    np.array([ 0.5, -0.5,  0.5]) * CUBE_SCALE,
-    np.array([ 0.5,  0.5,  0.5]) * CUBE_SCALE,
-    np.array([-0.5,  0.5,  0.5]) * CUBE_SCALE
-]
-cube_triangles = [
-    (0,1,2), (0,2,3),
-    (4,6,5), (4,7,6),
-    (4,5,1), (4,1,0),
-    (5,6,2), (5,2,1),
-    (6,7,3), (6,3,2),
-    (7,4,0), (7,0,3)
-]
+# Las mallas se cargan de MESH_DIR (ver mesh.py) con memoria mapeada; todos los objetos
+# del mismo tipo comparten sus arreglos contiguos de vértices, índices y normales.
+
+# --- Cubo (jugador) ---
+cube_mesh = builtin_mesh("cube", CUBE_SCALE)
 # El pivot_offset se usa para trasladar el cubo de modo que su base (y=-0.5) quede en y=0.
 cube_pivot_offset = np.array([0, 0.5, 0], dtype=float)
 
-# --- Definiciones para la pirámide (obstáculo) ---
-pyramid_vertices = [
-    np.array([0, 1, 0]) * PYRAMID_SCALE,       # Vértice superior (apex)
-    np.array([-1, -1, 1]) * PYRAMID_SCALE,
-    np.array([1, -1, 1]) * PYRAMID_SCALE,
-    np.array([1, -1, -1]) * PYRAMID_SCALE,
-    np.array([-1, -1, -1]) * PYRAMID_SCALE
-]
-pyramid_triangles = [
-    (0,1,2), (0,2,3), (0,3,4), (0,4,1),
-    (1,2,3), (1,3,4)
-]
+# --- Pirámide (obstáculo) ---
+pyramid_mesh = builtin_mesh("pyramid", PYRAMID_SCALE)
 # Ajuste para que la base de la pirámide quede en y=0
 pyramid_pivot_offset = np.array([0, 0.5, 0], dtype=float)
 
-# --- Definiciones para el mini cubo (fragmentos de explosión) ---
-mini_cube_vertices = [v * MINI_SCALE for v in cube_vertices]
-mini_cube_triangles = cube_triangles[:]  # Se usan los mismos triángulos
+# Tipos de obstáculo de la pista: ObstacleField guarda de cada obstáculo solo el índice de
+# su tipo en esta tupla. Un tipo nuevo es otra malla .mesh con su pivot offset.
+ObstacleKind = namedtuple("ObstacleKind", ["mesh", "pivot_offset"])
+OBSTACLE_KINDS = (ObstacleKind(pyramid_mesh, pyramid_pivot_offset),)
+
+# --- Mini cubo (fragmentos de explosión) ---
+mini_cube_mesh = cube_mesh.scaled(MINI_SCALE)
 mini_cube_pivot_offset = np.array([0, 0.5*MINI_SCALE, 0], dtype=float)
+# Vértices sueltos para la versión por vértice de Fragment.get_transformed_vertices.
+mini_cube_vertices = list(mini_cube_mesh.vertices.astype(float))
 
 # Clase base para objetos del juego
 class GameObject:
-    def __init__(self, base_vertices, triangles, pos, pivot_offset):
-        self.base_vertices = base_vertices      # Lista de vértices en espacio local
-        self.triangles = triangles              # Lista de triángulos (índices)
-        self.pos = np.array(pos, dtype=float)   # Posición en espacio mundial
-        self.pivot_offset = pivot_offset.copy() # Offset para ajustar el pivot (por ejemplo, para que la base quede en y=0)
+    """
+    Objeto con malla (Mesh), posición, pivot offset y rotación en Z.
+    La geometría en espacio mundial (vértices transformados, orden de triángulos y sombra)
+    se guarda en caché y solo se recalcula cuando cambian pos, rotation_z o pivot_offset.
+    Por eso pos y pivot_offset son arreglos de solo lectura: para mover el objeto hay que
+    asignar un valor nuevo (obj.pos = ...), lo que invalida la caché.
+    """
+    def __init__(self, mesh, pos, pivot_offset):
+        self.mesh = mesh                        # Malla compartida (vértices, índices y normales)
+        self.base_vertices = mesh.vertices      # Vértices (N,3) en espacio local
+        self.triangles = mesh.indices           # Triángulos (M,3) (índices)
+        self._cache = {}                        # Geometría derivada en espacio mundial
+        self.pos = pos                          # Posición en espacio mundial
+        self.pivot_offset = pivot_offset        # Offset para ajustar el pivot (por ejemplo, para que la base quede en y=0)
         self.rotation_z = 0.0                   # Ángulo de rotación alrededor del eje Z
 
+    @staticmethod
+    def _frozen(value):
+        arr = np.array(value, dtype=float)
+        arr.flags.writeable = False
+        return arr
+
+    @property
+    def pos(self):
+        return self._pos
+
+    @pos.setter
+    def pos(self, value):
+        self._pos = self._frozen(value)
+        self._cache.clear()
+
+    @property
+    def pivot_offset(self):
+        return self._pivot_offset
+
+    @pivot_offset.setter
+    def pivot_offset(self, value):
+        self._pivot_offset = self._frozen(value)
+        self._cache.clear()
+
+    @property
+    def rotation_z(self):
+        return self._rotation_z
+
+    @rotation_z.setter
+    def rotation_z(self, value):
+        self._rotation_z = value
+        self._cache.clear()
+
+    def world_vertices(self):
+        """
+        Devuelve (desde la caché si es posible) un arreglo (N,3) de solo lectura con los
+        vértices transformados:
+            v_world = R * (v_local + pivot_offset) + pos
+        donde R es la matriz de rotación obtenida de rotation_z.
+        """
+        verts = self._cache.get("vertices")
+        if verts is None:
+            R = rotation_z(self._rotation_z)
+            verts = (self.base_vertices + self._pivot_offset) @ R.T + self._pos
+            verts.flags.writeable = False
+            self._cache["vertices"] = verts
+        return verts
+
     def get_transformed_vertices(self):
         """
         Aplica la transformación al objeto: rotación (matriz de rotación),
@@ -71,26 +113,56 @@ class GameObject:
         
         Fórmula: v_world = R * (v_local + pivot_offset) + pos
         donde R es la matriz de rotación obtenida de rotation_z.
+        Devuelve una lista de vértices (vistas de world_vertices, que está en caché).
         """
-        R = rotation_z(self.rotation_z)
-        transformed = []
-        for v in self.base_vertices:
-            local = np.dot(R, (v + self.pivot_offset))
-            world = local + self.pos
-            transformed.append(world)
-        return transformed
+        return list(self.world_vertices())
+
+    def sorted_triangles(self):
+        """Triángulos (M,3) ordenados con painter_sort_array, en caché."""
+        tris = self._cache.get("sorted")
+        if tris is None:
+            tris = self._cache["sorted"] = painter_sort_array(self.triangles, self.world_vertices())
+        return tris
+
+    def bounding_center(self):
+        """
+        Centro en espacio mundial de la esfera envolvente (el origen local de la malla,
+        R * pivot_offset + pos); su radio es mesh.radius. En caché.
+        """
+        center = self._cache.get("center")
+        if center is None:
+            center = self._cache["center"] = rotation_z(self._rotation_z) @ self._pivot_offset + self._pos
+            center.flags.writeable = False
+        return center
+
+    def world_normals(self):
+        """Normales (M,3) de las caras en espacio mundial (las de la malla rotadas), en caché."""
+        normals = self._cache.get("normals")
+        if normals is None:
+            normals = self._cache["normals"] = self.mesh.normals @ rotation_z(self._rotation_z).T
+            normals.flags.writeable = False
+        return normals
+
+    def shadow_vertices(self, light_dir):
+        """Vértices (N,3) de la sombra proyectada sobre y = 0 para light_dir, en caché."""
+        key = ("shadow", tuple(light_dir))
+        shadow = self._cache.get(key)
+        if shadow is None:
+            shadow = self._cache[key] = project_shadow_array(self.world_vertices(), light_dir)
+            shadow.flags.writeable = False
+        return shadow
 
 # Clase Player (jugador) basada en GameObject
 class Player(GameObject):
     def __init__(self, pos):
-        super().__init__(cube_vertices, cube_triangles, pos, cube_pivot_offset)
+        super().__init__(cube_mesh, pos, cube_pivot_offset)
         self.vel_y = 0.0      # Velocidad en el eje Y para saltos y gravedad
         self.on_ground = True # Bandera que indica si el jugador está en el suelo
 
 # Clase Obstacle (obstáculo, pirámide)
 class Obstacle(GameObject):
     def __init__(self, pos):
-        super().__init__(pyramid_vertices, pyramid_triangles, pos, pyramid_pivot_offset)
+        super().__init__(pyramid_mesh, pos, pyramid_pivot_offset)
         self.passed = False   # Para contar puntos una única vez al pasar
 
 # Clase Fragment (mini cubo, usado en la explosión)
@@ -0,0 +1,46 @@
+# headless_gl.py
+"""
+Contexto OpenGL sin ventana para mediciones y pruebas.
+Crea un contexto EGL "surfaceless" con un pbuffer del tamaño de la ventana del juego,
+que con Mesa corre en el rasterizador por software llvmpipe. Así el renderizador y la
+cuadrícula del piso pueden ejecutarse en servidores sin pantalla.
+
+PyOpenGL elige su plataforma al importarse por primera vez, así que create_context()
+debe llamarse antes de importar OpenGL (o cualquier módulo que lo importe, como
+renderer o render_utils).
+"""
+
+import os
+import ctypes
+from config import DISPLAY_WIDTH, DISPLAY_HEIGHT
+
+def create_context(width=DISPLAY_WIDTH, height=DISPLAY_HEIGHT):
+    """
+    Crea el contexto y lo deja activo en el hilo actual.
+    Devuelve la cadena GL_RENDERER (por ejemplo "llvmpipe (LLVM ...)").
+    """
+    os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+    os.environ.setdefault("EGL_PLATFORM", "surfaceless")
+    from OpenGL import EGL
+    from OpenGL.GL import glGetString, GL_RENDERER
+
+    display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+    major, minor = EGL.EGLint(), EGL.EGLint()
+    if not EGL.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor)):
+        raise RuntimeError("No se pudo inicializar EGL")
+    attrs = (EGL.EGLint * 13)(
+        EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+        EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8, EGL.EGL_BLUE_SIZE, 8, EGL.EGL_ALPHA_SIZE, 8,
+        EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+        EGL.EGL_NONE)
+    config = EGL.EGLConfig()
+    count = EGL.EGLint()
+    if not EGL.eglChooseConfig(display, attrs, ctypes.pointer(config), 1, ctypes.pointer(count)) or not count.value:
+        raise RuntimeError("EGL no ofrece una configuración RGBA8 con pbuffer")
+    surface = EGL.eglCreatePbufferSurface(
+        display, config, (EGL.EGLint * 5)(EGL.EGL_WIDTH, width, EGL.EGL_HEIGHT, height, EGL.EGL_NONE))
+    EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+    context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, None)
+    if not EGL.eglMakeCurrent(display, surface, surface, context):
+        raise RuntimeError("No se pudo activar el contexto EGL")
+    return glGetString(GL_RENDERER).decode()
@@ -0,0 +1,207 @@
+# input_events.py
+"""
+Entrada del teclado con baja latencia.
+Cada evento de pygame se guarda con el instante (perf_counter) en que el juego lo recibió,
+para medir cuánto tarda una pulsación en llegar a la pantalla (ver LatencyStats en
+profiler.py). Hay dos fuentes de eventos con la misma interfaz (poll() y wait_until()):
+- PolledInput lee la cola de pygame en el hilo principal. Mientras el frame espera
+  (wait_until) sigue leyendo eventos, así su instante es el de llegada y no el del
+  siguiente frame.
+- InputThread lee los eventos en un hilo propio y los deja con su instante en una deque,
+  que el hilo principal vacía sin locks (append y popleft son atómicas en CPython). SDL
+  solo garantiza el bombeo de eventos en el hilo que creó la ventana; en Linux (X11)
+  funciona desde otro hilo, en Windows y macOS no, así que ahí create_input_source usa
+  PolledInput.
+
+Controls traduce los eventos a Inputs de la simulación (SPACE salta, R reinicia, flechas
+mueven la cámara mientras están pulsadas) y recuerda el instante de cada pulsación hasta
+que un tick la usa.
+
+FramePacer (modo de baja latencia) reemplaza la espera fija hasta completar 1/60 s: en vez
+de empezar el frame justo después del anterior, espera hasta el último momento que permite terminarlo
+antes de su presentación (según el p95 del trabajo de los últimos frames), y solo entonces
+se leen las entradas y se simula. Con vsync, la pulsación ya no espera un frame entero
+entre la lectura y la pantalla.
+"""
+
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+import numpy as np
+import pygame
+from pygame.locals import QUIT, KEYDOWN, KEYUP, NOEVENT, K_ESCAPE, K_SPACE, K_r, K_LEFT, K_RIGHT, K_UP, K_DOWN
+from simulation import Inputs, CAMERA_LEFT, CAMERA_RIGHT, CAMERA_UP, CAMERA_DOWN
+from config import LOW_LATENCY_MARGIN_MS, INPUT_THREAD_WAIT_MS
+
+# Evento de pygame con el instante (perf_counter) en que se recibió.
+InputEvent = namedtuple("InputEvent", ["time", "event"])
+
+CAMERA_KEYS = {K_LEFT: CAMERA_LEFT, K_RIGHT: CAMERA_RIGHT, K_UP: CAMERA_UP, K_DOWN: CAMERA_DOWN}
+
+class PolledInput:
+    """Eventos leídos en el hilo principal, con su instante de llegada."""
+    def __init__(self):
+        self._pending = []   # Eventos recibidos durante wait_until, aún no entregados
+
+    def poll(self):
+        now = time.perf_counter()
+        events = self._pending
+        self._pending = []
+        events.extend(InputEvent(now, event) for event in pygame.event.get())
+        return events
+
+    def wait_until(self, deadline):
+        """Espera hasta 'deadline' (perf_counter) guardando los eventos que lleguen."""
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return
+            if remaining < 0.002:
+                # pygame.event.wait solo acepta milisegundos enteros: el final se duerme.
+                time.sleep(remaining)
+                return
+            event = pygame.event.wait(int(remaining * 1000) - 1)
+            if event.type != NOEVENT:
+                self._pending.append(InputEvent(time.perf_counter(), event))
+
+    def close(self):
+        pass
+
+class InputThread(threading.Thread):
+    """Hilo que espera eventos de pygame y los encola con su instante de llegada."""
+    def __init__(self, wait_ms=INPUT_THREAD_WAIT_MS):
+        super().__init__(name="input", daemon=True)
+        self.wait_ms = wait_ms
+        self._events = deque()
+        self._running = True
+        self.start()
+
+    def run(self):
+        while self._running:
+            event = pygame.event.wait(self.wait_ms)
+            if event.type != NOEVENT:
+                self._events.append(InputEvent(time.perf_counter(), event))
+
+    def poll(self):
+        events = []
+        try:
+            while True:
+                events.append(self._events.popleft())
+        except IndexError:
+            return events
+
+    def wait_until(self, deadline):
+        remaining = deadline - time.perf_counter()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def close(self):
+        self._running = False
+        self.join(timeout=1.0)
+
+def create_input_source(threaded=False):
+    """InputThread si se pide y la plataforma lo permite; si no, PolledInput."""
+    if threaded and sys.platform.startswith("linux"):
+        return InputThread()
+    if threaded:
+        print(f"Aviso: la entrada en un hilo no está disponible en {sys.platform}; se lee en el hilo principal")
+    return PolledInput()
+
+class Controls:
+    """
+    Estado de los controles a partir de los eventos. next_inputs() entrega las Inputs del
+    siguiente tick; los instantes de las pulsaciones que usa pasan a 'consumed', que
+    main.py vacía al presentar el frame para medir la latencia.
+    """
+    def __init__(self):
+        self.jump = False
+        self.restart = False
+        self.camera = 0          # Flechas mantenidas (máscara CAMERA_*)
+        self.quit = False
+        self.keys = []           # Otras teclas pulsadas (F3...), las atiende main.py
+        self.consumed = []       # Instantes de las pulsaciones ya simuladas en este frame
+        self._pending = []       # Instantes de las pulsaciones que aún no usó ningún tick
+
+    def feed(self, events):
+        for t, event in events:
+            if event.type == QUIT:
+                self.quit = True
+            elif event.type == KEYDOWN:
+                if event.key == K_ESCAPE:
+                    self.quit = True
+                elif event.key == K_SPACE:
+                    self.jump = True
+                    self._pending.append(t)
+                elif event.key == K_r:
+                    self.restart = True
+                    self._pending.append(t)
+                elif event.key in CAMERA_KEYS:
+                    self.camera |= CAMERA_KEYS[event.key]
+                    self._pending.append(t)
+                else:
+                    self.keys.append(event.key)
+            elif event.type == KEYUP and event.key in CAMERA_KEYS:
+                self.camera &= ~CAMERA_KEYS[event.key]
+
+    def next_inputs(self):
+        """Inputs del siguiente tick; el salto y el reinicio se consumen."""
+        inputs = Inputs(jump=self.jump, restart=self.restart, camera=self.camera)
+        self.jump = self.restart = False
+        self.consumed.extend(self._pending)
+        self._pending.clear()
+        return inputs
+
+    def discard(self):
+        """
+        Olvida las pulsaciones que aún no usó ningún tick (al reproducir una grabación las
+        entradas vienen de ella): no se acumulan ni cuentan en la latencia.
+        """
+        self.jump = self.restart = False
+        self._pending.clear()
+
+    def take_consumed(self):
+        consumed = self.consumed
+        self.consumed = []
+        return consumed
+
+class FramePacer:
+    """
+    Ritmo de frames de baja latencia. Los frames se presentan cada 'period' segundos;
+    wait(source) espera hasta el inicio del siguiente, calculado como su instante de
+    presentación menos el p95 del trabajo de los últimos frames y un margen.
+    El reloj de la simulación debe avanzar con next_present y no con el instante en que
+    empieza cada frame: ese inicio se mueve con la estimación, y con el paso fijo algunos
+    frames se quedarían sin tick (y sus entradas esperarían un frame más).
+    """
+    def __init__(self, fps=60, margin_ms=LOW_LATENCY_MARGIN_MS, window=120):
+        self.period = 1.0 / fps
+        self.margin = margin_ms / 1000.0
+        self._work = np.zeros(window)
+        self._count = 0
+        self.next_present = None   # Instante previsto de presentación del siguiente frame
+
+    def frame_done(self, work, present):
+        """
+        Registra el trabajo (s) del frame que se acaba de presentar en 'present'. work va
+        del inicio del frame a la llamada a flip: la espera de flip (vsync) no cuenta, o el
+        frame empezaría cada vez antes para terminar esperando en flip.
+        """
+        self._work[self._count % len(self._work)] = work
+        self._count += 1
+        if self.next_present is None:
+            self.next_present = present
+        self.next_present += self.period
+        if self.next_present < present:
+            # El frame llegó tarde: se vuelve a sincronizar en vez de encadenar frames sin espera.
+            self.next_present = present + self.period
+
+    def estimate(self):
+        """Trabajo esperado del siguiente frame (s): p95 de los últimos frames."""
+        n = min(self._count, len(self._work))
+        return float(np.percentile(self._work[:n], 95)) if n else self.period / 2
+
+    def wait(self, source):
+        if self.next_present is None:
+            return
+        source.wait_until(self.next_present - self.estimate() - self.margin)
@@ -3,43 +3,96 @@
 Archivo principal del juego.
 Aquí se inicializan Pygame y OpenGL, se carga la música de fondo, se
 configuran los módulos y se ejecuta el bucle principal del juego.
-Se importan los módulos de configuración, utilidades de renderizado y objetos del juego.
-Además, se implementa la lógica de juego:
-- Movimiento del jugador y obstáculos.
-- Sistema de puntuación y aumento de velocidad.
-- Detección de colisiones.
-- Animación de explosión (fragmentación del cubo) durante 1.5 segundos.
-- Modo Game Over con mensaje y reinicio al presionar la tecla R.
-- Control de perspectiva con las flechas.
+La lógica del juego (movimiento, puntuación, colisiones, explosión y estados)
+vive en simulation.Simulation; este archivo es un driver que:
+- Traduce el teclado a Inputs (SPACE salta, R reinicia) y avanza la simulación con un
+  paso fijo: un acumulador decide cuántos ticks tocan en cada frame, y el dibujo
+  interpola entre los dos últimos estados, así los FPS no alteran la jugabilidad.
+- Mide la latencia de cada pulsación hasta la presentación del frame (input_events.py).
+  Con --low-latency las entradas se leen justo antes de cada tick y el frame empieza lo
+  más tarde posible antes de su presentación; con --input-thread los eventos se leen en
+  un hilo propio.
+- Detiene o reinicia la música según los eventos de la simulación.
+- Controla la perspectiva con las flechas.
+- Dibuja la escena, la puntuación y el mensaje de Game Over.
+- Mide cada fase del frame con FrameProfiler: F3 muestra los percentiles en pantalla y
+  --profile-log ARCHIVO(.csv|.jsonl) guarda las muestras de cada frame.
+- Graba la semilla y las entradas de cada tick con --record ARCHIVO, o reproduce una
+  grabación a velocidad normal con --replay ARCHIVO (ver recording.py).
+- Ajusta la calidad gráfica (distancia de dibujo, sombras, densidad del piso, fragmentos
+  y refresco del HUD) para sostener 60 FPS con QualityGovernor (ver quality.py), o usa
+  un perfil fijo con --quality low|medium|high.
+- Evita los tirones del recolector de basura: lo creado en el arranque se congela
+  (gc.freeze) y durante el juego no hay recolecciones automáticas; se recolecta en los
+  cambios de estado (choque, game over, reinicio), en la espera del final del frame.
+
+Arranque: solo se inicializan los subsistemas de Pygame que se usan (video y fuentes; el
+audio lo inicializa el cargador), la fuente y la música se cargan en un hilo (assets.py)
+mientras ya se dibuja, y al mostrar el primer frame se imprime el tiempo de cada etapa.
 """
 
+import gc
+import time
+# Referencia para medir el tiempo hasta el primer frame (antes de los imports pesados).
+STARTUP_T0 = time.perf_counter()
+import sys
+import random
+import argparse
 import pygame
 from pygame.locals import *
 from OpenGL.GL import *
 from OpenGL.GLU import *
-import numpy as np
-import math, random, sys
-import time
 
 # Importar configuraciones
-from config import DISPLAY_WIDTH, DISPLAY_HEIGHT, FOV, NEAR_PLANE, FAR_PLANE, GRAVITY, JUMP_SPEED, BASE_SPEED, FLOOR_LIMIT, CAMERA_OFFSET
+from config import (DISPLAY_WIDTH, DISPLAY_HEIGHT, FOV, NEAR_PLANE, FAR_PLANE, FLOOR_LIMIT, MAX_TICKS_PER_FRAME,
+                    GC_MAX_PENDING)
 # Importar funciones de renderizado
-from render_utils import draw_text, rotation_z, backface_cull, painter_sort, draw_object, project_shadow, draw_floor_lines
-# Importar objetos del juego
-from game_objects import Player, Obstacle, create_fragments_from_player, cube_triangles
+from render_utils import draw_text, FloorGrid
+# Renderizador por lotes (un buffer por frame, un glDrawArrays por capa)
+from renderer import BatchRenderer
+# Lógica del juego sin ventana y construcción de la escena a partir de su estado
+from simulation import Simulation, TICK_DT
+from scene import build_scene
+from frustum import Frustum
+# Perfilador de fases del frame y tiempos de arranque
+from profiler import FrameProfiler, StartupTimer, LatencyStats
+# Entrada con instantes de llegada y ritmo de frames de baja latencia
+from input_events import create_input_source, Controls, FramePacer
+# Fuente y música cargadas en segundo plano
+from assets import AssetLoader
+# Perfiles de calidad y control adaptativo del tiempo de frame
+from quality_presets import PRESETS, preset_level
+from quality import QualityGovernor
 
-pygame.init()
+parser = argparse.ArgumentParser(description="3D Runner")
+parser.add_argument("--profile-log", help="Archivo .csv o .jsonl donde guardar los tiempos de cada frame")
+parser.add_argument("--record", help="Graba la semilla y las entradas de la partida en este archivo")
+parser.add_argument("--replay", help="Reproduce una grabación en lugar de leer el teclado")
+parser.add_argument("--quality", default="auto", choices=("auto",) + tuple(p.name for p in PRESETS),
+                    help="Perfil de calidad fijo, o 'auto' para ajustarlo según el tiempo de frame")
+parser.add_argument("--low-latency", action="store_true",
+                    help="Lee las entradas antes de cada tick y empieza cada frame lo más tarde posible")
+parser.add_argument("--input-thread", action="store_true", help="Lee los eventos del teclado en un hilo propio")
+args = parser.parse_args()
+startup = StartupTimer(STARTUP_T0)
+startup.mark("imports")
 
-# --- Música de fondo ---
-# Inicializa el mezclador de audio y reproduce Music.mp3 en bucle.
-pygame.mixer.init()
-pygame.mixer.music.load("Music.mp3")
-pygame.mixer.music.play(-1)
+# En vez de pygame.init() (que abre todos los subsistemas, incluidos joystick y audio)
+# se inicializan solo el video y las fuentes; el mezclador lo abre el cargador.
+pygame.display.init()
+pygame.font.init()
+
+# --- Fuente y música de fondo ---
+# Se cargan en un hilo; la música (Music.mp3 en bucle) empieza en cuanto esté lista.
+assets = AssetLoader()
+assets.start()
+music = assets.music
+music.play()
 
 # Configuración de la ventana
 display = (DISPLAY_WIDTH, DISPLAY_HEIGHT)
 pygame.display.set_mode(display, DOUBLEBUF | OPENGL)
-clock = pygame.time.Clock()
+startup.mark("window")
 
 # Configurar la proyección en OpenGL
 glMatrixMode(GL_PROJECTION)
@@ -50,166 +103,209 @@ glDisable(GL_DEPTH_TEST)
 glEnable(GL_BLEND)
 glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
 
-# Fuente para dibujar textos
-font = pygame.font.SysFont("Arial", 24)
-
-# --- Variables globales de juego ---
-score = 0
-high_score = 0
-player = Player(pos=[0, 0, 0])
-obstacles = []
-PLAYER_SPEED = BASE_SPEED
-# La cámara se controla mediante este offset relativo al jugador.
-camera_offset = np.array(CAMERA_OFFSET, dtype=float)
-
-# Estados del juego:
-# "running": juego en curso.
-# "exploding": animación de explosión (fragmentación) activa (duración 1.5 s).
-# "game_over": estado final, pantalla congelada y mensaje.
-state = "running"
-explosion_start_time = None
-fragments = []
-
-def spawn_obstacles_in_range(start_x, end_x):
-    """
-    Genera obstáculos (pirámides) en el eje X desde start_x hasta end_x,
-    separadas aleatoriamente entre 5 y 10 unidades.
-    """
-    x = start_x
-    while x > end_x:
-        obstacles.append(Obstacle(pos=[x, 0, 0]))
-        x -= random.randint(5, 10)
-
-# Generar bloque inicial de obstáculos desde -30 hasta -300.
-spawn_obstacles_in_range(-30, -300)
-current_end_x = -300
-
-# Dirección de la luz (para las sombras)
-light_dir = np.array([0.5, -1, 0.5], dtype=float)
-light_dir /= np.linalg.norm(light_dir)
+# Renderizador por lotes (necesita el contexto OpenGL ya creado)
+renderer = BatchRenderer()
+# Calidad gráfica: el control adaptativo empieza en el perfil más alto y baja si no llega.
+governor = QualityGovernor() if args.quality == "auto" else None
+quality = governor.preset if governor else PRESETS[preset_level(args.quality)]
+# Cuadrícula del piso cacheada que sigue al jugador
+floor_grid = FloorGrid(FLOOR_LIMIT, quality.floor_spacing)
+startup.mark("gl")
+
+# --- Estado del juego ---
+# La semilla se elige al azar (o se toma de la grabación) para poder reproducir la partida.
+# recording solo se importa si se graba o se reproduce.
+replay = recorder = None
+if args.replay or args.record:
+    from recording import InputRecorder, InputPlayer, load_recording
+    replay = InputPlayer(load_recording(args.replay)) if args.replay else None
+seed = replay.recording.seed if replay else random.SystemRandom().getrandbits(63)
+# Una grabación se reproduce con su propio paso, igual que en recording.replay.
+tick_dt = 1.0 / replay.recording.tick_rate if replay else TICK_DT
+# Los bloques de la pista se generan en un hilo de fondo, fuera del frame.
+sim = Simulation(seed=seed, threaded_chunks=True)
+if args.record:
+    recorder = InputRecorder(args.record, seed)
+startup.mark("simulation")
+
+# Perfilador: mide cada fase del frame; F3 activa el overlay con los percentiles.
+profiler = FrameProfiler(log_path=args.profile_log)
+sim.profiler = profiler
+renderer.profiler = profiler
+show_profiler = False
+profiler_lines = []
+# Textos del HUD: se recalculan cada quality.hud_interval frames o al cambiar de estado.
+hud_lines = []
+hud_state = None
+# Entrada: eventos con su instante de llegada y latencia hasta la presentación.
+input_source = create_input_source(args.input_thread)
+controls = Controls()
+latency = LatencyStats()
+pacer = FramePacer() if args.low_latency else None
+FRAME_PERIOD = 1.0 / 60
+
+def quit_game():
+    input_source.close()
+    print(latency.report_line())
+    profiler.close()
+    if recorder:
+        recorder.close(sim)
+    pygame.quit(); sys.exit()
+
+# Recolector de basura: los objetos del arranque (módulos, mallas, estado de OpenGL) no
+# cambian, así que se congelan y las recolecciones ya no los recorren. En el bucle el frame
+# casi no crea objetos seguidos por el recolector, y las recolecciones se hacen a mano en
+# los cambios de estado (collect_garbage), donde un tirón no se nota.
+gc.collect()
+gc.freeze()
+gc.disable()
+collect_garbage = False
+
+# Acumulador del paso fijo: tiempo real todavía no simulado (en segundos).
+accumulator = 0.0
+last_time = time.perf_counter()
 
 # --- Bucle principal del juego ---
 while True:
-    dt = clock.get_time() / 1000.0  # dt en segundos.
-    for event in pygame.event.get():
-        if event.type == QUIT:
-            pygame.quit(); sys.exit()
-        elif event.type == KEYDOWN:
-            if event.key == K_ESCAPE:
-                pygame.quit(); sys.exit()
-            # En estado "running", la tecla SPACE permite saltar.
-            if state == "running":
-                if event.key == K_SPACE and player.on_ground:
-                    player.vel_y = JUMP_SPEED
-                    player.on_ground = False
-            # En estado "exploding" o "game_over", la tecla R reinicia el juego.
-            if state in ["exploding", "game_over"] and event.key == K_r:
-                if score > high_score:
-                    high_score = score
-                score = 0
-                PLAYER_SPEED = BASE_SPEED
-                player = Player(pos=[0, 0, 0])
-                obstacles = []
-                spawn_obstacles_in_range(-30, -300)
-                current_end_x = -300
-                state = "running"
-                fragments = []
-                # Reinicia la música desde el inicio.
-                pygame.mixer.music.play(-1)
-    # Permitir cambiar la perspectiva con las flechas (modifica camera_offset)
-    keys = pygame.key.get_pressed()
-    if keys[K_LEFT]:
-        camera_offset[0] -= 0.2
-    if keys[K_RIGHT]:
-        camera_offset[0] += 0.2
-    if keys[K_UP]:
-        camera_offset[1] += 0.2
-    if keys[K_DOWN]:
-        camera_offset[1] -= 0.2
-
-    # --- Lógica del juego según el estado ---
-    if state == "running":
-        # La velocidad del jugador aumenta con el score:
-        PLAYER_SPEED = BASE_SPEED + (score / 5000.0)
-        player.pos[0] -= PLAYER_SPEED  # Movimiento hacia la izquierda.
-        # Actualizar salto y gravedad:
-        if not player.on_ground:
-            player.vel_y -= GRAVITY
-        player.pos[1] += player.vel_y
-        if player.pos[1] < 0:
-            player.pos[1] = 0
-            player.vel_y = 0
-            player.on_ground = True
-            # Ajustar la rotación a un múltiplo de 90° (para que el cubo "asiente" su orientación)
-            player.rotation_z = round(player.rotation_z / (math.pi/2)) * (math.pi/2)
-        if not player.on_ground:
-            player.rotation_z += 0.1
-        # Sumar puntos: cada obstáculo que el jugador pasa sin colisionar (se suma 10 puntos).
-        for obs in obstacles:
-            if not obs.passed and player.pos[0] < obs.pos[0]:
-                score += 10
-                obs.passed = True
-        # Generar más obstáculos dinámicamente si el jugador se acerca al final del rango.
-        if player.pos[0] < (current_end_x + 20):
-            new_end_x = current_end_x - 100
-            spawn_obstacles_in_range(current_end_x, new_end_x)
-            current_end_x = new_end_x
-        # Comprobar colisiones: si el jugador colisiona con algún obstáculo...
-        for obs in obstacles:
-            if abs(player.pos[0] - obs.pos[0]) < 0.6 and abs(player.pos[1] - obs.pos[1]) < 0.6:
-                # Detener la música al colisionar.
-                pygame.mixer.music.stop()
-                # Se inicia la animación de explosión (fragmentación del cubo).
-                explosion_start_time = pygame.time.get_ticks()
-                fragments = create_fragments_from_player(player)
-                state = "exploding"
-                break
-    elif state == "exploding":
-        current_time = pygame.time.get_ticks()
-        elapsed = current_time - explosion_start_time
-        if elapsed < 1500:
-            # Actualizar cada fragmento: se aplican las fórmulas de movimiento y gravedad.
-            for frag in fragments:
-                frag.update(dt, GRAVITY)
+    profiler.begin_frame()
+    now = time.perf_counter()
+    # En baja latencia la simulación avanza hasta la presentación prevista del frame.
+    frame_time = pacer.next_present if pacer and pacer.next_present is not None else now
+    accumulator += frame_time - last_time
+    last_time = frame_time
+    # SPACE salta (en "running"), R reinicia (en "exploding" o "game_over") y las flechas
+    # mantenidas desplazan el offset de la cámara en cada tick.
+    controls.feed(input_source.poll())
+    if controls.quit:
+        quit_game()
+    if replay:
+        # Al reproducir, el teclado solo sirve para salir y para F3.
+        controls.discard()
+    for key in controls.keys:
+        if key == K_F3:
+            show_profiler = not show_profiler
+    controls.keys.clear()
+    profiler.mark("events")
+
+    # --- Lógica del juego (paso fijo) ---
+    ticks = 0
+    while accumulator >= tick_dt and ticks < MAX_TICKS_PER_FRAME:
+        if replay:
+            if replay.finished:
+                if replay.recording.digest is None:
+                    print("Reproducción terminada: la grabación no tiene huella para comprobar el estado")
+                else:
+                    ok = sim.state_digest() == replay.recording.digest
+                    print("Reproducción terminada: " + ("estado idéntico a la grabación" if ok else "el estado DIFIERE de la grabación"))
+                quit_game()
+            inputs = replay.next_inputs()
         else:
-            # Después de 1.5 segundos, se pasa a estado game_over y se congela la pantalla.
-            state = "game_over"
-    elif state == "game_over":
-        # No se actualizan posiciones; se muestra el mensaje.
-        pass
+            if pacer and ticks:
+                # Baja latencia: lo que llegó durante el tick anterior entra en este.
+                controls.feed(input_source.poll())
+            inputs = controls.next_inputs()
+        if recorder:
+            recorder.record(inputs)
+        events = sim.step(inputs, tick_dt)
+        accumulator -= tick_dt
+        ticks += 1
+        if "collision" in events:
+            # Detener la música al colisionar.
+            music.stop()
+        if "restart" in events:
+            # Reinicia la música desde el inicio.
+            music.play()
+        if any(event != "jump" for event in events):
+            # Todos los eventos salvo el salto son cambios de estado.
+            collect_garbage = True
+    music.poll()
+    if ticks == MAX_TICKS_PER_FRAME:
+        # Tras un frame muy lento se descarta el atraso para no entrar en espiral.
+        accumulator = min(accumulator, tick_dt)
+    # Fracción del siguiente tick ya transcurrida, para interpolar el dibujo.
+    alpha = accumulator / tick_dt
 
     # --- Renderizado ---
+    player = sim.interpolated_player(alpha)
     glLoadIdentity()
     # La cámara se posiciona en player.pos + camera_offset.
-    cam_pos = player.pos + camera_offset
+    cam_pos = player.pos + sim.camera_offset
     gluLookAt(cam_pos[0], cam_pos[1], cam_pos[2],
               player.pos[0], player.pos[1], player.pos[2],
               0, 1, 0)
+    # El mismo frustum que gluPerspective/gluLookAt, para descartar lo que no se ve.
+    # Su plano lejano es la distancia de dibujo del perfil de calidad.
+    frustum = Frustum(cam_pos, player.pos, far=quality.draw_distance)
     glClearColor(0.5, 0.8, 1.0, 1.0)
     glClear(GL_COLOR_BUFFER_BIT)
-    draw_floor_lines(FLOOR_LIMIT)
-    if state == "running":
-        p_verts = player.get_transformed_vertices()
-        vis_p = backface_cull(player.triangles, p_verts, cam_pos)
-        sorted_p = painter_sort(vis_p, p_verts)
-        draw_object(p_verts, sorted_p, (0, 0.5, 1, 1))
-        shadow_p = [project_shadow(v, light_dir) for v in p_verts]
-        draw_object(shadow_p, sorted_p, (0, 0, 0, 0.5))
-    elif state in ["exploding", "game_over"]:
-        for frag in fragments:
-            frag_verts = frag.get_transformed_vertices()
-            sorted_frag = painter_sort(cube_triangles, frag_verts)
-            draw_object(frag_verts, sorted_frag, (0, 0.5, 1, 1))
-    for obs in obstacles:
-        o_verts = obs.get_transformed_vertices()
-        sorted_o = painter_sort(obs.triangles, o_verts)
-        draw_object(o_verts, sorted_o, (1, 0, 0, 1))
-        shadow_o = [project_shadow(v, light_dir) for v in o_verts]
-        draw_object(shadow_o, sorted_o, (0, 0, 0, 0.4))
-    if state == "game_over":
-        draw_text(10, display[1]-30, f"Game Over! P: {score}   R: {high_score}", font)
-        draw_text(10, display[1]-60, "Reinica con [R]", font)
-    if state == "running":
-        draw_text(10, display[1]-30, f"Puntuación: {score}   Record: {high_score}", font)
+    floor_grid.draw(player.pos, cam_pos)
+    profiler.mark("draw")
+    # Todos los triángulos del frame se acumulan en el renderizador por lotes
+    # y se envían juntos al final con un glDrawArrays por capa.
+    # La capa de cuerpos se ordena para toda la escena según la profundidad en espacio
+    # de vista, así que aquí los triángulos se añaden sin ordenar.
+    renderer.begin_frame(cam_pos, player.pos)
+    build_scene(renderer, sim, cam_pos, alpha=alpha, frustum=frustum,
+                shadows=quality.shadows, fragment_stride=quality.fragment_stride)
+    profiler.mark("scene")
+    renderer.flush()
+    if profiler.frames % quality.hud_interval == 0 or hud_state != sim.state:
+        hud_state = sim.state
+        if sim.state == "game_over":
+            hud_lines = [f"Game Over! P: {sim.score}   R: {sim.high_score}", "Reinica con [R]"]
+        elif sim.state == "running":
+            hud_lines = [f"Puntuación: {sim.score}   Record: {sim.high_score}"]
+        else:
+            hud_lines = []
+    # Mientras el cargador no termina no hay fuente y el HUD no se dibuja.
+    font = assets.font
+    if font:
+        for i, line in enumerate(hud_lines):
+            draw_text(10, display[1] - 30 - 30 * i, line, font)
+    if font and show_profiler:
+        # Los percentiles se recalculan dos veces por segundo para que el overlay sea barato.
+        if profiler.frames % 30 == 0 or not profiler_lines:
+            profiler_lines = profiler.report_lines()
+            profiler_lines.append(governor.status() if governor else f"calidad {quality.name} (fija)")
+            profiler_lines.append(latency.report_line())
+        for i, line in enumerate(profiler_lines):
+            draw_text(10, display[1] - 100 - 22 * i, line, font)
+    profiler.mark("hud")
+    flip_start = time.perf_counter()
     pygame.display.flip()
-    clock.tick(60)
+    present = time.perf_counter()
+    latency.add(controls.take_consumed(), present)
+    profiler.mark("flip")
+    if startup:
+        # Informe de arranque: primer frame en pantalla y, cuando terminen, los recursos.
+        if not startup.has_mark("first_frame"):
+            startup.mark("first_frame")
+            print(startup.report())
+        if assets.done.is_set():
+            startup.mark("assets")
+            print(f"Recursos listos a los {startup.elapsed('assets') * 1000:.0f} ms "
+                  f"(fuente {assets.timings['font'] * 1000:.0f} ms, música {assets.timings['music'] * 1000:.0f} ms)")
+            for error in assets.errors:
+                print(f"Aviso: {error}")
+            startup = None
+    # Tiempo de trabajo del frame para el control de calidad: hasta la llamada a flip, porque
+    # con vsync flip espera al refresco y cada frame mediría ~16,6 ms aunque sobre margen.
+    if governor and governor.update((flip_start - now) * 1000):
+        quality = governor.preset
+        floor_grid.set_spacing(quality.floor_spacing)
+    # Recolección fuera del trabajo del frame: en los cambios de estado o, como red de
+    # seguridad, si se acumulan demasiados objetos pendientes.
+    if collect_garbage or gc.get_count()[0] > GC_MAX_PENDING:
+        gc.collect()
+        collect_garbage = False
+    if pacer:
+        # En vez de dormir hasta completar el frame, se espera hasta el último momento que
+        # permite terminar el siguiente a tiempo (recogiendo los eventos que lleguen).
+        pacer.frame_done(flip_start - now, present)
+        pacer.wait(input_source)
+    else:
+        # Igual que clock.tick(60), pero los eventos que llegan mientras tanto se reciben
+        # (y se fechan) en el momento.
+        input_source.wait_until(now + FRAME_PERIOD)
+    profiler.mark("idle")
+    profiler.end_frame()
@@ -0,0 +1,159 @@
+# mesh.py
+"""
+Mallas del juego en un formato binario compacto.
+Cada malla es un archivo .mesh con arreglos contiguos listos para NumPy, de modo que se
+carga con memoria mapeada (mmap) sin analizar nada y sin copias: los arreglos del Mesh
+son vistas de solo lectura sobre el archivo, compartidas por todos los objetos.
+
+Formato (little endian):
+- Cabecera: MAGIC (4 bytes), versión (uint16), bytes por índice (uint16, 2 o 4),
+  número de vértices (uint32), número de triángulos (uint32) y la caja envolvente
+  (mínimo y máximo, 6 float32).
+- Vértices (N,3) float32.
+- Normales de cada cara (M,3) float32, unitarias.
+- Índices de los triángulos (M,3) uint16 (o uint32 si hay más de 65535 vértices).
+Todas las secciones quedan alineadas a 4 bytes.
+
+Las mallas incluidas (cubo y pirámide) están definidas en BUILTIN_SOURCES; para
+regenerar sus archivos en MESH_DIR:
+    python mesh.py build
+Para ver el contenido de un archivo:
+    python mesh.py info meshes/pyramid.mesh
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import numpy as np
+from config import MESH_DIR
+
+MAGIC = b"R3DM"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII6f")
+
+# Definición de las mallas incluidas, sin escalar (la escala se aplica al cargarlas).
+BUILTIN_SOURCES = {
+    "cube": (
+        [(-0.5, -0.5, -0.5), ( 0.5, -0.5, -0.5), ( 0.5,  0.5, -0.5), (-0.5,  0.5, -0.5),
+         (-0.5, -0.5,  0.5), ( 0.5, -0.5,  0.5), ( 0.5,  0.5,  0.5), (-0.5,  0.5,  0.5)],
+        [(0,1,2), (0,2,3),
+         (4,6,5), (4,7,6),
+         (4,5,1), (4,1,0),
+         (5,6,2), (5,2,1),
+         (6,7,3), (6,3,2),
+         (7,4,0), (7,0,3)],
+    ),
+    "pyramid": (
+        [(0, 1, 0),          # Vértice superior (apex)
+         (-1, -1, 1), (1, -1, 1), (1, -1, -1), (-1, -1, -1)],
+        [(0,1,2), (0,2,3), (0,3,4), (0,4,1),
+         (1,2,3), (1,3,4)],
+    ),
+}
+
+def face_normals(vertices, indices):
+    """Normales unitarias (M,3) de los triángulos, con la orientación de su winding."""
+    v = np.asarray(vertices, dtype=float)
+    idx = np.asarray(indices)
+    normal = np.cross(v[idx[:, 1]] - v[idx[:, 0]], v[idx[:, 2]] - v[idx[:, 0]])
+    length = np.linalg.norm(normal, axis=1, keepdims=True)
+    return normal / np.where(length > 0, length, 1)
+
+class Mesh:
+    """
+    Malla de triángulos: vertices (N,3) float32, indices (M,3) uint16/uint32, normals (M,3)
+    float32 con la normal de cada cara, y la caja envolvente bounds_min/bounds_max.
+    radius es el radio de la esfera centrada en el origen local que contiene la malla.
+    """
+    def __init__(self, vertices, indices, normals=None, bounds=None):
+        vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+        indices = np.asarray(indices)
+        if indices.dtype not in (np.uint16, np.uint32):
+            indices = indices.astype(np.uint16 if len(vertices) <= 0xFFFF else np.uint32)
+        self.vertices = vertices
+        self.indices = indices.reshape(-1, 3)
+        if normals is None:
+            normals = face_normals(self.vertices, self.indices)
+        self.normals = np.asarray(normals, dtype=np.float32).reshape(-1, 3)
+        if bounds is None:
+            bounds = (self.vertices.min(axis=0), self.vertices.max(axis=0))
+        self.bounds_min = np.asarray(bounds[0], dtype=np.float32)
+        self.bounds_max = np.asarray(bounds[1], dtype=np.float32)
+        self.radius = float(np.linalg.norm(self.vertices, axis=1).max())
+
+    def __len__(self):
+        return len(self.indices)
+
+    def scaled(self, factor):
+        """
+        Copia de la malla escalada uniformemente (las normales no cambian).
+        Con factor 1 devuelve la propia malla, sin copiar sus arreglos.
+        """
+        if factor == 1:
+            return self
+        return Mesh(self.vertices * np.float32(factor), self.indices, self.normals,
+                    (self.bounds_min * factor, self.bounds_max * factor))
+
+def save_mesh(path, mesh):
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, mesh.indices.itemsize, len(mesh.vertices), len(mesh.indices),
+                            *mesh.bounds_min, *mesh.bounds_max))
+        f.write(np.ascontiguousarray(mesh.vertices, dtype="<f4").tobytes())
+        f.write(np.ascontiguousarray(mesh.normals, dtype="<f4").tobytes())
+        f.write(np.ascontiguousarray(mesh.indices, dtype=mesh.indices.dtype.newbyteorder("<")).tobytes())
+
+def load_mesh(path):
+    """
+    Carga un archivo .mesh con memoria mapeada. Los arreglos devueltos son de solo
+    lectura y mantienen vivo el mapeo mientras se usen.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < HEADER.size:
+            raise ValueError(f"{path} no es una malla válida (versión {VERSION})")
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, index_size, n_vertices, n_triangles, *bounds = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION or index_size not in (2, 4):
+        raise ValueError(f"{path} no es una malla válida (versión {VERSION})")
+    index_dtype = np.dtype("<u2" if index_size == 2 else "<u4")
+    offset = HEADER.size
+    expected = offset + 4 * 3 * (n_vertices + n_triangles) + index_size * 3 * n_triangles
+    if size != expected:
+        raise ValueError(f"{path} está truncado o dañado ({size} bytes, se esperaban {expected})")
+
+    vertices = np.frombuffer(data, dtype="<f4", count=3 * n_vertices, offset=offset).reshape(-1, 3)
+    offset += vertices.nbytes
+    normals = np.frombuffer(data, dtype="<f4", count=3 * n_triangles, offset=offset).reshape(-1, 3)
+    offset += normals.nbytes
+    indices = np.frombuffer(data, dtype=index_dtype, count=3 * n_triangles, offset=offset).reshape(-1, 3)
+    return Mesh(vertices, indices, normals, (bounds[:3], bounds[3:]))
+
+def builtin_mesh(name, scale=1.0):
+    """Carga una de las mallas de MESH_DIR (por ejemplo 'cube') con la escala indicada."""
+    return load_mesh(os.path.join(MESH_DIR, name + ".mesh")).scaled(scale)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera o inspecciona archivos de malla .mesh")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Escribe las mallas incluidas en el directorio de mallas")
+    build.add_argument("-o", "--output", default=MESH_DIR)
+    info = commands.add_parser("info", help="Muestra el contenido de un archivo .mesh")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        os.makedirs(args.output, exist_ok=True)
+        for name, (vertices, indices) in BUILTIN_SOURCES.items():
+            path = os.path.join(args.output, name + ".mesh")
+            save_mesh(path, Mesh(vertices, indices))
+            print(f"{path}: {len(vertices)} vértices, {len(indices)} triángulos, {os.path.getsize(path)} bytes")
+        return 0
+    mesh = load_mesh(args.path)
+    print(f"{len(mesh.vertices)} vértices, {len(mesh)} triángulos (índices {mesh.indices.dtype})")
+    print(f"Caja envolvente {mesh.bounds_min} - {mesh.bounds_max}, radio {mesh.radius:.3f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
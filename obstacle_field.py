@@ -0,0 +1,214 @@
+# obstacle_field.py
+"""
+Obstáculos de la pista como estructura de arreglos.
+ObstacleField guarda todos los obstáculos activos en arreglos contiguos de NumPy, en el
+orden de la pista (X descendente):
+- pos (N,3): posición de cada obstáculo. Es una vista de un arreglo (3,capacidad), así que
+  la columna x es contigua y las búsquedas por X la recorren sin copiarla.
+- kind (N,) uint8: tipo de obstáculo, índice en 'kinds' (OBSTACLE_KINDS: malla y pivot offset).
+- passed (N,) bool: si el jugador ya lo pasó (para contar puntos una única vez).
+Cada obstáculo ocupa 26 bytes, frente a los cientos de un objeto Obstacle con su
+posición, su pivot offset, sus atributos y su caché.
+
+Los arreglos son un buffer con una ventana activa [start, end): los obstáculos nuevos se
+añaden al final y los que quedan atrás se descartan por delante moviendo start, sin
+copiar nada; solo cuando el buffer se llena se compacta (o se amplía).
+
+La geometría de muchos obstáculos se calcula con una sola operación vectorizada
+(world_vertices, bounding_centers, shadow_vertices). Los obstáculos no giran: sus vértices
+en espacio mundial son los de la malla más pivot_offset más pos, y sus normales son las
+de la malla.
+
+ObstacleView es una vista ligera (con __slots__) de un obstáculo con la interfaz de
+GameObject, para el código que trabaja con objetos sueltos (la explosión, las consultas de
+los bots). Apunta a una posición del campo, así que solo es válida hasta que el campo cambie.
+"""
+
+import numpy as np
+from transforms import project_shadow_array
+from game_objects import OBSTACLE_KINDS
+
+class ObstacleField:
+    def __init__(self, kinds=OBSTACLE_KINDS, capacity=64):
+        self.kinds = kinds
+        # Vértices locales de cada tipo con el pivot offset ya aplicado (en float64).
+        self._local = [kind.mesh.vertices + kind.pivot_offset for kind in kinds]
+        self._start = 0
+        self._end = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """Reserva (o amplía) los arreglos, dejando los obstáculos activos al principio."""
+        n = len(self)
+        pos = np.zeros((3, capacity))
+        kind = np.zeros(capacity, dtype=np.uint8)
+        passed = np.zeros(capacity, dtype=bool)
+        if n:
+            pos[:, :n] = self._pos[:, self._start:self._end]
+            kind[:n] = self._kind[self._start:self._end]
+            passed[:n] = self._passed[self._start:self._end]
+        self._pos, self._kind, self._passed = pos, kind, passed
+        self._start, self._end = 0, n
+
+    def _compact(self):
+        """Mueve los obstáculos activos al principio del buffer (sin reservar memoria)."""
+        start, end = self._start, self._end
+        n = end - start
+        self._pos[:, :n] = self._pos[:, start:end]
+        self._kind[:n] = self._kind[start:end]
+        self._passed[:n] = self._passed[start:end]
+        self._start, self._end = 0, n
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def capacity(self):
+        return len(self._kind)
+
+    @property
+    def pos(self):
+        return self._pos[:, self._start:self._end].T
+
+    @property
+    def x(self):
+        return self._pos[0, self._start:self._end]
+
+    @property
+    def kind(self):
+        return self._kind[self._start:self._end]
+
+    @property
+    def passed(self):
+        return self._passed[self._start:self._end]
+
+    def nbytes(self):
+        """Memoria reservada por los arreglos del campo."""
+        return self._pos.nbytes + self._kind.nbytes + self._passed.nbytes
+
+    # --- Modificación ---
+
+    def clear(self):
+        self._start = self._end = 0
+
+    def extend(self, xs, kind=0, y=0.0, z=0.0):
+        """Añade al final obstáculos del tipo 'kind' en las posiciones X dadas (en orden de pista)."""
+        xs = np.asarray(xs, dtype=float)
+        count = len(xs)
+        if self._end + count > self.capacity:
+            n = len(self)
+            if n + count <= self.capacity // 2:
+                # Sobra espacio por delante: basta con mover los activos al principio.
+                self._compact()
+            else:
+                self._allocate(max(2 * self.capacity, n + count))
+        end = self._end + count
+        self._pos[0, self._end:end] = xs
+        self._pos[1, self._end:end] = y
+        self._pos[2, self._end:end] = z
+        self._kind[self._end:end] = kind
+        self._passed[self._end:end] = False
+        self._end = end
+
+    def drop_front(self, count):
+        """Descarta los 'count' primeros obstáculos (los que quedaron atrás)."""
+        self._start += count
+        if self._start == self._end:
+            self._start = self._end = 0
+
+    def remove(self, index):
+        """Retira el obstáculo 'index', desplazando los siguientes para conservar el orden."""
+        i = self._start + index
+        self._pos[:, i:self._end - 1] = self._pos[:, i + 1:self._end]
+        self._kind[i:self._end - 1] = self._kind[i + 1:self._end]
+        self._passed[i:self._end - 1] = self._passed[i + 1:self._end]
+        self._end -= 1
+
+    # --- Geometría vectorizada ---
+
+    def kind_groups(self, start=0, stop=None):
+        """
+        Agrupa los obstáculos [start, stop) por tipo: lista de (tipo, índices). Con un solo
+        tipo (el caso habitual) es un único grupo sin recorrer los tipos uno a uno.
+        """
+        kinds = self.kind[start:stop]
+        if len(kinds) == 0:
+            return []
+        indices = np.arange(start, start + len(kinds))
+        first = kinds[0]
+        if (kinds == first).all():
+            return [(int(first), indices)]
+        return [(int(k), indices[kinds == k]) for k in np.unique(kinds)]
+
+    def world_vertices(self, indices, kind):
+        """Vértices (K,N,3) en espacio mundial de los obstáculos 'indices', todos del tipo 'kind'."""
+        return self._local[kind] + self.pos[indices][:, None, :]
+
+    def bounding_centers(self, indices, kind):
+        """Centros (K,3) de las esferas envolventes (radio: la de la malla del tipo)."""
+        return self.pos[indices] + self.kinds[kind].pivot_offset
+
+    def shadow_vertices(self, indices, kind, light_dir):
+        """Vértices (K,N,3) de las sombras proyectadas sobre y = 0 para light_dir."""
+        return project_shadow_array(self.world_vertices(indices, kind), light_dir)
+
+    def view(self, index):
+        return ObstacleView(self, index)
+
+class ObstacleView:
+    """Un obstáculo del campo visto como objeto (la interfaz de lectura de GameObject)."""
+    __slots__ = ("field", "index")
+    rotation_z = 0.0
+
+    def __init__(self, field, index):
+        self.field = field
+        self.index = index
+
+    @property
+    def kind(self):
+        return int(self.field.kind[self.index])
+
+    @property
+    def mesh(self):
+        return self.field.kinds[self.kind].mesh
+
+    @property
+    def base_vertices(self):
+        return self.mesh.vertices
+
+    @property
+    def triangles(self):
+        return self.mesh.indices
+
+    @property
+    def pivot_offset(self):
+        return self.field.kinds[self.kind].pivot_offset
+
+    @property
+    def pos(self):
+        pos = self.field.pos[self.index]
+        pos.flags.writeable = False
+        return pos
+
+    @property
+    def passed(self):
+        return bool(self.field.passed[self.index])
+
+    @passed.setter
+    def passed(self, value):
+        self.field.passed[self.index] = value
+
+    def world_vertices(self):
+        return self.field.world_vertices([self.index], self.kind)[0]
+
+    def get_transformed_vertices(self):
+        return list(self.world_vertices())
+
+    def bounding_center(self):
+        return self.field.bounding_centers([self.index], self.kind)[0]
+
+    def world_normals(self):
+        return self.mesh.normals
+
+    def shadow_vertices(self, light_dir):
+        return self.field.shadow_vertices([self.index], self.kind, light_dir)[0]
@@ -0,0 +1,180 @@
+# particles.py
+"""
+Sistema de partículas para la animación de explosión.
+En vez de un objeto Fragment por mini cubo, todos los fragmentos se guardan como
+arreglos contiguos de NumPy (estructura de arreglos):
+- pos (N,3), vel (N,3): posición y velocidad de cada fragmento.
+- angle (N,), angular_vel (N,): rotación alrededor del eje Z y su velocidad.
+- size (N,3): dimensiones de cada mini cubo.
+- color (N,4): color RGBA de cada fragmento.
+La integración y la transformación de vértices se hacen con unas pocas operaciones
+vectorizadas sobre todos los fragmentos a la vez.
+"""
+
+import math
+import numpy as np
+from transforms import rotation_z
+from game_objects import cube_mesh
+from config import CUBE_SCALE
+
+# Cubo unitario centrado en el origen; cada fragmento lo escala con su 'size'.
+unit_cube_vertices = cube_mesh.vertices.astype(float) / CUBE_SCALE
+unit_cube_triangles = cube_mesh.indices.astype(int)
+# Normales de sus caras: el escalado por ejes no cambia su dirección, solo la rotación.
+unit_cube_normals = cube_mesh.normals.astype(float)
+
+class ParticleSystem:
+    def __init__(self, capacity=64):
+        self.count = 0
+        self._vertices = np.empty((0,) + unit_cube_vertices.shape)   # Ver vertex_buffer
+        self._normals = np.empty((0,) + unit_cube_normals.shape)     # Ver normal_buffer
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """Reserva (o amplía) los arreglos conservando los fragmentos actuales."""
+        n = self.count
+        old = getattr(self, "pos", None)
+        arrays = {
+            "pos": np.zeros((capacity, 3)),
+            "vel": np.zeros((capacity, 3)),
+            "angle": np.zeros(capacity),
+            "angular_vel": np.zeros(capacity),
+            "size": np.zeros((capacity, 3)),
+            "color": np.zeros((capacity, 4)),
+        }
+        for name, arr in arrays.items():
+            if old is not None:
+                arr[:n] = getattr(self, "_" + name)[:n]
+            setattr(self, "_" + name, arr)
+        self.capacity = capacity
+        self._refresh_views()
+
+    def _refresh_views(self):
+        n = self.count
+        self.pos = self._pos[:n]
+        self.vel = self._vel[:n]
+        self.angle = self._angle[:n]
+        self.angular_vel = self._angular_vel[:n]
+        self.size = self._size[:n]
+        self.color = self._color[:n]
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+        self._refresh_views()
+
+    def emit(self, pos, vel, angle, angular_vel, size, color):
+        """Añade un lote de fragmentos (todos los argumentos con N filas o difundibles a N)."""
+        pos = np.asarray(pos, dtype=float)
+        n = len(pos)
+        start, end = self.count, self.count + n
+        if end > self.capacity:
+            self._allocate(max(end, 2 * self.capacity))
+        self._pos[start:end] = pos
+        self._vel[start:end] = vel
+        self._angle[start:end] = angle
+        self._angular_vel[start:end] = angular_vel
+        self._size[start:end] = size
+        self._color[start:end] = color
+        self.count = end
+        self._refresh_views()
+
+    def explode(self, obj, color, subdivisions=2, rng=np.random):
+        """
+        Fragmenta un GameObject en subdivisions^3 mini cubos.
+        Se subdivide la caja envolvente del objeto (en espacio local, con el pivot offset
+        aplicado) y cada celda se convierte en un fragmento. Como en
+        create_fragments_from_player, la velocidad de cada fragmento apunta desde el centro
+        del objeto hacia la celda, con una rapidez aleatoria entre 0.5 y 1.5 más un pequeño
+        componente aleatorio, y la velocidad angular es aleatoria en [-pi, pi].
+        """
+        local = obj.base_vertices + obj.pivot_offset
+        lo, hi = local.min(axis=0), local.max(axis=0)
+        cell = (hi - lo) / subdivisions
+        steps = (np.arange(subdivisions) + 0.5) / subdivisions
+        grid = np.stack(np.meshgrid(steps, steps, steps, indexing="ij"), axis=-1).reshape(-1, 3)
+        centers = lo + grid * (hi - lo)
+        R = rotation_z(obj.rotation_z)
+        pos = centers @ R.T + obj.pos
+        center = ((lo + hi) / 2) @ R.T + obj.pos
+
+        dirs = pos - center
+        norms = np.linalg.norm(dirs, axis=1, keepdims=True)
+        dirs = np.where(norms > 0, dirs / np.where(norms > 0, norms, 1), [0.0, 1.0, 0.0])
+        n = len(pos)
+        speed = rng.uniform(0.5, 1.5, size=(n, 1))
+        vel = dirs * speed + rng.uniform(-0.2, 0.2, size=(n, 3))
+        angular_vel = rng.uniform(-math.pi, math.pi, size=n)
+        self.emit(pos, vel, obj.rotation_z, angular_vel, cell, color)
+
+    def update(self, dt, gravity):
+        """
+        Integra todos los fragmentos a la vez con las mismas fórmulas que Fragment.update:
+            pos = pos + vel * dt
+            vel_y = vel_y - gravity * dt
+            angle = angle + angular_vel * dt
+        """
+        self.pos += self.vel * dt
+        self.vel[:, 1] -= gravity * dt
+        self.angle += self.angular_vel * dt
+
+    def transformed_vertices(self, pos=None, angle=None, size=None, out=None):
+        """
+        Devuelve un arreglo (N,8,3) con los vértices en espacio mundial de todos los fragmentos:
+            v_world = R(angle) * (v_unit * size) + pos
+        La rotación en Z se aplica componente a componente con cos/sin vectorizados.
+        pos y angle permiten dibujar una pose distinta a la actual (por ejemplo, interpolada),
+        y con size, solo un subconjunto de los fragmentos.
+        Si se indica out (un arreglo (N,8,3) o mayor, como vertex_buffer()), el resultado se
+        escribe en sus N primeras filas en vez de reservar un arreglo nuevo.
+        """
+        pos = self.pos if pos is None else pos
+        angle = self.angle if angle is None else angle
+        size = self.size if size is None else size
+        n = len(pos)
+        world = np.empty((n,) + unit_cube_vertices.shape) if out is None else out[:n]
+        lx = unit_cube_vertices[:, 0] * size[:, 0, None]
+        ly = unit_cube_vertices[:, 1] * size[:, 1, None]
+        c = np.cos(angle)[:, None]
+        s = np.sin(angle)[:, None]
+        np.multiply(c, lx, out=world[:, :, 0])
+        world[:, :, 0] -= s * ly
+        np.multiply(s, lx, out=world[:, :, 1])
+        world[:, :, 1] += c * ly
+        np.multiply(unit_cube_vertices[:, 2], size[:, 2, None], out=world[:, :, 2])
+        world += pos[:, None, :]
+        return world
+
+    def vertex_buffer(self):
+        """Buffer (capacidad,8,3) reutilizable para transformed_vertices(out=...)."""
+        if len(self._vertices) < self.capacity:
+            self._vertices = np.empty((self.capacity,) + unit_cube_vertices.shape)
+        return self._vertices
+
+    def face_normals(self, angle=None, out=None):
+        """
+        Devuelve un arreglo (N,12,3) con las normales en espacio mundial de las caras de
+        todos los fragmentos, rotando las de unit_cube_normals con cos/sin vectorizados
+        (sirven para backface_mask sin calcular productos vectoriales).
+        angle y out funcionan igual que en transformed_vertices (out, con normal_buffer()).
+        """
+        angle = self.angle if angle is None else angle
+        n = len(angle)
+        world = np.empty((n,) + unit_cube_normals.shape) if out is None else out[:n]
+        c = np.cos(angle)[:, None]
+        s = np.sin(angle)[:, None]
+        nx, ny = unit_cube_normals[:, 0], unit_cube_normals[:, 1]
+        np.multiply(c, nx, out=world[:, :, 0])
+        world[:, :, 0] -= s * ny
+        np.multiply(s, nx, out=world[:, :, 1])
+        world[:, :, 1] += c * ny
+        world[:, :, 2] = unit_cube_normals[:, 2]
+        return world
+
+    def normal_buffer(self):
+        """Buffer (capacidad,12,3) reutilizable para face_normals(out=...)."""
+        if len(self._normals) < self.capacity:
+            self._normals = np.empty((self.capacity,) + unit_cube_normals.shape)
+        return self._normals
@@ -0,0 +1,171 @@
+# profiler.py
+"""
+Perfilador de frames por fases.
+Cada frame se divide en fases consecutivas (eventos, física, colisión, escena, dibujo...).
+El código llama a mark(fase) al terminar cada fase y el tiempo transcurrido desde la marca
+anterior se suma a esa fase, así que medir cuesta una llamada a perf_counter por marca.
+Los tiempos de los últimos 'window' frames se guardan en un buffer circular para calcular
+percentiles (p50/p95/p99), que pueden mostrarse como overlay en pantalla, y cada frame
+puede enviarse a un archivo CSV o JSONL que escribe un hilo en segundo plano.
+No depende de Pygame ni de OpenGL: la simulación y el renderizador solo reciben un
+objeto con el método mark().
+StartupTimer mide del mismo modo las etapas del arranque hasta el primer frame, y
+LatencyStats la latencia entre cada pulsación y la presentación del frame que la refleja.
+"""
+
+import csv
+import json
+import queue
+import threading
+import time
+import numpy as np
+
+# Fases del frame, en el orden en que ocurren en main.py.
+PHASES = ("events", "physics", "collision", "scoring", "scene", "sort", "draw", "hud", "flip", "idle")
+
+class TelemetryWriter(threading.Thread):
+    """
+    Hilo que escribe las muestras de cada frame en un archivo. El formato se elige por la
+    extensión: .jsonl (una línea JSON por frame) o CSV en cualquier otro caso.
+    El frame solo encola la muestra; si la cola está llena se descarta (y se cuenta)
+    para no bloquear nunca el bucle principal.
+    """
+    def __init__(self, path, columns, max_queue=4096):
+        super().__init__(name="telemetry-writer", daemon=True)
+        self.path = path
+        self.columns = ["frame", "time"] + list(columns)
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self.start()
+
+    def submit(self, row):
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        self._queue.put(None)
+        self.join()
+
+    def run(self):
+        jsonl = self.path.endswith(".jsonl")
+        with open(self.path, "w", newline="") as f:
+            writer = None if jsonl else csv.writer(f)
+            if writer:
+                writer.writerow(self.columns)
+            while True:
+                row = self._queue.get()
+                if row is None:
+                    break
+                if jsonl:
+                    f.write(json.dumps(dict(zip(self.columns, row))) + "\n")
+                else:
+                    writer.writerow(row)
+
+class StartupTimer:
+    """
+    Marcas del arranque (imports, ventana, OpenGL, primer frame...) relativas a 'start',
+    que main.py toma con perf_counter antes de sus imports pesados.
+    """
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.marks = []
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter() - self.start))
+
+    def elapsed(self, name):
+        return dict(self.marks)[name]
+
+    def has_mark(self, name):
+        return any(mark == name for mark, _ in self.marks)
+
+    def report(self):
+        """Línea con el instante de cada marca y la duración de cada etapa, en ms."""
+        parts = []
+        previous = 0.0
+        for name, t in self.marks:
+            parts.append(f"{name} {t * 1000:.0f} ms (+{(t - previous) * 1000:.0f})")
+            previous = t
+        return "Arranque: " + ", ".join(parts)
+
+class LatencyStats:
+    """
+    Latencias entrada-presentación: para cada pulsación, el tiempo entre su llegada
+    (instante del evento) y la vuelta de pygame.display.flip() del primer frame que
+    simuló un tick con ella. Es una cota inferior de la latencia hasta los fotones: no
+    incluye el barrido ni la respuesta del monitor.
+    Las últimas 'window' muestras se guardan en un buffer circular, como en FrameProfiler.
+    """
+    def __init__(self, window=600):
+        self._samples = np.zeros(window)
+        self.count = 0
+
+    def add(self, event_times, present):
+        for t in event_times:
+            self._samples[self.count % len(self._samples)] = (present - t) * 1000.0
+            self.count += 1
+
+    def percentiles(self, q=(50, 95, 99)):
+        n = min(self.count, len(self._samples))
+        return np.percentile(self._samples[:n], q) if n else None
+
+    def report_line(self):
+        values = self.percentiles()
+        if values is None:
+            return "latencia entrada-pantalla: sin pulsaciones"
+        p50, p95, p99 = values
+        return f"latencia entrada-pantalla  p50 {p50:.1f}  p95 {p95:.1f}  p99 {p99:.1f} ms ({self.count} pulsaciones)"
+
+class FrameProfiler:
+    def __init__(self, phases=PHASES, window=600, log_path=None):
+        self.phases = tuple(phases)
+        self._index = {name: i for i, name in enumerate(self.phases)}
+        self._current = [0.0] * len(self.phases)
+        # Historial circular en milisegundos: una columna por fase más el total del frame.
+        self._history = np.zeros((window, len(self.phases) + 1))
+        self.window = window
+        self.frames = 0
+        self._last = time.perf_counter()
+        self._writer = TelemetryWriter(log_path, self.phases + ("frame_ms",)) if log_path else None
+
+    def begin_frame(self):
+        self._current = [0.0] * len(self.phases)
+        self._last = time.perf_counter()
+
+    def mark(self, phase):
+        """Cierra la fase 'phase': le suma el tiempo transcurrido desde la marca anterior."""
+        now = time.perf_counter()
+        self._current[self._index[phase]] += now - self._last
+        self._last = now
+
+    def end_frame(self):
+        row = self._history[self.frames % self.window]
+        row[:-1] = self._current
+        row *= 1000.0
+        row[-1] = row[:-1].sum()
+        self.frames += 1
+        if self._writer:
+            self._writer.submit([self.frames, time.time()] + row.tolist())
+
+    def percentiles(self, q=(50, 95, 99)):
+        """Devuelve {fase: [p50, p95, p99]} en milisegundos; el total está en la clave "frame"."""
+        n = min(self.frames, self.window)
+        if n == 0:
+            return {}
+        values = np.percentile(self._history[:n], q, axis=0)
+        names = self.phases + ("frame",)
+        return {name: values[:, i] for i, name in enumerate(names)}
+
+    def report_lines(self):
+        """Líneas de texto con los percentiles, para el overlay o la consola."""
+        lines = []
+        for name, (p50, p95, p99) in self.percentiles().items():
+            lines.append(f"{name:>9}  p50 {p50:6.2f}  p95 {p95:6.2f}  p99 {p99:6.2f} ms")
+        return lines
+
+    def close(self):
+        if self._writer:
+            self._writer.close()
+            self._writer = None
@@ -0,0 +1,98 @@
+# quality.py
+"""
+Control adaptativo de la calidad gráfica.
+QualityGovernor recibe el tiempo de trabajo de cada frame y elige uno de los perfiles de
+quality_presets.py para que el frame quepa en el presupuesto (FRAME_BUDGET_MS, 60 FPS).
+El tiempo de trabajo va del inicio del frame a la llamada a pygame.display.flip(): no
+incluye la espera hasta el siguiente frame ni la de flip, que con vsync se bloquea hasta el
+refresco y haría que cualquier frame pareciera ocupar todo el presupuesto (como en
+FramePacer, ver input_events.py).
+
+Las decisiones se toman cada QUALITY_WINDOW frames con el percentil 90 de la ventana, así
+un pico aislado (recolección de basura, reconstruir la cuadrícula del piso) no cambia el
+perfil, pero una ventana con tirones sí. Para no oscilar entre dos perfiles hay histéresis:
+- Se baja un perfil en cuanto una ventana supera QUALITY_DOWNGRADE_RATIO del presupuesto.
+- Se sube uno solo tras QUALITY_UPGRADE_WINDOWS ventanas seguidas por debajo de
+  QUALITY_UPGRADE_RATIO, un margen mucho más holgado.
+- Si justo después de subir hay que volver a bajar, ese perfil no se sostiene y la espera
+  para intentarlo de nuevo se duplica; vuelve a su valor cuando una subida se mantiene.
+"""
+
+import numpy as np
+from quality_presets import PRESETS
+from config import (FRAME_BUDGET_MS, QUALITY_WINDOW, QUALITY_DOWNGRADE_RATIO, QUALITY_UPGRADE_RATIO,
+                    QUALITY_UPGRADE_WINDOWS)
+
+# Ventanas tras una subida en las que una bajada cuenta como subida fallida.
+UPGRADE_TRIAL_WINDOWS = 2
+# Tope de la espera para subir, en múltiplos de QUALITY_UPGRADE_WINDOWS.
+MAX_UPGRADE_BACKOFF = 8
+
+class QualityGovernor:
+    def __init__(self, presets=PRESETS, level=None, budget_ms=FRAME_BUDGET_MS, window=QUALITY_WINDOW,
+                 downgrade_ratio=QUALITY_DOWNGRADE_RATIO, upgrade_ratio=QUALITY_UPGRADE_RATIO,
+                 upgrade_windows=QUALITY_UPGRADE_WINDOWS):
+        self.presets = presets
+        self.level = len(presets) - 1 if level is None else level
+        self.budget_ms = budget_ms
+        self.downgrade_ratio = downgrade_ratio
+        self.upgrade_ratio = upgrade_ratio
+        self.upgrade_windows = upgrade_windows
+        self.last_p90 = None          # p90 (ms) de la última ventana completa
+        self.changes = 0              # Cambios de perfil desde la creación
+        self._samples = np.zeros(window)
+        self._count = 0
+        self._good_windows = 0        # Ventanas seguidas con margen suficiente para subir
+        self._upgrade_after = upgrade_windows
+        self._since_upgrade = None    # Ventanas desde la última subida (None si no hay una a prueba)
+
+    @property
+    def preset(self):
+        return self.presets[self.level]
+
+    def update(self, frame_ms):
+        """
+        Registra el tiempo de trabajo de un frame (ms). Devuelve True si el perfil cambió;
+        el nuevo está en self.preset.
+        """
+        self._samples[self._count] = frame_ms
+        self._count += 1
+        if self._count < len(self._samples):
+            return False
+        self._count = 0
+        self.last_p90 = p90 = float(np.percentile(self._samples, 90))
+        if self._since_upgrade is not None:
+            self._since_upgrade += 1
+
+        if p90 > self.budget_ms * self.downgrade_ratio:
+            self._good_windows = 0
+            if self.level == 0:
+                return False
+            if self._since_upgrade is not None and self._since_upgrade <= UPGRADE_TRIAL_WINDOWS:
+                self._upgrade_after = min(self._upgrade_after * 2, self.upgrade_windows * MAX_UPGRADE_BACKOFF)
+            self._since_upgrade = None
+            return self._set_level(self.level - 1)
+
+        if self._since_upgrade is not None and self._since_upgrade > UPGRADE_TRIAL_WINDOWS:
+            # La última subida se sostuvo: la espera vuelve a su valor normal.
+            self._upgrade_after = self.upgrade_windows
+            self._since_upgrade = None
+        if p90 < self.budget_ms * self.upgrade_ratio:
+            self._good_windows += 1
+        else:
+            self._good_windows = 0
+        if self._good_windows >= self._upgrade_after and self.level < len(self.presets) - 1:
+            self._good_windows = 0
+            self._since_upgrade = 0
+            return self._set_level(self.level + 1)
+        return False
+
+    def _set_level(self, level):
+        self.level = level
+        self.changes += 1
+        return True
+
+    def status(self):
+        """Texto con el perfil actual y el p90 de la última ventana, para el overlay."""
+        p90 = "-" if self.last_p90 is None else f"{self.last_p90:.2f}"
+        return f"calidad {self.preset.name}  p90 {p90} / {self.budget_ms:.1f} ms"
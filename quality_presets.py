@@ -0,0 +1,28 @@
+# quality_presets.py
+# Perfiles de calidad gráfica, de menor a mayor costo (ver quality.py).
+# Solo cambian el dibujo: la simulación, la pista y las grabaciones son las mismas en
+# cualquier perfil.
+from collections import namedtuple
+from config import FAR_PLANE
+
+# draw_distance: distancia desde la cámara hasta la que se dibujan obstáculos y sombras
+#                (plano lejano del frustum de culling).
+# shadows: dibujar o no las sombras proyectadas sobre el piso.
+# floor_spacing: separación entre las líneas de la cuadrícula del piso.
+# fragment_stride: se dibuja uno de cada 'fragment_stride' fragmentos de la explosión.
+# hud_interval: frames entre actualizaciones de los textos del HUD.
+QualityPreset = namedtuple("QualityPreset", ["name", "draw_distance", "shadows", "floor_spacing",
+                                             "fragment_stride", "hud_interval"])
+
+PRESETS = (
+    QualityPreset("low", draw_distance=90, shadows=False, floor_spacing=20, fragment_stride=3, hud_interval=10),
+    QualityPreset("medium", draw_distance=160, shadows=True, floor_spacing=10, fragment_stride=2, hud_interval=4),
+    QualityPreset("high", draw_distance=FAR_PLANE, shadows=True, floor_spacing=5, fragment_stride=1, hud_interval=1),
+)
+
+def preset_level(name):
+    """Índice en PRESETS del perfil con ese nombre."""
+    for level, preset in enumerate(PRESETS):
+        if preset.name == name:
+            return level
+    raise ValueError(f"Perfil de calidad desconocido: {name}")
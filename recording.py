@@ -0,0 +1,155 @@
+# recording.py
+"""
+Grabación y reproducción determinista de partidas.
+Una partida queda determinada por la semilla de la Simulation y por las entradas de cada
+tick, así que basta con guardar eso para reproducirla bit a bit (trazas de rendimiento
+reproducibles, reportes de errores).
+
+Formato binario (little endian):
+- Cabecera: MAGIC (4 bytes), versión (uint16), ticks por segundo (uint16), semilla (uint64).
+- Cambios de entrada: (tick uint32, máscara uint8). Solo se escribe un registro cuando la
+  máscara cambia respecto al tick anterior, así que mantener una flecha pulsada cuesta dos
+  registros y un salto (que dura un tick) otros dos.
+- Pie: END_MARK (4 bytes), ticks totales (uint32) y la huella SHA-256 del estado final
+  (32 bytes), con la que el reproductor comprueba que obtuvo exactamente el mismo estado.
+  Solo se escribe al cerrar el juego normalmente; si falta (el juego terminó de forma
+  abrupta), la grabación se reproduce hasta el último cambio de entrada y sin huella.
+
+Máscara de entradas: bit 0 = jump, bit 1 = restart, bits 2-5 = Inputs.camera.
+
+Reproducción sin ventana, a la máxima velocidad:
+    python recording.py partida.rec
+En ventana, a velocidad normal:
+    python main.py --replay partida.rec
+"""
+
+import argparse
+import struct
+import sys
+import time
+from collections import namedtuple
+from simulation import Simulation, Inputs, NO_INPUT
+from config import TICK_RATE
+
+MAGIC = b"R3DR"
+END_MARK = b"REND"
+VERSION = 2   # 2: pista generada por bloques (chunks.py); las grabaciones anteriores ya no se reproducen igual
+HEADER = struct.Struct("<4sHHQ")
+RECORD = struct.Struct("<IB")
+FOOTER = struct.Struct("<4sI32s")
+
+JUMP_BIT = 1
+RESTART_BIT = 2
+CAMERA_SHIFT = 2
+
+Recording = namedtuple("Recording", ["seed", "tick_rate", "changes", "ticks", "digest"])
+
+def encode_inputs(inputs):
+    """Convierte unas Inputs en la máscara de un byte del formato."""
+    return (JUMP_BIT if inputs.jump else 0) | (RESTART_BIT if inputs.restart else 0) | (inputs.camera << CAMERA_SHIFT)
+
+def decode_inputs(mask):
+    if mask == 0:
+        return NO_INPUT
+    return Inputs(jump=bool(mask & JUMP_BIT), restart=bool(mask & RESTART_BIT), camera=mask >> CAMERA_SHIFT)
+
+class InputRecorder:
+    """
+    Graba las entradas tick a tick. Se llama a record(inputs) justo antes de cada
+    sim.step(inputs) y a close(sim) al terminar, que escribe el pie con la huella.
+    """
+    def __init__(self, path, seed, tick_rate=TICK_RATE):
+        self.seed = seed
+        self.ticks = 0
+        self._last = 0
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, tick_rate, seed))
+
+    def record(self, inputs):
+        mask = encode_inputs(inputs)
+        if mask != self._last:
+            self._file.write(RECORD.pack(self.ticks, mask))
+            self._last = mask
+        self.ticks += 1
+
+    def close(self, sim):
+        if self._file is None:
+            return
+        self._file.write(FOOTER.pack(END_MARK, self.ticks, bytes.fromhex(sim.state_digest())))
+        self._file.close()
+        self._file = None
+
+def load_recording(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, tick_rate, seed = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} no es una grabación válida (versión {VERSION})")
+    end = len(data) - FOOTER.size
+    if end >= HEADER.size and data[end:end + len(END_MARK)] == END_MARK:
+        _, ticks, digest = FOOTER.unpack_from(data, end)
+        changes = list(RECORD.iter_unpack(data[HEADER.size:end]))
+        return Recording(seed, tick_rate, changes, ticks, digest.hex())
+    # Sin pie: se descarta el último registro si quedó a medio escribir, los ticks llegan
+    # hasta el último cambio de entrada y la huella no está disponible (digest None).
+    end = HEADER.size + (len(data) - HEADER.size) // RECORD.size * RECORD.size
+    changes = list(RECORD.iter_unpack(data[HEADER.size:end]))
+    ticks = changes[-1][0] + 1 if changes else 0
+    return Recording(seed, tick_rate, changes, ticks, None)
+
+class InputPlayer:
+    """Devuelve, tick a tick, las entradas de una grabación (next_inputs())."""
+    def __init__(self, recording):
+        self.recording = recording
+        self.tick = 0
+        self._index = 0
+        self._inputs = NO_INPUT
+
+    @property
+    def finished(self):
+        return self.tick >= self.recording.ticks
+
+    def next_inputs(self):
+        changes = self.recording.changes
+        if self._index < len(changes) and changes[self._index][0] == self.tick:
+            self._inputs = decode_inputs(changes[self._index][1])
+            self._index += 1
+        self.tick += 1
+        return self._inputs
+
+def replay(recording, **sim_options):
+    """
+    Reproduce la grabación sin ventana, tan rápido como sea posible.
+    Devuelve la Simulation en su estado final; recording.digest == sim.state_digest()
+    si la reproducción es idéntica a la partida original (si la grabación tiene huella).
+    """
+    sim = Simulation(seed=recording.seed, **sim_options)
+    player = InputPlayer(recording)
+    dt = 1.0 / recording.tick_rate
+    while not player.finished:
+        sim.step(player.next_inputs(), dt)
+    return sim
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reproduce una grabación sin ventana y verifica el estado final")
+    parser.add_argument("recording")
+    args = parser.parse_args(argv)
+    recording = load_recording(args.recording)
+    start = time.perf_counter()
+    sim = replay(recording)
+    elapsed = time.perf_counter() - start
+    digest = sim.state_digest()
+    print(f"{recording.ticks} ticks ({recording.ticks / recording.tick_rate:.1f} s de juego) "
+          f"en {elapsed:.2f} s: x{recording.ticks / recording.tick_rate / max(elapsed, 1e-9):.0f} tiempo real")
+    print(f"Puntuación {sim.score}, récord {sim.high_score}, estado {sim.state}")
+    if recording.digest is None:
+        print("La grabación no tiene pie: la huella del estado final no está disponible")
+        return 0
+    if digest != recording.digest:
+        print(f"ERROR: el estado final difiere de la grabación\n  grabado   {recording.digest}\n  obtenido  {digest}")
+        return 1
+    print(f"Estado final idéntico ({digest[:16]}...)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
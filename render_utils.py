@@ -4,6 +4,8 @@ Funciones de renderizado y utilidades matemáticas para el proyecto.
 Aquí se incluyen funciones para la rotación (utilizando la matriz de rotación de Z),
 backface culling (para eliminar triángulos que no se deben ver), painter’s algorithm (para ordenar los triángulos según la profundidad),
 dibujar objetos y proyecciones (sombras), y para dibujar el piso y textos.
+Las funciones backface_mask, backface_cull_array, painter_sort_array y project_shadow_array
+son variantes vectorizadas que procesan mallas completas (o lotes de mallas) como arreglos.
 """
 
 import pygame
@@ -11,49 +13,11 @@ from OpenGL.GL import *
 from OpenGL.GLU import *
 import numpy as np
 import math
-
-def rotation_z(angle):
-    """
-    Calcula la matriz de rotación de 3x3 para el eje Z.
-    Fórmula: 
-      [ cos(angle)  -sin(angle)   0 ]
-      [ sin(angle)   cos(angle)   0 ]
-      [    0             0        1 ]
-    Esto rota un vector en el plano XY.
-    """
-    c = math.cos(angle)
-    s = math.sin(angle)
-    return np.array([[ c, -s, 0],
-                     [ s,  c, 0],
-                     [ 0,  0, 1]], dtype=float)
-
-def backface_cull(triangles, vertices, cam_pos):
-    """
-    Realiza el backface culling: elimina triángulos que no se ven desde la cámara.
-    Calcula la normal de cada triángulo usando el producto vectorial y luego comprueba
-    si el ángulo entre la normal y la dirección de la cámara es agudo (producto punto > 0).
-    """
-    visibles = []
-    for tri in triangles:
-        v0 = vertices[tri[0]]
-        v1 = vertices[tri[1]]
-        v2 = vertices[tri[2]]
-        normal = np.cross(v1 - v0, v2 - v0)
-        if np.dot(normal, cam_pos - v0) > 0:
-            visibles.append(tri)
-    return visibles
-
-def painter_sort(triangles, vertices):
-    """
-    Ordena los triángulos de forma que se dibujen de atrás hacia adelante (painter’s algorithm).
-    Calcula la profundidad promedio (valor Z) de cada triángulo y los ordena en orden descendente.
-    """
-    tri_depths = []
-    for tri in triangles:
-        z_avg = (vertices[tri[0]][2] + vertices[tri[1]][2] + vertices[tri[2]][2]) / 3.0
-        tri_depths.append((tri, z_avg))
-    tri_depths.sort(key=lambda t: t[1], reverse=True)
-    return [t for (t, _) in tri_depths]
+from collections import OrderedDict
+# Las funciones matemáticas puras viven en transforms.py; se reexportan aquí.
+from transforms import (rotation_z, backface_cull, painter_sort, project_shadow,
+                        backface_mask, backface_cull_array, painter_sort_array, project_shadow_array,
+                        floor_patch_center)
 
 def draw_object(vertices, triangles, color):
     """
@@ -67,17 +31,6 @@ def draw_object(vertices, triangles, color):
             glVertex3fv(vertices[idx])
     glEnd()
 
-def project_shadow(vertex, light_dir):
-    """
-    Proyecta un vértice sobre el plano y = 0 siguiendo la dirección de la luz.
-    La fórmula es: v_proyectado = v + t * light_dir, donde t = -v.y / light_dir.y.
-    Esto se usa para crear la sombra del objeto en el piso.
-    """
-    if light_dir[1] == 0:
-        return vertex.copy()
-    t = -vertex[1] / light_dir[1]
-    return vertex + light_dir * t
-
 def draw_floor_lines(floor_limit, spacing=5):
     """
     Dibuja líneas para representar el piso.
@@ -96,12 +49,142 @@ def draw_floor_lines(floor_limit, spacing=5):
         glVertex3f(floor_limit, 0, z)
         glEnd()
 
+class FloorGrid:
+    """
+    Cuadrícula del piso cacheada en una display list.
+    La geometría (un parche de líneas de lado 2*limit) se construye una sola vez y en cada
+    frame se dibuja con un único glCallList, trasladada para seguir al jugador. La traslación
+    se ajusta a múltiplos de 'spacing', así las líneas no "resbalan" al moverse y el piso
+    parece infinito sin importar la distancia recorrida.
+    """
+    def __init__(self, limit, spacing=5):
+        self.limit = limit
+        self.spacing = spacing
+        self._list = None
+
+    def set_spacing(self, spacing):
+        """Cambia la densidad de la cuadrícula (se reconstruye en el siguiente draw)."""
+        if spacing != self.spacing:
+            self.spacing = spacing
+            self.release()
+
+    def release(self):
+        if self._list is not None:
+            glDeleteLists(self._list, 1)
+            self._list = None
+
+    def _build(self):
+        limit = self.limit - self.limit % self.spacing
+        coords = range(-limit, limit + 1, self.spacing)
+        self._list = glGenLists(1)
+        glNewList(self._list, GL_COMPILE)
+        glColor4f(0, 0, 0, 1)
+        glBegin(GL_LINES)
+        for c in coords:
+            glVertex3f(c, 0, -limit)
+            glVertex3f(c, 0, limit)
+            glVertex3f(-limit, 0, c)
+            glVertex3f(limit, 0, c)
+        glEnd()
+        glEndList()
+
+    def draw(self, focus, cam_pos):
+        """
+        Dibuja el parche centrado por delante del punto 'focus' (el jugador), desplazado
+        medio parche en la dirección de la vista sobre el plano XZ. Así las líneas que
+        quedarían detrás de la cámara no se dibujan y se aprovecha el parche en la
+        zona visible.
+        """
+        if self._list is None:
+            self._build()
+        cx, cz = floor_patch_center(focus, cam_pos, self.limit, self.spacing)
+        glPushMatrix()
+        glTranslatef(cx, 0, cz)
+        glCallList(self._list)
+        glPopMatrix()
+
+class TextCache:
+    """
+    Caché de textos renderizados como texturas OpenGL, con desalojo LRU.
+    Cada combinación (fuente, texto, color) se rasteriza con pygame y se sube a una
+    textura una sola vez; mientras el texto no cambie, dibujarlo es solo un quad texturizado.
+    viewport es el tamaño (ancho, alto) de la ventana en píxeles; si no se indica, se lee
+    de OpenGL en el primer draw y se reutiliza (la ventana no cambia de tamaño).
+    """
+    def __init__(self, capacity=32, viewport=None):
+        self.capacity = capacity
+        self.viewport = viewport
+        self._entries = OrderedDict()   # clave -> (textura, ancho, alto)
+
+    def get(self, text, font, color=(255, 255, 255)):
+        """Devuelve (textura, ancho, alto) del texto, rasterizándolo solo si no está en caché."""
+        # La clave guarda la propia fuente (no su id, que podría reutilizar otra fuente).
+        key = (font, text, color)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        surface = font.render(text, True, color)
+        data = pygame.image.tostring(surface, "RGBA", True)
+        texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, surface.get_width(), surface.get_height(), 0,
+                     GL_RGBA, GL_UNSIGNED_BYTE, data)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        entry = self._entries[key] = (texture, surface.get_width(), surface.get_height())
+        if len(self._entries) > self.capacity:
+            _, (old_texture, _, _) = self._entries.popitem(last=False)
+            glDeleteTextures([old_texture])
+        return entry
+
+    def clear(self):
+        for texture, _, _ in self._entries.values():
+            glDeleteTextures([texture])
+        self._entries.clear()
+
+    def draw(self, x, y, text, font, color=(255, 255, 255)):
+        """
+        Dibuja el texto como un quad texturizado con su esquina inferior izquierda en (x,y)
+        píxeles de la ventana, usando una proyección ortográfica temporal.
+        """
+        texture, w, h = self.get(text, font, color)
+        if self.viewport is None:
+            _, _, width, height = glGetIntegerv(GL_VIEWPORT)
+            self.viewport = (int(width), int(height))
+        width, height = self.viewport
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(0, width, 0, height, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, texture)
+        glColor4f(1, 1, 1, 1)
+        glBegin(GL_QUADS)
+        glTexCoord2f(0, 0); glVertex2f(x, y)
+        glTexCoord2f(1, 0); glVertex2f(x + w, y)
+        glTexCoord2f(1, 1); glVertex2f(x + w, y + h)
+        glTexCoord2f(0, 1); glVertex2f(x, y + h)
+        glEnd()
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glDisable(GL_TEXTURE_2D)
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+
+# Caché compartida por draw_text.
+text_cache = TextCache()
+
 def draw_text(x, y, text, font):
     """
     Dibuja un texto en pantalla en la posición (x,y).
-    Se utiliza la función pygame.font para renderizar el texto y luego se usa glDrawPixels para dibujarlo.
+    El texto se rasteriza con pygame.font solo la primera vez (o cuando cambia) y se guarda
+    como textura en text_cache; después se dibuja como un quad texturizado.
     """
-    text_surface = font.render(text, True, (255, 255, 255))
-    text_data = pygame.image.tostring(text_surface, "RGBA", True)
-    glWindowPos2d(x, y)
-    glDrawPixels(text_surface.get_width(), text_surface.get_height(), GL_RGBA, GL_UNSIGNED_BYTE, text_data)
+    text_cache.draw(x, y, text, font)
@@ -0,0 +1,49 @@
+# renderer.py
+"""
+Renderizador por lotes (batch renderer).
+En vez de llamar a glVertex3fv por cada vértice, durante el frame se acumulan todos los
+triángulos en un único buffer intercalado de float32 con el formato:
+    x, y, z, r, g, b, a   (28 bytes por vértice)
+agrupados por capa (estado de mezcla). Al final del frame el buffer se sube una sola vez
+a un VBO y cada capa se dibuja con un único glDrawArrays, de modo que el número de
+llamadas de Python a OpenGL es proporcional al número de lotes y no al de vértices.
+
+La acumulación y el orden de los triángulos (y las capas) están en TriangleBatch
+(batch.py); aquí solo se implementa el envío a OpenGL.
+"""
+
+import ctypes
+from OpenGL.GL import *
+from batch import TriangleBatch
+
+VERTEX_STRIDE = 7 * 4  # 3 floats de posición + 4 floats de color
+
+class BatchRenderer(TriangleBatch):
+    def __init__(self):
+        super().__init__()
+        self._vbo = None
+        self._vbo_size = 0
+
+    def _upload(self, data):
+        if self._vbo is None:
+            self._vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self._vbo)
+        if data.nbytes > self._vbo_size:
+            # Se reserva con holgura para no reasignar el buffer en cada frame.
+            self._vbo_size = max(data.nbytes, 2 * self._vbo_size)
+            glBufferData(GL_ARRAY_BUFFER, self._vbo_size, None, GL_STREAM_DRAW)
+        glBufferSubData(GL_ARRAY_BUFFER, 0, data.nbytes, data)
+
+    def submit(self, data, ranges):
+        """Sube el buffer preparado al VBO y dibuja cada capa con un glDrawArrays."""
+        self._upload(data)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(0))
+        glColorPointer(4, GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(12))
+        for first, count in ranges:
+            glDrawArrays(GL_TRIANGLES, first, count)
+            self.draw_calls += 1
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
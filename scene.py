@@ -0,0 +1,116 @@
+# scene.py
+"""
+Construcción de la escena a partir del estado de una Simulation.
+build_scene recorre el jugador, los fragmentos y los obstáculos y envía sus triángulos
+(ya con culling y sombras) a un renderizador con la interfaz de BatchRenderer
+(add / add_triangles con capas "body" y "shadow"). No depende de OpenGL, así que la
+misma escena puede alimentar al renderizador de la ventana o a otro backend.
+"""
+
+import numpy as np
+from transforms import backface_mask, backface_cull_array, project_shadow_array
+from particles import unit_cube_triangles
+from simulation import PLAYER_COLOR, OBSTACLE_COLOR
+
+# Dirección de la luz (para las sombras)
+LIGHT_DIR = np.array([0.5, -1, 0.5], dtype=float)
+LIGHT_DIR /= np.linalg.norm(LIGHT_DIR)
+
+PLAYER_SHADOW_COLOR = (0, 0, 0, 0.5)
+OBSTACLE_SHADOW_COLOR = (0, 0, 0, 0.4)
+
+def shadow_spheres(centers, radius, light_dir):
+    """
+    Esferas que contienen las sombras proyectadas sobre y = 0 de las esferas
+    (centers, radius): el centro es la proyección del centro y el radio crece en
+    |light_dir| / |light_dir.y| por el estiramiento de la proyección.
+    """
+    return (project_shadow_array(centers, light_dir),
+            radius * (1 + np.linalg.norm(light_dir) / abs(light_dir[1])))
+
+def cull_reach(kinds, light_dir=None):
+    """
+    Distancia máxima en X entre la posición de un obstáculo (apoyado en y = 0) y el borde
+    de su esfera envolvente o, si se indica light_dir, de la esfera de su sombra.
+    """
+    reach = 0.0
+    for kind in kinds:
+        radius = kind.mesh.radius
+        reach = max(reach, abs(kind.pivot_offset[0]) + radius)
+        if light_dir is not None:
+            # La sombra del centro (a la altura del pivot) se desplaza en X por la luz.
+            height = kind.pivot_offset[1]
+            center_x = kind.pivot_offset[0] - height * light_dir[0] / light_dir[1]
+            shadow_radius = radius * (1 + np.linalg.norm(light_dir) / abs(light_dir[1]))
+            reach = max(reach, abs(center_x) + shadow_radius)
+    return reach
+
+def build_scene(renderer, sim, cam_pos, light_dir=LIGHT_DIR, alpha=1.0, frustum=None,
+                shadows=True, fragment_stride=1):
+    """
+    Añade al renderizador todos los triángulos del estado actual de 'sim' vistos desde cam_pos.
+    Los triángulos se añaden sin ordenar: el renderizador ordena la capa de cuerpos.
+    alpha es la fracción del siguiente tick ya transcurrida: los objetos en movimiento se
+    dibujan interpolados entre los dos últimos estados de la simulación.
+    Con un Frustum (ver frustum.py) los objetos y sombras cuya esfera envolvente queda
+    fuera de la vista se descartan antes del backface culling, el orden y el dibujo.
+    shadows y fragment_stride vienen del perfil de calidad (ver quality_presets.py): sin
+    sombras no se calcula ni se añade ninguna, y de los fragmentos de la explosión solo se
+    dibuja uno de cada fragment_stride (la simulación los sigue moviendo todos).
+    """
+    if sim.state == "running":
+        player = sim.interpolated_player(alpha)
+        center = player.bounding_center()
+        radius = player.mesh.radius
+        show_body = frustum is None or frustum.sphere_visible(center, radius)
+        show_shadow = shadows and (frustum is None or frustum.sphere_visible(*shadow_spheres(center, radius, light_dir)))
+        if show_body or show_shadow:
+            p_verts = player.world_vertices()
+            vis_p = backface_cull_array(player.triangles, p_verts, cam_pos, player.world_normals())
+            if show_body:
+                renderer.add(p_verts, vis_p, PLAYER_COLOR)
+            if show_shadow:
+                renderer.add(player.shadow_vertices(light_dir), vis_p, PLAYER_SHADOW_COLOR, layer="shadow")
+    else:
+        # Vértices de todos los fragmentos (N,8,3): el culling se hace para todos a la vez
+        # y solo se envían los triángulos visibles, con el color de cada fragmento.
+        particles = sim.particles
+        pos, angle = sim.interpolated_particles(alpha)
+        pos, angle = pos[::fragment_stride], angle[::fragment_stride]
+        size, color = particles.size[::fragment_stride], particles.color[::fragment_stride]
+        frag_verts = particles.transformed_vertices(pos, angle, size, out=particles.vertex_buffer())
+        frag_normals = particles.face_normals(angle, out=particles.normal_buffer())
+        visible = backface_mask(frag_verts, unit_cube_triangles, cam_pos, frag_normals)
+        if frustum is not None:
+            # Cada mini cubo gira alrededor de su centro: su radio es media diagonal.
+            visible &= frustum.spheres_visible(pos, np.linalg.norm(size, axis=1) / 2)[:, None]
+        # Se indexan directamente los triángulos visibles, sin armar antes los de todos.
+        frag, tri = np.nonzero(visible)
+        renderer.add_triangles(frag_verts[frag[:, None], unit_cube_triangles[tri]], color[frag])
+    # Los obstáculos del mismo tipo se procesan como un único arreglo (K,N,3) calculado
+    # directamente de los arreglos del ObstacleField de la pista. No giran, así que todos
+    # comparten las normales de su malla; solo el culling depende de la cámara.
+    # Con frustum, antes de probar esferas se descartan con una búsqueda binaria los
+    # obstáculos cuya X queda fuera de la caja del frustum (así el coste, y la memoria
+    # temporal, dependen de los obstáculos cercanos y no del largo de la pista).
+    field = sim.track.field
+    start, stop = 0, None
+    if frustum is not None:
+        reach = cull_reach(field.kinds, light_dir if shadows else None)
+        start, stop = sim.track.query_range(frustum.lo[0] - reach, frustum.hi[0] + reach)
+    for kind, indices in field.kind_groups(start, stop):
+        mesh = field.kinds[kind].mesh
+        shadowed = indices if shadows else indices[:0]
+        if frustum is not None:
+            centers = field.bounding_centers(indices, kind)
+            if shadows:
+                shadowed = indices[frustum.spheres_visible(*shadow_spheres(centers, mesh.radius, light_dir))]
+            indices = indices[frustum.spheres_visible(centers, mesh.radius)]
+        o_tris = mesh.indices
+        if len(indices):
+            o_verts = field.world_vertices(indices, kind)
+            visible = backface_mask(o_verts, o_tris, cam_pos, mesh.normals)
+            renderer.add_triangles(o_verts[:, o_tris][visible], OBSTACLE_COLOR)
+        if len(shadowed):
+            o_shadows = field.shadow_vertices(shadowed, kind, light_dir)
+            renderer.add_triangles(o_shadows[:, o_tris], OBSTACLE_SHADOW_COLOR, layer="shadow")
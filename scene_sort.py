@@ -0,0 +1,55 @@
+# scene_sort.py
+"""
+Ordenación de triángulos de toda la escena para el painter's algorithm.
+A diferencia de painter_sort (que ordena por Z mundial dentro de cada objeto), aquí se
+reúnen los triángulos de todos los objetos del frame, se calcula su profundidad en
+espacio de vista (a lo largo de la dirección real de la cámara) en una sola operación
+vectorizada y se ordenan de atrás hacia adelante con un único argsort.
+
+Coherencia temporal: entre un frame y el siguiente el orden casi no cambia, así que se
+parte del orden del frame anterior. Si sigue siendo válido se reutiliza tal cual (coste
+O(n) para comprobarlo); si no, se aplica un argsort estable (timsort) sobre las
+profundidades ya permutadas, que sobre datos casi ordenados también es casi lineal.
+"""
+
+import numpy as np
+
+def view_direction(eye, target):
+    """Vector unitario de la cámara hacia el punto observado (el eje -Z de gluLookAt)."""
+    forward = np.asarray(target, dtype=float) - np.asarray(eye, dtype=float)
+    return forward / np.linalg.norm(forward)
+
+def view_depth(points, eye, target):
+    """
+    Profundidad en espacio de vista de un arreglo de puntos (...,3): la distancia a lo largo
+    de la dirección de la vista, es decir, -z en el sistema de coordenadas de gluLookAt.
+    """
+    return (np.asarray(points) - eye) @ view_direction(eye, target)
+
+class SceneSorter:
+    def __init__(self, tolerance=1e-6):
+        self.tolerance = tolerance   # Inversiones de profundidad menores que esto se ignoran
+        self._order = None
+        self.reused = False          # Indica si en el último frame se reutilizó el orden anterior
+
+    def reset(self):
+        self._order = None
+
+    def order(self, triangles, eye, target):
+        """
+        Devuelve los índices que ordenan los triángulos (T,3,3) de atrás hacia adelante
+        según la profundidad en espacio de vista de su centroide.
+        """
+        depth = view_depth(triangles.mean(axis=1), eye, target)
+        previous = self._order
+        if previous is not None and len(previous) == len(depth):
+            permuted = depth[previous]
+            if not np.any(permuted[1:] - permuted[:-1] > self.tolerance):
+                self.reused = True
+                return previous
+            order = previous[np.argsort(-permuted, kind="stable")]
+        else:
+            order = np.argsort(-depth, kind="stable")
+        self.reused = False
+        self._order = order
+        return order
@@ -0,0 +1,259 @@
+# simulation.py
+"""
+Lógica del juego sin dependencias de Pygame ni de OpenGL.
+La clase Simulation contiene todo el estado de una partida (jugador, pista de obstáculos,
+fragmentos, puntuación y máquina de estados running/exploding/game_over) y lo avanza
+un tick de duración fija (1/TICK_RATE) con step(inputs). Así puede ejecutarse sin
+ventana, tan rápido como permita la CPU (pruebas de regresión, ajuste de parámetros),
+y main.py queda como un driver que traduce el teclado a Inputs, reproduce la música
+y dibuja el estado interpolado entre los dos últimos ticks.
+
+Todo lo que influye en la partida entra por Inputs (incluidas las flechas de la cámara)
+y los números aleatorios salen de generadores propios creados a partir de 'seed', así que
+una semilla más la secuencia de entradas reproduce la partida bit a bit (ver recording.py).
+
+Estados del juego:
+- "running": juego en curso.
+- "exploding": animación de explosión (fragmentación) activa durante explosion_duration segundos.
+- "game_over": estado final, todo congelado hasta reiniciar.
+"""
+
+import math
+import random
+import hashlib
+from collections import namedtuple
+import numpy as np
+from config import (GRAVITY, JUMP_SPEED, BASE_SPEED, SPAWN_MIN_GAP, SPAWN_MAX_GAP,
+                    FRAGMENT_SUBDIVISIONS, EXPLOSION_DURATION, TICK_RATE, CAMERA_OFFSET, CAMERA_SPEED)
+from game_objects import Player
+from track import ObstacleTrack
+from collision import CollisionEngine
+from particles import ParticleSystem
+
+# Entradas de un tick: jump (se pulsó saltar), restart (se pulsó reiniciar) y camera
+# (máscara de bits con las flechas mantenidas, ver CAMERA_*).
+Inputs = namedtuple("Inputs", ["jump", "restart", "camera"], defaults=[False, False, 0])
+NO_INPUT = Inputs()
+
+# Bits de Inputs.camera: cada flecha mantenida desplaza el offset de la cámara.
+CAMERA_LEFT = 1
+CAMERA_RIGHT = 2
+CAMERA_UP = 4
+CAMERA_DOWN = 8
+
+# Duración de un tick de simulación (en segundos).
+TICK_DT = 1.0 / TICK_RATE
+
+# Colores de los objetos (también se usan para sus fragmentos).
+PLAYER_COLOR = (0, 0.5, 1, 1)
+OBSTACLE_COLOR = (1, 0, 0, 1)
+
+class Simulation:
+    def __init__(self, seed=None, base_speed=BASE_SPEED, jump_speed=JUMP_SPEED, gravity=GRAVITY,
+                 min_gap=SPAWN_MIN_GAP, max_gap=SPAWN_MAX_GAP,
+                 fragment_subdivisions=FRAGMENT_SUBDIVISIONS, explosion_duration=EXPLOSION_DURATION,
+                 threaded_chunks=False):
+        self.base_speed = base_speed
+        self.jump_speed = jump_speed
+        self.gravity = gravity
+        self.fragment_subdivisions = fragment_subdivisions
+        self.explosion_duration = explosion_duration
+        # Generadores aleatorios propios: con la misma semilla la partida es reproducible.
+        self.random = random.Random(seed)
+        self.np_random = np.random.default_rng(seed)
+        # Cada partida usa una pista nueva cuya semilla sale de self.random (ver reset);
+        # con threaded_chunks sus bloques se generan en un hilo de fondo, y los de la
+        # partida siguiente se empiezan a preparar al chocar (ver _step_running).
+        self.track = ObstacleTrack(min_gap=min_gap, max_gap=max_gap, threaded=threaded_chunks, generate=False)
+        self.collision = CollisionEngine()
+        self.particles = ParticleSystem()
+        self._prev_particle_pos = np.empty((0, 3))   # Buffers de la pose anterior (ver _snapshot)
+        self._prev_particle_angle = np.empty(0)
+        self.prev_particle_pos = self.prev_particle_angle = None
+        # Copia del jugador usada solo para dibujar una pose interpolada entre ticks.
+        self._render_player = Player(pos=[0, 0, 0])
+        self.high_score = 0
+        # Offset de la cámara respecto al jugador (no se reinicia con la partida).
+        self.camera_offset = np.array(CAMERA_OFFSET, dtype=float)
+        self.ticks = 0              # Ticks simulados desde la creación
+        self.profiler = None        # FrameProfiler opcional (fases physics/collision/scoring)
+        self.reset()
+
+    def reset(self):
+        """Reinicia la partida (conservando el récord)."""
+        if hasattr(self, "score") and self.score > self.high_score:
+            self.high_score = self.score
+        self.score = 0
+        self.speed = self.base_speed
+        self.player = Player(pos=[0, 0, 0])
+        self.track.reset(seed=self.random.getrandbits(63))
+        self.particles.clear()
+        self.state = "running"
+        self.explosion_elapsed = 0.0
+        self._snapshot()
+
+    def _next_track_seed(self):
+        """Semilla de la pista del próximo reset, sin consumirla de self.random."""
+        peek = random.Random()
+        peek.setstate(self.random.getstate())
+        return peek.getrandbits(63)
+
+    def _snapshot(self):
+        """Guarda la pose actual como "estado anterior" para la interpolación del render."""
+        self.prev_pos = self.player.pos
+        self.prev_rotation = self.player.rotation_z
+        # Las poses de los fragmentos se copian en buffers reservados a la capacidad del
+        # sistema de partículas: durante la explosión no se reservan arreglos en cada tick.
+        particles = self.particles
+        if len(self._prev_particle_angle) < particles.capacity:
+            self._prev_particle_pos = np.empty((particles.capacity, 3))
+            self._prev_particle_angle = np.empty(particles.capacity)
+            self.prev_particle_pos = self.prev_particle_angle = None
+        n = len(particles)
+        if self.prev_particle_pos is None or len(self.prev_particle_pos) != n:
+            self.prev_particle_pos = self._prev_particle_pos[:n]
+            self.prev_particle_angle = self._prev_particle_angle[:n]
+        np.copyto(self.prev_particle_pos, particles.pos)
+        np.copyto(self.prev_particle_angle, particles.angle)
+
+    def interpolated_player(self, alpha):
+        """
+        Devuelve el jugador con la pose interpolada entre los dos últimos ticks:
+            pos = prev_pos + (pos - prev_pos) * alpha
+        con alpha en [0, 1] (fracción del siguiente tick ya transcurrida).
+        """
+        player = self.player
+        if alpha >= 1.0:
+            return player
+        proxy = self._render_player
+        proxy.pos = self.prev_pos + (player.pos - self.prev_pos) * alpha
+        proxy.rotation_z = self.prev_rotation + (player.rotation_z - self.prev_rotation) * alpha
+        return proxy
+
+    def interpolated_particles(self, alpha):
+        """Posiciones y ángulos de los fragmentos interpolados entre los dos últimos ticks."""
+        particles = self.particles
+        if alpha >= 1.0 or len(self.prev_particle_pos) != len(particles):
+            return particles.pos, particles.angle
+        pos = self.prev_particle_pos + (particles.pos - self.prev_particle_pos) * alpha
+        angle = self.prev_particle_angle + (particles.angle - self.prev_particle_angle) * alpha
+        return pos, angle
+
+    def step(self, inputs=NO_INPUT, dt=TICK_DT):
+        """
+        Avanza la simulación un tick y devuelve la lista de eventos ocurridos
+        ("jump", "collision", "game_over", "restart"), para que el driver reaccione
+        (por ejemplo, deteniendo o reiniciando la música).
+        dt (en segundos) solo se usa para la animación de explosión; el driver siempre
+        pasa la duración fija del tick para que el juego no dependa de los FPS.
+        """
+        events = []
+        self.ticks += 1
+        self._snapshot()
+        if inputs.camera:
+            self._move_camera(inputs.camera)
+        if self.state in ("exploding", "game_over") and inputs.restart:
+            self.reset()
+            events.append("restart")
+        elif self.state == "running":
+            if inputs.jump and self.player.on_ground:
+                self.player.vel_y = self.jump_speed
+                self.player.on_ground = False
+                events.append("jump")
+            self._step_running(events)
+        elif self.state == "exploding":
+            self.explosion_elapsed += dt
+            if self.explosion_elapsed < self.explosion_duration:
+                # Actualizar los fragmentos: se aplican las fórmulas de movimiento y gravedad.
+                self.particles.update(dt, self.gravity)
+            else:
+                # Pasado el tiempo de la explosión, se pasa a game_over y se congela la escena.
+                self.state = "game_over"
+                events.append("game_over")
+        if self.profiler:
+            # El trabajo del tick sin fase propia (reinicio, choque, explosión, game over)
+            # cuenta como física, no como el dibujo que viene después.
+            self.profiler.mark("physics")
+        return events
+
+    def _move_camera(self, camera):
+        offset = self.camera_offset
+        if camera & CAMERA_LEFT:
+            offset[0] -= CAMERA_SPEED
+        if camera & CAMERA_RIGHT:
+            offset[0] += CAMERA_SPEED
+        if camera & CAMERA_UP:
+            offset[1] += CAMERA_SPEED
+        if camera & CAMERA_DOWN:
+            offset[1] -= CAMERA_SPEED
+
+    def state_digest(self):
+        """
+        Huella SHA-256 (hex) del estado completo de la partida: contadores, jugador,
+        pista, fragmentos, cámara y el estado de los generadores aleatorios.
+        Dos ejecuciones con la misma semilla y las mismas entradas deben dar la misma huella.
+        """
+        h = hashlib.sha256()
+        player = self.player
+        h.update(repr((self.ticks, self.state, self.score, self.high_score, self.speed,
+                       self.explosion_elapsed, player.vel_y, player.on_ground,
+                       player.rotation_z, self.track.next_x, self.track.cursor)).encode())
+        h.update(player.pos.tobytes())
+        h.update(np.ascontiguousarray(self.track.field.x).tobytes())
+        particles = self.particles
+        for arr in (particles.pos, particles.vel, particles.angle, particles.angular_vel,
+                    particles.size, particles.color, self.camera_offset):
+            h.update(np.ascontiguousarray(arr).tobytes())
+        h.update(repr(self.random.getstate()).encode())
+        h.update(repr(self.np_random.bit_generator.state).encode())
+        return h.hexdigest()
+
+    def _step_running(self, events):
+        player = self.player
+        # Posición al inicio del tick, para la prueba de colisión continua.
+        # (player.pos es de solo lectura: cada movimiento asigna un arreglo nuevo).
+        prev_pos = player.pos
+        x, y, z = prev_pos
+        # La velocidad del jugador aumenta con el score:
+        self.speed = self.base_speed + (self.score / 5000.0)
+        x -= self.speed  # Movimiento hacia la izquierda.
+        # Actualizar salto y gravedad:
+        if not player.on_ground:
+            player.vel_y -= self.gravity
+        y += player.vel_y
+        if y < 0:
+            y = 0
+            player.vel_y = 0
+            player.on_ground = True
+            # Ajustar la rotación a un múltiplo de 90° (para que el cubo "asiente" su orientación)
+            player.rotation_z = round(player.rotation_z / (math.pi/2)) * (math.pi/2)
+        player.pos = (x, y, z)
+        if not player.on_ground:
+            player.rotation_z += 0.1
+        profiler = self.profiler
+        if profiler:
+            profiler.mark("physics")
+        # Comprobar colisiones a lo largo de todo el movimiento del tick.
+        hit = self.collision.sweep(player, prev_pos, self.track)
+        if profiler:
+            profiler.mark("collision")
+        if hit is not None:
+            obs, toi = hit
+            # El jugador se coloca en el punto de contacto antes de explotar.
+            player.pos = prev_pos + (player.pos - prev_pos) * toi
+            # Explotan tanto el jugador como el obstáculo contra el que chocó.
+            self.particles.explode(player, PLAYER_COLOR, self.fragment_subdivisions, self.np_random)
+            self.particles.explode(obs, OBSTACLE_COLOR, self.fragment_subdivisions, self.np_random)
+            self.track.remove(obs)
+            # La pista de la próxima partida se prepara en segundo plano durante la explosión.
+            self.track.prefetch(self._next_track_seed())
+            self.explosion_elapsed = 0.0
+            self.state = "exploding"
+            events.append("collision")
+        else:
+            # Sumar puntos: cada obstáculo que el jugador pasa sin colisionar (se suma 10 puntos).
+            self.score += 10 * self.track.advance_passed(player.pos[0])
+            # Generar obstáculos por delante y reciclar los que quedaron muy atrás.
+            self.track.update(player.pos[0])
+            if profiler:
+                profiler.mark("scoring")
@@ -0,0 +1,402 @@
+# software_renderer.py
+"""
+Renderizador por software con NumPy: dibuja un frame en un framebuffer en memoria, sin
+ventana, sin GPU y sin contexto OpenGL (integración continua, miniaturas en el servidor).
+
+SoftwareRenderer tiene la misma interfaz que BatchRenderer (begin_frame, add,
+add_triangles y flush, heredados de TriangleBatch) más los equivalentes de gluLookAt,
+glClear, draw_object, draw_floor_lines, FloorGrid.draw y draw_text, y reproduce la misma
+cámara que main.py (gluPerspective con FOV, NEAR_PLANE y FAR_PLANE de config.py).
+
+Rasterizado, todo vectorizado sobre los triángulos de cada capa:
+- Los vértices se llevan a coordenadas de clip y los triángulos que cruzan el plano
+  cercano se recortan (se dividen en uno o dos triángulos).
+- Se proyectan a la ventana y se ajustan a 1/SUBPIXEL de píxel, así las funciones de
+  arista se evalúan de forma exacta y dos triángulos que comparten una arista no dejan
+  huecos ni pintan dos veces sus píxeles (regla superior-izquierda).
+- Cada triángulo genera los centros de píxel de su caja envolvente y se conservan los
+  que pasan las tres funciones de arista.
+- Los fragmentos se mezclan en el orden de dibujo (como glBlendFunc(GL_SRC_ALPHA,
+  GL_ONE_MINUS_SRC_ALPHA) sin test de profundidad): la capa de cuerpos es opaca y solo
+  cuenta el último triángulo de cada píxel; en las sombras semitransparentes se aplica
+  la mezcla capa a capa.
+Cada triángulo se pinta con un color plano (el de su primer vértice): todos los
+triángulos de la escena tienen un color uniforme.
+
+El framebuffer sigue la convención de OpenGL (fila 0 abajo, como glReadPixels); image()
+lo devuelve de arriba abajo y save_png() lo guarda con zlib, sin dependencias extra.
+
+Miniatura de una partida sin ventana:
+    python software_renderer.py -o frame.png --seed 7 --ticks 600
+    python software_renderer.py -o final.png --replay partida.rec
+"""
+
+import argparse
+import math
+import struct
+import sys
+import time
+import zlib
+import numpy as np
+from batch import TriangleBatch
+from transforms import floor_patch_center
+from config import DISPLAY_WIDTH, DISPLAY_HEIGHT, FOV, NEAR_PLANE, FAR_PLANE, FLOOR_LIMIT
+
+SUBPIXEL = 256            # Precisión de los vértices en la ventana (fracciones de píxel)
+MAX_FRAGMENTS = 1 << 21   # Píxeles candidatos por lote de triángulos (acota la memoria)
+CLEAR_COLOR = (0.5, 0.8, 1.0)   # Color de fondo, el mismo glClearColor de main.py
+
+def perspective_matrix(fov=FOV, aspect=DISPLAY_WIDTH / DISPLAY_HEIGHT, near=NEAR_PLANE, far=FAR_PLANE):
+    """Matriz 4x4 de gluPerspective (fov vertical en grados)."""
+    f = 1.0 / math.tan(math.radians(fov) / 2)
+    return np.array([[f / aspect, 0, 0, 0],
+                     [0, f, 0, 0],
+                     [0, 0, (far + near) / (near - far), 2 * far * near / (near - far)],
+                     [0, 0, -1, 0]], dtype=float)
+
+def look_at_matrix(eye, target, up=(0, 1, 0)):
+    """Matriz 4x4 de gluLookAt."""
+    eye = np.asarray(eye, dtype=float)
+    forward = np.asarray(target, dtype=float) - eye
+    forward /= np.linalg.norm(forward)
+    side = np.cross(forward, np.asarray(up, dtype=float))
+    side /= np.linalg.norm(side)
+    true_up = np.cross(side, forward)
+    m = np.eye(4)
+    m[0, :3], m[1, :3], m[2, :3] = side, true_up, -forward
+    m[:3, 3] = -m[:3, :3] @ eye
+    return m
+
+def clip_near(tris, colors):
+    """
+    Recorta triángulos en coordenadas de clip (T,3,4) contra el plano cercano
+    (z >= -w). Devuelve (tris, colors) con los triángulos que quedan, conservando el
+    sentido de giro de cada uno.
+    """
+    dist = tris[..., 2] + tris[..., 3]
+    inside = dist >= 0
+    count = inside.sum(axis=1)
+    out_tris = [tris[count == 3]]
+    out_colors = [colors[count == 3]]
+    rows = np.arange(3)
+    for n_inside in (1, 2):
+        sel = np.flatnonzero(count == n_inside)
+        if not len(sel):
+            continue
+        # Se rota cada triángulo (sin cambiar su giro) para que el vértice solitario,
+        # dentro con 1 o fuera con 2, quede primero: (S, P, Q).
+        lone = np.argmax(inside[sel] if n_inside == 1 else ~inside[sel], axis=1)
+        order = (lone[:, None] + rows) % 3
+        v = np.take_along_axis(tris[sel], order[:, :, None], axis=1)
+        d = np.take_along_axis(dist[sel], order, axis=1)
+        s, p, q = v[:, 0], v[:, 1], v[:, 2]
+        sp = s + (p - s) * (d[:, 0] / (d[:, 0] - d[:, 1]))[:, None]
+        sq = s + (q - s) * (d[:, 0] / (d[:, 0] - d[:, 2]))[:, None]
+        if n_inside == 1:
+            out_tris.append(np.stack([s, sp, sq], axis=1))
+            out_colors.append(colors[sel])
+        else:
+            # S fuera: queda el cuadrilátero P, Q, SQ, SP, que se divide en dos triángulos.
+            out_tris.append(np.stack([p, q, sq], axis=1))
+            out_tris.append(np.stack([p, sq, sp], axis=1))
+            out_colors.extend([colors[sel], colors[sel]])
+    return np.concatenate(out_tris), np.concatenate(out_colors)
+
+def write_png(path, image, level=6):
+    """Guarda una imagen (H,W,3) o (H,W,4) uint8, de arriba abajo, como PNG."""
+    height, width, channels = image.shape
+    raw = np.empty((height, 1 + width * channels), dtype=np.uint8)
+    raw[:, 0] = 0   # Filtro "None" en cada fila
+    raw[:, 1:] = image.reshape(height, -1)
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    color_type = 2 if channels == 3 else 6
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(raw.tobytes(), level)))
+        f.write(chunk(b"IEND", b""))
+
+class SoftwareRenderer(TriangleBatch):
+    def __init__(self, width=DISPLAY_WIDTH, height=DISPLAY_HEIGHT, fov=FOV, near=NEAR_PLANE, far=FAR_PLANE):
+        super().__init__()
+        self.width = width
+        self.height = height
+        self.projection = perspective_matrix(fov, width / height, near, far)
+        self.view = np.eye(4)
+        self._matrix = self.projection
+        # Framebuffer RGB en [0, 1], una fila por línea de la ventana empezando por abajo.
+        self.color = np.empty((height * width, 3), dtype=np.float32)
+        self.clear()
+
+    # --- Estado de la "cámara" y del framebuffer ---
+
+    def look_at(self, eye, target, up=(0, 1, 0)):
+        """Equivalente a glLoadIdentity() + gluLookAt(...)."""
+        self.view = look_at_matrix(eye, target, up)
+        self._matrix = self.projection @ self.view
+
+    def clear(self, color=CLEAR_COLOR):
+        self.color[:] = color
+
+    def image(self):
+        """Framebuffer como imagen (H,W,3) uint8, de arriba abajo."""
+        rgb = np.rint(self.color * 255).astype(np.uint8).reshape(self.height, self.width, 3)
+        return rgb[::-1]
+
+    def save_png(self, path, level=6):
+        write_png(path, self.image(), level)
+
+    # --- Backend de TriangleBatch ---
+
+    def submit(self, data, ranges):
+        """Rasteriza cada capa del buffer preparado (el equivalente de un glDrawArrays)."""
+        for first, count in ranges:
+            tris = data[first:first + count].reshape(-1, 3, 7)
+            self.draw_triangles(tris[:, :, :3], tris[:, 0, 3:])
+            self.draw_calls += 1
+
+    # --- Dibujo inmediato ---
+
+    def draw_object(self, vertices, triangles, color):
+        """Igual que render_utils.draw_object: dibuja los triángulos en el orden dado."""
+        if len(triangles) == 0:
+            return
+        positions = np.asarray(vertices, dtype=float)[np.asarray(triangles)]
+        self.draw_triangles(positions, np.broadcast_to(np.asarray(color, dtype=float), (len(positions), 4)))
+
+    def draw_floor_lines(self, floor_limit, spacing=5):
+        """Igual que render_utils.draw_floor_lines: cuadrícula del piso en [-limit, limit]."""
+        coords = np.arange(-floor_limit, floor_limit + 1, spacing, dtype=float)
+        self.draw_lines(self._grid_segments(coords, -floor_limit, floor_limit), (0, 0, 0))
+
+    def draw_floor_grid(self, focus, cam_pos, limit=FLOOR_LIMIT, spacing=5):
+        """Igual que FloorGrid(limit, spacing).draw(focus, cam_pos)."""
+        cx, cz = floor_patch_center(focus, cam_pos, limit, spacing)
+        limit = limit - limit % spacing
+        coords = np.arange(-limit, limit + 1, spacing, dtype=float)
+        segments = self._grid_segments(coords, -limit, limit)
+        segments[..., 0] += cx
+        segments[..., 2] += cz
+        self.draw_lines(segments, (0, 0, 0))
+
+    @staticmethod
+    def _grid_segments(coords, lo, hi):
+        n = len(coords)
+        segments = np.zeros((2 * n, 2, 3))
+        segments[:n, :, 0] = coords[:, None]       # Líneas paralelas a Z
+        segments[:n, :, 2] = (lo, hi)
+        segments[n:, :, 0] = (lo, hi)              # Líneas paralelas a X
+        segments[n:, :, 2] = coords[:, None]
+        return segments
+
+    def draw_text(self, x, y, text, font, color=(255, 255, 255)):
+        """
+        Igual que render_utils.draw_text: el texto (rasterizado con pygame.font) se mezcla
+        con su esquina inferior izquierda en (x,y) píxeles de la ventana.
+        """
+        import pygame
+        surface = font.render(text, True, color)
+        w, h = surface.get_size()
+        rgba = np.frombuffer(pygame.image.tostring(surface, "RGBA", True), dtype=np.uint8)
+        rgba = rgba.reshape(h, w, 4).astype(np.float32) / 255
+        x0, y0 = max(int(x), 0), max(int(y), 0)
+        x1, y1 = min(int(x) + w, self.width), min(int(y) + h, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        src = rgba[y0 - int(y):y1 - int(y), x0 - int(x):x1 - int(x)]
+        dst = self.color.reshape(self.height, self.width, 3)[y0:y1, x0:x1]
+        alpha = src[..., 3:]
+        dst[:] = dst * (1 - alpha) + src[..., :3] * alpha
+
+    # --- Rasterizado ---
+
+    def _to_clip(self, positions):
+        p = np.asarray(positions, dtype=float)
+        return p @ self._matrix[:, :3].T + self._matrix[:, 3]
+
+    def _to_window(self, clip):
+        """Coordenadas de clip (...,4) -> ventana (...,2) en píxeles, con y hacia arriba."""
+        ndc = clip[..., :2] / clip[..., 3:4]
+        window = (ndc + 1) * 0.5 * (self.width, self.height)
+        return np.rint(window * SUBPIXEL) / SUBPIXEL
+
+    def draw_triangles(self, positions, colors):
+        """Rasteriza triángulos (T,3,3) en espacio mundial con un color RGBA (T,4) cada uno."""
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3, 3)
+        colors = np.asarray(colors, dtype=np.float32).reshape(-1, 4)
+        if not len(positions):
+            return
+        clip, colors = clip_near(self._to_clip(positions), colors)
+        if not len(clip):
+            return
+        v = self._to_window(clip)
+        # Orientación: se invierten los triángulos en sentido horario para que todos
+        # queden antihorarios (no hay culling, igual que en OpenGL sin GL_CULL_FACE).
+        area = ((v[:, 1, 0] - v[:, 0, 0]) * (v[:, 2, 1] - v[:, 0, 1]) -
+                (v[:, 1, 1] - v[:, 0, 1]) * (v[:, 2, 0] - v[:, 0, 0]))
+        v[area < 0] = v[area < 0][:, ::-1]
+        # Caja envolvente en píxeles cuyos centros (i + 0.5) caen dentro de la ventana.
+        x0 = np.maximum(np.ceil(v[:, :, 0].min(axis=1) - 0.5), 0).astype(np.int64)
+        x1 = np.minimum(np.floor(v[:, :, 0].max(axis=1) - 0.5), self.width - 1).astype(np.int64)
+        y0 = np.maximum(np.ceil(v[:, :, 1].min(axis=1) - 0.5), 0).astype(np.int64)
+        y1 = np.minimum(np.floor(v[:, :, 1].max(axis=1) - 0.5), self.height - 1).astype(np.int64)
+        keep = (area != 0) & (x1 >= x0) & (y1 >= y0)
+        if not keep.any():
+            return
+        v, colors = v[keep], colors[keep]
+        x0, y0 = x0[keep], y0[keep]
+        widths = x1[keep] - x0 + 1
+        areas = widths * (y1[keep] - y0 + 1)
+        # Aristas a -> b de cada triángulo; la regla superior-izquierda decide los píxeles
+        # que caen justo sobre una arista compartida.
+        a = v
+        d = np.roll(v, -1, axis=1) - v
+        top_left = (d[..., 1] < 0) | ((d[..., 1] == 0) & (d[..., 0] < 0))
+
+        # Lotes de triángulos con a lo sumo MAX_FRAGMENTS píxeles candidatos.
+        ends = np.cumsum(areas)
+        start = 0
+        while start < len(v):
+            base = ends[start - 1] if start else 0
+            stop = max(int(np.searchsorted(ends, base + MAX_FRAGMENTS, side="right")), start + 1)
+            ids = np.arange(start, stop)
+            counts = areas[start:stop]
+            tri = np.repeat(ids, counts)
+            local = np.arange(len(tri)) - np.repeat(np.cumsum(counts) - counts, counts)
+            w = widths[tri]
+            px = x0[tri] + local % w
+            py = y0[tri] + local // w
+            cx = px + 0.5
+            cy = py + 0.5
+            inside = np.ones(len(tri), dtype=bool)
+            for k in range(3):
+                e = d[tri, k, 0] * (cy - a[tri, k, 1]) - d[tri, k, 1] * (cx - a[tri, k, 0])
+                inside &= (e > 0) | ((e == 0) & top_left[tri, k])
+            self._blend(py[inside] * self.width + px[inside], colors[tri[inside]])
+            start = stop
+
+    def _blend(self, pixels, colors):
+        """
+        Mezcla fragmentos (índice de píxel, RGBA) en el orden dado, como
+        GL_SRC_ALPHA / GL_ONE_MINUS_SRC_ALPHA.
+        """
+        if not len(pixels):
+            return
+        order = np.argsort(pixels, kind="stable")
+        pixels, colors = pixels[order], colors[order]
+        if (colors[:, 3] >= 1).all():
+            # Todo opaco: en cada píxel solo cuenta el último fragmento.
+            last = np.append(pixels[1:] != pixels[:-1], True)
+            self.color[pixels[last]] = colors[last, :3]
+            return
+        # Fragmentos semitransparentes: se aplican por rondas, en cada una a lo sumo un
+        # fragmento por píxel, respetando el orden de dibujo dentro de cada píxel.
+        first = np.append(True, pixels[1:] != pixels[:-1])
+        index = np.arange(len(pixels))
+        rank = index - np.maximum.accumulate(np.where(first, index, 0))
+        for r in range(int(rank.max()) + 1):
+            sel = rank == r
+            p = pixels[sel]
+            c = colors[sel]
+            alpha = c[:, 3:]
+            self.color[p] = self.color[p] * (1 - alpha) + c[:, :3] * alpha
+
+    def draw_lines(self, segments, color):
+        """Dibuja segmentos (S,2,3) en espacio mundial de un píxel de ancho y color opaco."""
+        clip = self._to_clip(np.asarray(segments, dtype=float).reshape(-1, 2, 3))
+        # Recorte contra el plano cercano: el extremo que queda detrás se mueve al plano.
+        dist = clip[..., 2] + clip[..., 3]
+        both = (dist >= 0).all(axis=1)
+        one = (dist >= 0).any(axis=1) & ~both
+        t = dist[one, 0] / (dist[one, 0] - dist[one, 1])
+        point = clip[one, 0] + (clip[one, 1] - clip[one, 0]) * t[:, None]
+        behind = dist[one, 0] < 0
+        clip[one] = np.where(behind[:, None, None],
+                             np.stack([point, clip[one, 1]], axis=1),
+                             np.stack([clip[one, 0], point], axis=1))
+        ends = self._to_window(clip[both | one])
+        if not len(ends):
+            return
+        # Recorte contra los bordes de la ventana (Liang-Barsky) para no muestrear fuera.
+        p0, delta = ends[:, 0], ends[:, 1] - ends[:, 0]
+        t0 = np.zeros(len(ends))
+        t1 = np.ones(len(ends))
+        visible = np.ones(len(ends), dtype=bool)
+        for axis, size in ((0, self.width), (1, self.height)):
+            for q, sign in ((p0[:, axis], -1), (size - p0[:, axis], 1)):
+                p = sign * delta[:, axis]
+                parallel = p == 0
+                visible &= ~(parallel & (q < 0))
+                r = np.where(parallel, 0, q / np.where(parallel, 1, p))
+                t0 = np.where(~parallel & (p < 0), np.maximum(t0, r), t0)
+                t1 = np.where(~parallel & (p > 0), np.minimum(t1, r), t1)
+        visible &= t0 <= t1
+        start = p0[visible] + delta[visible] * t0[visible, None]
+        delta = delta[visible] * (t1 - t0)[visible, None]
+        # Un punto por píxel recorrido a lo largo del eje mayor.
+        steps = np.ceil(np.abs(delta).max(axis=1)).astype(np.int64) + 1
+        seg = np.repeat(np.arange(len(steps)), steps)
+        local = np.arange(len(seg)) - np.repeat(np.cumsum(steps) - steps, steps)
+        frac = local / np.maximum(steps[seg] - 1, 1)
+        pts = np.floor(start[seg] + delta[seg] * frac[:, None]).astype(np.int64)
+        px = np.clip(pts[:, 0], 0, self.width - 1)
+        py = np.clip(pts[:, 1], 0, self.height - 1)
+        self.color[py * self.width + px] = color
+
+def main(argv=None):
+    from simulation import Simulation
+    from bots import jump_bot
+    from scene import build_scene
+    from frustum import Frustum
+
+    parser = argparse.ArgumentParser(description="Dibuja un frame de una partida sin ventana y lo guarda como PNG")
+    parser.add_argument("-o", "--output", default="frame.png")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ticks", type=int, default=600, help="Ticks que juega el bot antes de dibujar")
+    parser.add_argument("--replay", help="Dibuja el estado final de una grabación (ver recording.py)")
+    parser.add_argument("--width", type=int, default=DISPLAY_WIDTH)
+    parser.add_argument("--height", type=int, default=DISPLAY_HEIGHT)
+    parser.add_argument("--no-text", action="store_true", help="No dibuja el marcador (no necesita pygame)")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        from recording import load_recording, replay
+        sim = replay(load_recording(args.replay))
+    else:
+        sim = Simulation(seed=args.seed)
+        for _ in range(args.ticks):
+            sim.step(jump_bot(sim))
+
+    font = None
+    if not args.no_text:
+        import pygame
+        pygame.font.init()
+        font = pygame.font.Font(None, 24)
+
+    start = time.perf_counter()
+    renderer = SoftwareRenderer(args.width, args.height)
+    player = sim.player
+    cam_pos = player.pos + sim.camera_offset
+    renderer.look_at(cam_pos, player.pos)
+    renderer.draw_floor_grid(player.pos, cam_pos)
+    renderer.begin_frame(cam_pos, player.pos)
+    build_scene(renderer, sim, cam_pos,
+                frustum=Frustum(cam_pos, player.pos, aspect=args.width / args.height))
+    renderer.flush()
+    if font:
+        if sim.state == "running":
+            renderer.draw_text(10, args.height - 30, f"Puntuación: {sim.score}   Record: {sim.high_score}", font)
+        else:
+            renderer.draw_text(10, args.height - 30, f"Game Over! P: {sim.score}   R: {sim.high_score}", font)
+    drawn = time.perf_counter()
+    renderer.save_png(args.output)
+    saved = time.perf_counter()
+    print(f"{args.output}: {args.width}x{args.height}, estado {sim.state}, puntuación {sim.score}; "
+          f"dibujo {(drawn - start) * 1000:.1f} ms, PNG {(saved - drawn) * 1000:.1f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+# test_frame_allocations.py
+"""
+Comprueba con tracemalloc (ver benchmarks.allocation_benchmark) que los frames en régimen
+no reservan memoria: no retienen bytes salvo algún buffer que crece, no crean objetos
+seguidos por el recolector de basura y su memoria temporal no crece con el largo de la pista.
+Lo mismo durante la explosión, con el límite de memoria temporal propio de los fragmentos.
+Se ejecuta con pytest.
+"""
+
+from benchmarks import allocation_benchmark, allocation_failures, ALLOC_MAX_TRANSIENT_EXPLOSION
+
+FRAMES = 300
+
+def test_steady_state_frames_do_not_allocate():
+    result = allocation_benchmark(100, FRAMES)
+    assert allocation_failures(result) == []
+    assert result["gc_objects_per_frame"] == 0
+
+def test_transient_memory_does_not_grow_with_track():
+    small = allocation_benchmark(100, FRAMES)
+    large = allocation_benchmark(10000, FRAMES)
+    assert allocation_failures(large) == []
+    # Con el recorte por X del frustum, una pista 100 veces más larga casi no cambia el pico.
+    assert large["transient_p99"] <= 1.25 * small["transient_p99"]
+
+def test_explosion_frames_do_not_allocate():
+    result = allocation_benchmark(100, FRAMES, exploding=True)
+    assert allocation_failures(result, max_transient=ALLOC_MAX_TRANSIENT_EXPLOSION) == []
+    assert result["gc_objects_per_frame"] == 0
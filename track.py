@@ -0,0 +1,117 @@
+# track.py
+"""
+Pista de obstáculos ordenada por X.
+El jugador avanza hacia -X, así que los obstáculos se guardan en un ObstacleField (ver
+obstacle_field.py) ordenado de forma descendente en X: al principio quedan los que ya se
+pasaron y al final los que están por delante del jugador.
+Solo se mantiene una ventana [player_x - ahead, player_x + behind]; los obstáculos
+que quedan más atrás se descartan por delante del campo, sin copiar los demás.
+La puntuación avanza un cursor sobre los obstáculos recién pasados en vez de
+recorrer toda la lista en cada frame.
+Como la pista está ordenada, los límites de cada consulta por X (fase amplia de colisión,
+puntuación, reciclado) se encuentran con búsqueda binaria sobre la columna x del campo.
+Las posiciones de los obstáculos vienen en bloques de un ChunkStream (ver chunks.py), que
+puede prepararlos en un hilo de fondo; aquí solo se colocan los bloques ya generados.
+"""
+
+import bisect
+import operator
+import random
+from obstacle_field import ObstacleField
+from chunks import ChunkStream
+from config import SPAWN_MIN_GAP, SPAWN_MAX_GAP, SPAWN_START_X, TRACK_AHEAD, TRACK_BEHIND
+
+class ObstacleTrack:
+    def __init__(self, start_x=SPAWN_START_X, ahead=TRACK_AHEAD, behind=TRACK_BEHIND,
+                 min_gap=SPAWN_MIN_GAP, max_gap=SPAWN_MAX_GAP, seed=None, threaded=False, generate=True):
+        self.ahead = ahead            # Distancia de generación por delante del jugador
+        self.behind = behind          # Distancia tras la cual se descartan los obstáculos pasados
+        self.min_gap = min_gap
+        self.max_gap = max_gap
+        # Bloques de obstáculos, generados en un hilo de fondo si threaded es True.
+        self.chunks = ChunkStream(start_x, min_gap=min_gap, max_gap=max_gap, threaded=threaded)
+        self.field = ObstacleField()  # Obstáculos activos, ordenados por X descendente
+        self.next_x = self.chunks.start_x   # Límite de la parte de la pista ya generada
+        self.cursor = 0
+        # Con generate=False la pista queda vacía hasta el primer reset (así no se genera
+        # una pista que se va a descartar).
+        if generate:
+            self.reset(seed)
+
+    def reset(self, seed=None):
+        """
+        Vacía la pista y empieza una pista nueva con la semilla dada (o una al azar),
+        generando la ventana inicial.
+        """
+        self.field.clear()
+        if seed is None:
+            seed = random.getrandbits(63)
+        self.chunks.restart(seed)
+        self.next_x = self.chunks.start_x   # Límite de la parte de la pista ya generada
+        self.cursor = 0         # Índice del primer obstáculo que el jugador aún no ha pasado
+        self.update(0.0)
+
+    def prefetch(self, seed):
+        """Empieza a preparar en segundo plano la pista del próximo reset(seed) (ver ChunkStream.prefetch)."""
+        self.chunks.prefetch(seed)
+
+    def __iter__(self):
+        """Recorre los obstáculos como vistas (ObstacleView), en el orden de la pista."""
+        field = self.field
+        return (field.view(i) for i in range(len(field)))
+
+    def __len__(self):
+        return len(self.field)
+
+    def _count_above(self, x, inclusive=False):
+        """Número de obstáculos con X > x (o >= x si inclusive): todos están al principio."""
+        search = bisect.bisect_right if inclusive else bisect.bisect_left
+        return search(self.field.x, -x, key=operator.neg)
+
+    def update(self, player_x):
+        """
+        Mantiene la ventana alrededor del jugador:
+        - Coloca bloques de obstáculos hasta cubrir player_x - ahead.
+        - Descarta los obstáculos ya pasados que quedan a más de behind unidades por detrás.
+        """
+        limit = player_x - self.ahead
+        while self.next_x > limit:
+            chunk = self.chunks.next_chunk()
+            self.field.extend(chunk.xs)
+            self.next_x = chunk.end_x
+        count = min(self.cursor, self._count_above(player_x + self.behind))
+        if count:
+            self.field.drop_front(count)
+            self.cursor -= count
+
+    def remove(self, obs):
+        """Retira un obstáculo concreto de la pista (por ejemplo, al hacerlo explotar)."""
+        self.field.remove(obs.index)
+        if obs.index < self.cursor:
+            self.cursor -= 1
+
+    def query_range(self, x_min, x_max):
+        """
+        Fase amplia de colisión: devuelve (start, stop), el intervalo de índices del campo
+        con los obstáculos de x en [x_min, x_max].
+        """
+        return self._count_above(x_max), self._count_above(x_min, inclusive=True)
+
+    def query(self, x_min, x_max):
+        """Igual que query_range, pero devuelve los obstáculos como vistas."""
+        start, stop = self.query_range(x_min, x_max)
+        return [self.field.view(i) for i in range(start, stop)]
+
+    def advance_passed(self, player_x):
+        """
+        Marca como pasados los obstáculos que el jugador acaba de superar
+        (player_x < obs.x) y devuelve cuántos son. El límite se encuentra con búsqueda
+        binaria y solo se marcan los obstáculos entre el cursor y ese límite.
+        """
+        stop = self._count_above(player_x)
+        if stop <= self.cursor:
+            return 0
+        self.field.passed[self.cursor:stop] = True
+        count = stop - self.cursor
+        self.cursor = stop
+        return count
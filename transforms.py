@@ -0,0 +1,138 @@
+# transforms.py
+"""
+Utilidades matemáticas de geometría sin dependencias de Pygame ni de OpenGL.
+Aquí se incluyen la matriz de rotación en Z, el backface culling, el painter's algorithm
+y la proyección de sombras, tanto en su versión por vértice/triángulo como en su
+versión vectorizada sobre arreglos de NumPy. La lógica del juego (simulación,
+colisiones, partículas) solo depende de este módulo; render_utils lo reexporta.
+"""
+
+import functools
+import math
+import numpy as np
+from config import ROTATION_CACHE_SIZE
+
+@functools.lru_cache(maxsize=ROTATION_CACHE_SIZE)
+def rotation_z(angle):
+    """
+    Calcula la matriz de rotación de 3x3 para el eje Z.
+    Fórmula: 
+      [ cos(angle)  -sin(angle)   0 ]
+      [ sin(angle)   cos(angle)   0 ]
+      [    0             0        1 ]
+    Esto rota un vector en el plano XY.
+    Los ángulos se repiten mucho (el jugador en el suelo siempre está en un múltiplo de
+    90°), así que las matrices se guardan en caché; por eso son de solo lectura.
+    """
+    c = math.cos(angle)
+    s = math.sin(angle)
+    R = np.array([[ c, -s, 0],
+                  [ s,  c, 0],
+                  [ 0,  0, 1]], dtype=float)
+    R.flags.writeable = False
+    return R
+
+def backface_cull(triangles, vertices, cam_pos):
+    """
+    Realiza el backface culling: elimina triángulos que no se ven desde la cámara.
+    Calcula la normal de cada triángulo usando el producto vectorial y luego comprueba
+    si el ángulo entre la normal y la dirección de la cámara es agudo (producto punto > 0).
+    """
+    visibles = []
+    for tri in triangles:
+        v0 = vertices[tri[0]]
+        v1 = vertices[tri[1]]
+        v2 = vertices[tri[2]]
+        normal = np.cross(v1 - v0, v2 - v0)
+        if np.dot(normal, cam_pos - v0) > 0:
+            visibles.append(tri)
+    return visibles
+
+def painter_sort(triangles, vertices):
+    """
+    Ordena los triángulos de forma que se dibujen de atrás hacia adelante (painter’s algorithm).
+    Calcula la profundidad promedio (valor Z) de cada triángulo y los ordena en orden descendente.
+    """
+    tri_depths = []
+    for tri in triangles:
+        z_avg = (vertices[tri[0]][2] + vertices[tri[1]][2] + vertices[tri[2]][2]) / 3.0
+        tri_depths.append((tri, z_avg))
+    tri_depths.sort(key=lambda t: t[1], reverse=True)
+    return [t for (t, _) in tri_depths]
+
+def project_shadow(vertex, light_dir):
+    """
+    Proyecta un vértice sobre el plano y = 0 siguiendo la dirección de la luz.
+    La fórmula es: v_proyectado = v + t * light_dir, donde t = -v.y / light_dir.y.
+    Esto se usa para crear la sombra del objeto en el piso.
+    """
+    if light_dir[1] == 0:
+        return vertex.copy()
+    t = -vertex[1] / light_dir[1]
+    return vertex + light_dir * t
+
+# --- Variantes vectorizadas ---
+# Trabajan con arreglos (N,3) de vértices y (M,3) de índices en vez de listas de vértices
+# sueltos. Los vértices pueden llevar dimensiones de lote iniciales, por ejemplo (K,N,3)
+# para K objetos que comparten la misma malla, y así se procesan muchas mallas a la vez.
+
+def backface_mask(vertices, triangles, cam_pos, normals=None):
+    """
+    Versión vectorizada del test de backface_cull: devuelve una máscara booleana (...,M)
+    que vale True para los triángulos visibles desde cam_pos.
+    normals (...,M,3) son las normales de las caras si ya se conocen (por ejemplo, las
+    precalculadas de la malla); si no, se calculan con el producto vectorial.
+    """
+    v = np.asarray(vertices, dtype=float)
+    idx = np.asarray(triangles)
+    v0 = v[..., idx[:, 0], :]
+    if normals is None:
+        v1 = v[..., idx[:, 1], :]
+        v2 = v[..., idx[:, 2], :]
+        normal = np.cross(v1 - v0, v2 - v0)
+    else:
+        normal = normals
+    return np.einsum('...j,...j->...', normal, cam_pos - v0) > 0
+
+def backface_cull_array(triangles, vertices, cam_pos, normals=None):
+    """Igual que backface_cull, pero con arreglos: devuelve el arreglo (K,3) de triángulos visibles."""
+    idx = np.asarray(triangles)
+    return idx[backface_mask(vertices, idx, cam_pos, normals)]
+
+def painter_sort_array(triangles, vertices):
+    """
+    Igual que painter_sort, pero con arreglos: ordena los triángulos (M,3) por la Z promedio
+    de sus vértices en orden descendente. El argsort es estable, así que los empates
+    conservan el orden original igual que sort(reverse=True).
+    """
+    idx = np.asarray(triangles)
+    if len(idx) == 0:
+        return idx.reshape(0, 3)
+    z = np.asarray(vertices, dtype=float)[:, 2]
+    z_avg = (z[idx[:, 0]] + z[idx[:, 1]] + z[idx[:, 2]]) / 3.0
+    return idx[np.argsort(-z_avg, kind="stable")]
+
+def project_shadow_array(vertices, light_dir):
+    """
+    Igual que project_shadow, pero para un arreglo (...,3) de vértices a la vez:
+        v_proyectado = v + t * light_dir, con t = -v.y / light_dir.y
+    """
+    v = np.asarray(vertices, dtype=float)
+    if light_dir[1] == 0:
+        return v.copy()
+    t = -v[..., 1:2] / light_dir[1]
+    return v + light_dir * t
+
+def floor_patch_center(focus, cam_pos, limit, spacing):
+    """
+    Centro (cx, cz) del parche de la cuadrícula del piso de lado 2*limit: medio parche
+    por delante de 'focus' en la dirección de la vista sobre el plano XZ, ajustado a
+    múltiplos de 'spacing' para que las líneas no "resbalen" al moverse.
+    """
+    view = np.array([focus[0] - cam_pos[0], focus[2] - cam_pos[2]], dtype=float)
+    norm = np.linalg.norm(view)
+    if norm > 0:
+        view *= 0.5 * limit / norm
+    cx = round((focus[0] + view[0]) / spacing) * spacing
+    cz = round((focus[2] + view[1]) / spacing) * spacing
+    return cx, cz
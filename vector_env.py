@@ -0,0 +1,289 @@
+# vector_env.py
+"""
+N partidas independientes avanzadas a la vez con NumPy, con una API al estilo gym
+(reset / step sobre una dimensión de lote) para entrenar y probar el bot automático.
+Reproduce la rama "running" de Simulation: salto, gravedad, rotación en el aire,
+aumento de velocidad con la puntuación, puntuación al pasar obstáculos y colisión
+continua. No hay explosión: un entorno que choca termina su episodio y se reinicia
+automáticamente en el mismo step (como los VecEnv habituales).
+
+El estado son arreglos de tamaño N (x, y, vel_y, on_ground, rotación, puntuación) y,
+por entorno, las posiciones X de los obstáculos alrededor del jugador en una ventana
+fija (OBSTACLE_SLOTS, N) ordenada de forma descendente: la fila 0 es el último
+obstáculo ya pasado y las siguientes los que vienen por delante. Las ranuras van en la
+primera dimensión para que cada una sea un arreglo contiguo de N valores.
+
+Colisión en 2D: el cubo es un prisma en Z (z en [-0.5, 0.5]) y la pirámide está
+contenida en ese mismo rango de Z, así que ambos se intersecan si y solo si se
+intersecan sus proyecciones sobre el plano XY: el cuadrado rotado del cubo y el
+triángulo de la pirámide. Se usa la misma prueba continua que CollisionEngine
+(sweep_intervals) con los 5 ejes del par cuadrado-triángulo.
+"""
+
+import math
+import numpy as np
+from config import GRAVITY, JUMP_SPEED, BASE_SPEED, SPAWN_MIN_GAP, SPAWN_MAX_GAP, SPAWN_START_X
+from collision import sweep_intervals
+from game_objects import cube_mesh, cube_pivot_offset, pyramid_mesh, pyramid_pivot_offset
+
+OBSTACLE_SLOTS = 4      # Obstáculos por entorno en la ventana (1 pasado + 3 por delante)
+SPIN = 0.1              # Rotación (radianes) por tick en el aire, como en Simulation
+SPIN_COS, SPIN_SIN = math.cos(SPIN), math.sin(SPIN)
+# Coseno y seno exactos de los múltiplos de 90° (orientaciones al aterrizar).
+QUARTER_COS = np.array([1.0, 0.0, -1.0, 0.0])
+QUARTER_SIN = np.array([0.0, 1.0, 0.0, -1.0])
+FAR_BEHIND = 1e9        # X del obstáculo "pasado" al empezar (ninguno todavía)
+
+# Proyecciones XY de las mallas en espacio local (con el pivot offset aplicado).
+SQUARE = np.unique((cube_mesh.vertices + cube_pivot_offset)[:, :2], axis=0)
+TRIANGLE = np.unique((pyramid_mesh.vertices + pyramid_pivot_offset)[:, :2], axis=0)
+
+def _edge_normals(polygon):
+    """Normales (sin normalizar) de las aristas de un polígono convexo dado por sus vértices."""
+    center = polygon.mean(axis=0)
+    order = np.argsort(np.arctan2(polygon[:, 1] - center[1], polygon[:, 0] - center[0]))
+    ring = polygon[order]
+    edges = np.roll(ring, -1, axis=0) - ring
+    return np.stack([edges[:, 1], -edges[:, 0]], axis=1)
+
+TRIANGLE_AXES = _edge_normals(TRIANGLE)                          # (3,2)
+SQUARE_X = (SQUARE[:, 0].min(), SQUARE[:, 0].max())              # Intervalo local del cuadrado en X
+SQUARE_Y = (SQUARE[:, 1].min(), SQUARE[:, 1].max())              # y en Y
+# Cota del alcance en X de cada forma, para la fase amplia.
+SQUARE_RADIUS = float(np.max(np.linalg.norm(SQUARE, axis=1)))
+TRIANGLE_RADIUS = float(np.max(np.abs(TRIANGLE[:, 0])))
+TRIANGLE_TOP = float(TRIANGLE[:, 1].max())
+
+# Observación por entorno: y, vel_y, on_ground, speed y la distancia en X a los
+# próximos obstáculos (positiva por delante del jugador).
+OBS_SIZE = 4 + OBSTACLE_SLOTS - 1
+
+class VectorEnv:
+    def __init__(self, num_envs, seed=None, base_speed=BASE_SPEED, jump_speed=JUMP_SPEED,
+                 gravity=GRAVITY, min_gap=SPAWN_MIN_GAP, max_gap=SPAWN_MAX_GAP,
+                 start_x=SPAWN_START_X, max_ticks=None):
+        self.num_envs = num_envs
+        self.base_speed = base_speed
+        self.jump_speed = jump_speed
+        self.gravity = gravity
+        self.min_gap = min_gap
+        self.max_gap = max_gap
+        self.start_x = start_x
+        self.max_ticks = max_ticks      # Si se indica, los episodios se truncan tras estos ticks
+        n = num_envs
+        self.x = np.zeros(n)
+        self.y = np.zeros(n)
+        self.vel_y = np.zeros(n)
+        self.on_ground = np.ones(n, dtype=bool)
+        self.rotation = np.zeros(n)
+        # cos/sin de la rotación, actualizados de forma incremental: evaluar np.cos/np.sin
+        # en cada tick para todos los entornos costaría más que el resto del step. El error
+        # acumulado en un salto es del orden de 1e-13 y al aterrizar se fijan valores exactos.
+        self.rot_cos = np.ones(n)
+        self.rot_sin = np.zeros(n)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.speed = np.zeros(n)
+        self.obstacle_x = np.zeros((OBSTACLE_SLOTS, n))
+        # Buffers de trabajo: con N grande cada arreglo temporal nuevo cuesta tanto como la
+        # operación (el sistema entrega memoria nueva en cada asignación).
+        self._x0 = np.empty(n)
+        self._y0 = np.empty(n)
+        self._tmp = np.empty((3, n))
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Reinicia todos los entornos y devuelve la observación (N, OBS_SIZE)."""
+        if seed is not None or not hasattr(self, "rng"):
+            self.rng = np.random.default_rng(seed)
+        self._reset_envs(np.arange(self.num_envs))
+        return self.observe()
+
+    def _reset_envs(self, idx):
+        self.x[idx] = 0.0
+        self.y[idx] = 0.0
+        self.vel_y[idx] = 0.0
+        self.on_ground[idx] = True
+        self.rotation[idx] = 0.0
+        self.rot_cos[idx] = 1.0
+        self.rot_sin[idx] = 0.0
+        self.score[idx] = 0
+        self.speed[idx] = self.base_speed
+        self.ticks[idx] = 0
+        gaps = self.rng.integers(self.min_gap, self.max_gap + 1, size=(len(idx), OBSTACLE_SLOTS - 2))
+        self.obstacle_x[0, idx] = FAR_BEHIND
+        self.obstacle_x[1, idx] = self.start_x
+        self.obstacle_x[2:, idx] = self.start_x - np.cumsum(gaps, axis=1).T
+
+    def observe(self):
+        """
+        Observación (N, OBS_SIZE) en float32. Se arma por filas de N valores y se devuelve
+        transpuesta (vista en orden Fortran), que es mucho más rápido que escribir columnas.
+        """
+        obs = np.empty((OBS_SIZE, self.num_envs), dtype=np.float32)
+        obs[0] = self.y
+        obs[1] = self.vel_y
+        obs[2] = self.on_ground
+        obs[3] = self.speed
+        np.subtract(self.x, self.obstacle_x[1:], out=obs[4:], casting="same_kind")
+        return obs.T
+
+    def step(self, jump):
+        """
+        Avanza un tick todos los entornos. jump es un arreglo booleano (N,).
+        Devuelve (obs, reward, done, info):
+        - reward: puntos ganados en el tick (10 por obstáculo pasado).
+        - done: el episodio terminó (choque o truncado por max_ticks); esos entornos ya
+          están reiniciados en obs.
+        - info: "crashed" (N,) y, si algún entorno terminó, "done_index" (sus índices),
+          "final_score" y "final_ticks".
+        """
+        jump = np.asarray(jump, dtype=bool)
+        x0, y0 = self._x0, self._y0
+        np.copyto(x0, self.x)
+        np.copyto(y0, self.y)
+
+        # Salto y gravedad, igual que Simulation.step / _step_running.
+        # Las actualizaciones condicionales se hacen con np.where o multiplicando por la
+        # máscara: los ufuncs con where= son varias veces más lentos con máscaras dispersas.
+        start = jump & self.on_ground
+        self.vel_y = np.where(start, self.jump_speed, self.vel_y)
+        self.on_ground &= ~start
+        self.x -= self.speed
+        airborne = ~self.on_ground
+        self.vel_y -= self.gravity * airborne
+        self.y += self.vel_y
+        landed = self.y < 0
+        if landed.any():
+            np.maximum(self.y, 0.0, out=self.y)
+            self.vel_y[landed] = 0.0
+            self.on_ground |= landed
+            airborne &= ~landed
+            half_pi = math.pi / 2
+            quarters = np.round(self.rotation[landed] / half_pi)
+            self.rotation[landed] = quarters * half_pi
+            quarters = quarters.astype(np.int64) % 4
+            self.rot_cos[landed] = QUARTER_COS[quarters]
+            self.rot_sin[landed] = QUARTER_SIN[quarters]
+        self.rotation += SPIN * airborne
+        # (cos, sin) rotados SPIN radianes en el aire: [c, s] <- [c*cos - s*sin, s*cos + c*sin],
+        # aplicados como incrementos multiplicados por la máscara (0 en el suelo).
+        c, s = self.rot_cos, self.rot_sin
+        dc, ds, t = self._tmp
+        np.multiply(c, SPIN_COS - 1.0, out=dc)
+        np.multiply(s, SPIN_SIN, out=t)
+        dc -= t
+        np.multiply(s, SPIN_COS - 1.0, out=ds)
+        np.multiply(c, SPIN_SIN, out=t)
+        ds += t
+        dc *= airborne
+        ds *= airborne
+        c += dc
+        s += ds
+        self.ticks += 1
+
+        crashed = self._collide(x0, y0)
+
+        # Puntuación: obstáculos que el jugador acaba de pasar (player_x < obs_x).
+        reward = np.zeros(self.num_envs, dtype=np.int64)
+        alive = ~crashed
+        passed = alive & (self.x < self.obstacle_x[1])
+        while passed.any():
+            reward[passed] += 10
+            self.score[passed] += 10
+            self.speed[passed] = self.base_speed + self.score[passed] / 5000.0
+            track = self.obstacle_x[:, passed]
+            track[:-1] = track[1:]
+            track[-1] = track[-2] - self.rng.integers(self.min_gap, self.max_gap + 1, size=track.shape[1])
+            self.obstacle_x[:, passed] = track
+            passed = alive & (self.x < self.obstacle_x[1])
+
+        done = crashed.copy()
+        if self.max_ticks is not None:
+            done |= self.ticks >= self.max_ticks
+        info = {"crashed": crashed}
+        if done.any():
+            idx = np.flatnonzero(done)
+            info["final_score"] = self.score[idx].copy()
+            info["final_ticks"] = self.ticks[idx].copy()
+            info["done_index"] = idx
+            self._reset_envs(idx)
+        return self.observe(), reward, done, info
+
+    def _collide(self, x0, y0):
+        """
+        Colisión continua del movimiento de este tick contra los obstáculos de las
+        ranuras 0 y 1 (el último pasado y el siguiente): con separación mínima entre
+        obstáculos, ningún otro puede alcanzarse en un tick.
+        La fase amplia tiene dos pasos (intervalo en X con el radio del cubo y luego cajas
+        envolventes) y la fase exacta (SAT 2D) solo se hace en los pares que la superan.
+        """
+        crashed = np.zeros(self.num_envs, dtype=bool)
+        margin = SQUARE_RADIUS + TRIANGLE_RADIUS
+        lo = np.minimum(x0, self.x) - margin
+        hi = np.maximum(x0, self.x) + margin
+        low_enough = np.minimum(y0, self.y) - SQUARE_RADIUS < TRIANGLE_TOP
+        for slot in (0, 1):
+            ox = self.obstacle_x[slot]
+            idx = np.flatnonzero(low_enough & (ox >= lo) & (ox <= hi))
+            if len(idx) == 0:
+                continue
+            x, y, c, s, ox = self.x[idx], self.y[idx], self.rot_cos[idx], self.rot_sin[idx], ox[idx]
+            mx, my = x - x0[idx], y - y0[idx]
+            # Caja envolvente del cuadrado rotado, barrida por el movimiento, contra la del
+            # triángulo: descarta los saltos que pasan por encima y los pares lejanos.
+            xmin = x + np.minimum(SQUARE_X[0] * c, SQUARE_X[1] * c) - np.maximum(SQUARE_Y[0] * s, SQUARE_Y[1] * s)
+            xmax = x + np.maximum(SQUARE_X[0] * c, SQUARE_X[1] * c) - np.minimum(SQUARE_Y[0] * s, SQUARE_Y[1] * s)
+            ymin = y + np.minimum(SQUARE_X[0] * s, SQUARE_X[1] * s) + np.minimum(SQUARE_Y[0] * c, SQUARE_Y[1] * c)
+            near = ((xmin - np.maximum(mx, 0) < ox + TRIANGLE_RADIUS) &
+                    (xmax - np.minimum(mx, 0) > ox - TRIANGLE_RADIUS) &
+                    (ymin - np.maximum(my, 0) < TRIANGLE_TOP))
+            if near.any():
+                hit = swept_square_triangle(x[near], y[near], c[near], s[near], mx[near], my[near], ox[near])
+                crashed[idx[near][hit]] = True
+        return crashed
+
+def swept_square_triangle(x, y, c, s, mx, my, ox):
+    """
+    SAT continuo 2D entre el cuadrado del cubo (posición final x, y, rotación con coseno c
+    y seno s, movimiento del tick mx, my) y el triángulo de la pirámide en (ox, 0), para P pares.
+    Los 5 ejes son las 2 normales del cuadrado rotado y las 3 del triángulo. En vez de
+    proyectar todos los vértices se usa que cada forma es simple en sus propios ejes:
+    el cuadrado proyectado sobre sus normales es su intervalo local desplazado por la
+    posición, sobre una dirección fija n es una caja local, cuyo mínimo y máximo salen del
+    signo de R^T n; y el triángulo sobre sus normales es un intervalo constante.
+    Devuelve la máscara (P,) de pares que chocan durante el tick.
+    """
+    count = len(x)
+    amin = np.empty((5, count))
+    amax = np.empty((5, count))
+    bmin = np.empty((5, count))
+    bmax = np.empty((5, count))
+    speed = np.empty((5, count))
+    # Normales del cuadrado: u = R·(1,0) = (c, s) y w = R·(0,1) = (-s, c).
+    for k, (ax, ay, lmin, lmax) in enumerate(((c, s, SQUARE_X[0], SQUARE_X[1]),
+                                              (-s, c, SQUARE_Y[0], SQUARE_Y[1]))):
+        p = x * ax + y * ay
+        amin[k] = p + lmin
+        amax[k] = p + lmax
+        speed[k] = mx * ax + my * ay
+        t = [TRIANGLE[i, 0] * ax + TRIANGLE[i, 1] * ay for i in range(len(TRIANGLE))]
+        base = ox * ax
+        bmin[k] = np.minimum(np.minimum(t[0], t[1]), t[2]) + base
+        bmax[k] = np.maximum(np.maximum(t[0], t[1]), t[2]) + base
+    # Normales fijas del triángulo.
+    for k, (nx, ny) in enumerate(TRIANGLE_AXES, start=2):
+        rx = c * nx + s * ny      # R^T n
+        ry = -s * nx + c * ny
+        p = x * nx + y * ny
+        amin[k] = p + np.minimum(SQUARE_X[0] * rx, SQUARE_X[1] * rx) + np.minimum(SQUARE_Y[0] * ry, SQUARE_Y[1] * ry)
+        amax[k] = p + np.maximum(SQUARE_X[0] * rx, SQUARE_X[1] * rx) + np.maximum(SQUARE_Y[0] * ry, SQUARE_Y[1] * ry)
+        speed[k] = mx * nx + my * ny
+        proj = TRIANGLE @ (nx, ny)
+        bmin[k] = proj.min() + ox * nx
+        bmax[k] = proj.max() + ox * nx
+    # Intervalos al inicio del tick: el cuadrado estaba desplazado -motion.
+    amin -= speed
+    amax -= speed
+    hit, _ = sweep_intervals(amin, amax, bmin, bmax, speed, True, axis=0)
+    return hit